@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+from storage import Storage
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Sort options offered by the video table, mapped to (column, ascending)
+SORT_OPTIONS = {
+    "views-desc": ("views_count", False),
+    "views-asc": ("views_count", True),
+    "date-desc": ("published_at", False),
+    "date-asc": ("published_at", True),
+    "duration-desc": ("duration_seconds", False),
+    "duration-asc": ("duration_seconds", True),
+}
+MAX_PER_PAGE = 500
+# The views chart stops being readable long before a channel's full history
+VIEWS_CHART_LIMIT = 50
+ENGAGEMENT_CHART_LIMIT = 5
+DURATION_BUCKETS = ("Short (< 10 min)", "Medium (10-20 min)", "Long (> 20 min)")
+
+class _CachedAnalysis:
+    """Video frame and chart aggregates of one stored analysis"""
+
+    def __init__(self, frame: pd.DataFrame, charts_body: str):
+        self.frame = frame
+        self.charts_body = charts_body
+        self.etag = hashlib.sha1(charts_body.encode('utf-8')).hexdigest()
+
+class AnalysisQueryCache:
+    def __init__(self, storage: Storage, max_entries: int = 32):
+        """
+        Serve pages of videos and chart aggregates for stored analyses
+
+        Analyses never change once saved, so each one is loaded and
+        aggregated once and kept in a small LRU cache.
+
+        Args:
+            storage: Database the analyses are loaded from
+            max_entries: Number of analyses kept in memory
+        """
+        self.storage = storage
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, _CachedAnalysis]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def charts(self, analysis_id: int) -> Optional[Tuple[str, str]]:
+        """Return the chart aggregates as a JSON body and its ETag"""
+        entry = self._get(analysis_id)
+        if not entry:
+            return None
+        return entry.charts_body, entry.etag
+
+    def videos(self, analysis_id: int, query: str = "", sort: str = "views-desc",
+               page: int = 1, per_page: int = 50) -> Optional[Dict]:
+        """Return one page of an analysis' videos, filtered by title and sorted"""
+        if sort not in SORT_OPTIONS:
+            raise ValueError(f"Unknown sort option: {sort}")
+        entry = self._get(analysis_id)
+        if not entry:
+            return None
+
+        frame = entry.frame
+        if query:
+            frame = frame[frame["title"].str.contains(query, case=False, regex=False, na=False)]
+        column, ascending = SORT_OPTIONS[sort]
+        frame = frame.sort_values(column, ascending=ascending, kind="stable")
+
+        per_page = max(1, min(per_page, MAX_PER_PAGE))
+        page = max(1, page)
+        start = (page - 1) * per_page
+        rows = frame.iloc[start:start + per_page]
+        return {
+            "total": len(frame),
+            "page": page,
+            "per_page": per_page,
+            "pages": max(1, -(-len(frame) // per_page)),
+            "videos": rows.astype(object).where(rows.notna(), None).to_dict(orient="records"),
+        }
+
+    def _get(self, analysis_id: int) -> Optional[_CachedAnalysis]:
+        with self._lock:
+            entry = self._entries.get(analysis_id)
+            if entry:
+                self._entries.move_to_end(analysis_id)
+                return entry
+
+        analysis = self.storage.get_analysis(analysis_id)
+        if not analysis:
+            return None
+        frame = pd.DataFrame(analysis["video_data"])
+        entry = _CachedAnalysis(frame, json.dumps(self._aggregate(frame)))
+        logger.info(f"Aggregated {len(frame)} videos for analysis {analysis_id}")
+
+        with self._lock:
+            self._entries[analysis_id] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def _aggregate(frame: pd.DataFrame) -> Dict:
+        """Precompute the data behind every results chart"""
+        if frame.empty:
+            return {
+                "total_views": 0,
+                "views": {"labels": [], "values": []},
+                "upload_timeline": {"labels": [], "counts": []},
+                "duration": {"labels": list(DURATION_BUCKETS), "counts": [0] * len(DURATION_BUCKETS)},
+                "engagement": [],
+            }
+
+        views = frame.head(VIEWS_CHART_LIMIT)
+        # Keep the order uploads were listed in (newest first)
+        upload_dates = frame["upload_date"].fillna("Unknown")
+        timeline = upload_dates.groupby(upload_dates, sort=False).size()
+        buckets = np.digitize(frame["duration_seconds"].to_numpy(), [600, 1200])
+        top = frame.nlargest(ENGAGEMENT_CHART_LIMIT, "views_per_minute")
+
+        return {
+            "total_views": int(frame["views_count"].sum()),
+            "views": {
+                "labels": views["title"].tolist(),
+                "values": views["views_count"].astype(int).tolist(),
+            },
+            "upload_timeline": {
+                "labels": timeline.index.tolist(),
+                "counts": timeline.astype(int).tolist(),
+            },
+            "duration": {
+                "labels": list(DURATION_BUCKETS),
+                "counts": np.bincount(buckets, minlength=len(DURATION_BUCKETS)).tolist(),
+            },
+            "engagement": [
+                {
+                    "title": row.title,
+                    "engagement": float(row.views_per_minute),
+                    "views": int(row.views_count),
+                    "duration": row.duration_seconds / 60,
+                }
+                for row in top.itertuples()
+            ],
+        }
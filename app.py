@@ -1,12 +1,30 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context, url_for
 from youtube_scraper import YouTubeScraper
 from subtitle_downloader import SubtitleDownloader
 from idea_generator import IdeaGenerator
+from job_manager import JobManager
+from driver_pool import DriverPool
+from http_scraper import ChannelPageClient
+from channel_index import ChannelIndex, normalize_channel_url
+from storage import Storage
+from transcript_search import TranscriptSearchIndex
+from analysis_queries import AnalysisQueryCache, SORT_OPTIONS
+from llm_cache import LLMResponseCache
+from topic_clustering import cluster_videos
+from near_duplicates import NearDuplicateDetector, duplicate_of
+from batch_analysis import BatchManager, StageLimiter, parse_channels
+from resilience import Upstream
+from subtitle_downloader import is_retryable_transcript_error
+from idea_generator import is_retryable_openai_error
+from video_metrics import summarize_channel
+from metrics import REGISTRY, StageTimer
 import pandas as pd
-import os
 import json
 import logging
-from datetime import datetime
+import atexit
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,11 +34,153 @@ app = Flask(__name__)
 
 # Initialize components
 OPENAI_API_KEY = ""
+# Optional OpenAI-compatible endpoint, e.g. a local stub for testing
+OPENAI_API_BASE = None
 # Configure to include all videos and full subtitle text
 MAX_VIDEOS_WITH_SUBTITLES = 100  # Set high to include all videos
 SUBTITLE_CHARS_PER_VIDEO = 1000000  # Set high to include full subtitle text
-idea_generator = IdeaGenerator(OPENAI_API_KEY, max_videos=MAX_VIDEOS_WITH_SUBTITLES, subtitle_chars=SUBTITLE_CHARS_PER_VIDEO)
-subtitle_downloader = SubtitleDownloader()
+# Total prompt size in tokens; subtitles are summarized to fit (None disables)
+PROMPT_TOKEN_BUDGET = 24000
+# "single" sends one big prompt, "map_reduce" summarizes videos concurrently first
+IDEA_GENERATION_MODE = "single"
+# Database holding channels, videos, transcripts and analyses
+DATABASE_URL = "sqlite:///yca.db"
+# SQLite full-text index over every downloaded transcript
+SEARCH_INDEX_PATH = "transcript_index.db"
+# Number of analyses allowed to run at the same time; each stage below has
+# its own limit, so analyses in different stages overlap
+MAX_CONCURRENT_ANALYSES = 4
+# Seconds a finished analysis is handed to new requests for the same channel,
+# months_back and idea mode instead of running it again
+ANALYSIS_REUSE_SECONDS = 300
+# Analyses scraping at the same time (one warm browser each)
+SCRAPE_CONCURRENCY = 2
+# Analyses waiting on the LLM at the same time
+LLM_CONCURRENCY = 2
+# Subtitle downloads in flight across all analyses
+SUBTITLE_POOL_SIZE = 16
+# Scraped videos waiting for a subtitle download before the scraper is paused
+SUBTITLE_QUEUE_SIZE = 32
+# How the scraper reads video tiles: "bulk" (one script call) or "element"
+SCRAPER_EXTRACTION_MODE = "bulk"
+# Client-side limits for the upstream services: sustained calls per second and burst
+TRANSCRIPT_RATE_PER_SECOND = 5
+TRANSCRIPT_BURST = 10
+LLM_RATE_PER_SECOND = 2
+LLM_BURST = 4
+# Consecutive transient failures that stop calls to an upstream for UPSTREAM_RESET_SECONDS
+UPSTREAM_FAILURE_THRESHOLD = 5
+UPSTREAM_RESET_SECONDS = 30
+transcript_upstream = Upstream('transcripts', is_retryable_transcript_error, rate=TRANSCRIPT_RATE_PER_SECOND,
+                               burst=TRANSCRIPT_BURST, failure_threshold=UPSTREAM_FAILURE_THRESHOLD,
+                               reset_timeout=UPSTREAM_RESET_SECONDS)
+llm_upstream = Upstream('llm', is_retryable_openai_error, rate=LLM_RATE_PER_SECOND, burst=LLM_BURST,
+                        failure_threshold=UPSTREAM_FAILURE_THRESHOLD, reset_timeout=UPSTREAM_RESET_SECONDS)
+llm_cache = LLMResponseCache()
+atexit.register(llm_cache.flush)
+idea_generator = IdeaGenerator(OPENAI_API_KEY, max_videos=MAX_VIDEOS_WITH_SUBTITLES, subtitle_chars=SUBTITLE_CHARS_PER_VIDEO,
+                               cache=llm_cache, token_budget=PROMPT_TOKEN_BUDGET,
+                               mode=IDEA_GENERATION_MODE, api_base=OPENAI_API_BASE, upstream=llm_upstream)
+search_index = TranscriptSearchIndex(SEARCH_INDEX_PATH)
+subtitle_downloader = SubtitleDownloader(search_index=search_index, upstream=transcript_upstream)
+# MinHash signatures are stored next to the cached transcripts
+duplicate_detector = NearDuplicateDetector(subtitle_downloader.output_dir)
+subtitle_downloader.cache.add_sidecar(duplicate_detector.path_for)
+atexit.register(subtitle_downloader.cache.flush)
+job_manager = JobManager(max_workers=MAX_CONCURRENT_ANALYSES)
+batch_manager = BatchManager(job_manager)
+stage_limits = StageLimiter({'scraping': SCRAPE_CONCURRENCY, 'llm': LLM_CONCURRENCY})
+# Warm browsers shared by analyses, at most one per concurrent scrape
+driver_pool = DriverPool(max_size=SCRAPE_CONCURRENCY)
+atexit.register(driver_pool.close)
+subtitle_executor = ThreadPoolExecutor(max_workers=SUBTITLE_POOL_SIZE, thread_name_prefix="subtitles")
+atexit.register(subtitle_executor.shutdown)
+# Pooled HTTP session for the browserless scraper backend
+http_client = ChannelPageClient()
+# Known videos per channel, so repeat analyses only scrape new uploads
+channel_index = ChannelIndex()
+storage = Storage(DATABASE_URL)
+analysis_queries = AnalysisQueryCache(storage)
+
+ANALYSIS_STAGE_SECONDS = REGISTRY.histogram('yca_analysis_stage_seconds', 'Time analyses spend in each stage',
+                                            ['stage'])
+ANALYSES = REGISTRY.counter('yca_analyses_total', 'Finished analyses by outcome', ['outcome'])
+JOBS = REGISTRY.gauge('yca_jobs', 'Retained analysis jobs by status', ['status'])
+BROWSERS = REGISTRY.gauge('yca_browsers', 'Pooled browsers by state', ['state'])
+BROWSER_STARTS = REGISTRY.counter('yca_browser_starts_total', 'Browsers started by the pool')
+BROWSER_RECYCLES = REGISTRY.counter('yca_browser_recycles_total', 'Browsers replaced after too many pages')
+BROWSER_CRASHES = REGISTRY.counter('yca_browser_crashes_total',
+                                   'Browsers discarded after crashing or failing a health check')
+BROWSER_IDLE_PAGES = REGISTRY.gauge('yca_browser_idle_pages', 'Pages loaded by the idle pooled browsers')
+BROWSER_IDLE_JS_HEAP = REGISTRY.gauge('yca_browser_idle_js_heap_bytes',
+                                      'Used JS heap of the idle pooled browsers when they were returned')
+CACHE_EVENTS = REGISTRY.counter('yca_cache_events_total', 'Transcript and LLM response cache lookups and evictions',
+                                ['cache', 'event'])
+CACHE_BYTES = REGISTRY.gauge('yca_transcript_cache_bytes', 'Size of the transcript cache')
+LLM_TOKENS_SAVED = REGISTRY.counter('yca_llm_tokens_saved_total', 'Tokens answered from the LLM response cache')
+UPSTREAM_EVENTS = REGISTRY.counter('yca_upstream_events_total', 'Calls, retries and failures per upstream service',
+                                   ['upstream', 'event'])
+UPSTREAM_THROTTLE_SECONDS = REGISTRY.counter('yca_upstream_throttle_seconds_total',
+                                             'Time spent waiting for the client-side rate limit', ['upstream'])
+UPSTREAM_CIRCUIT_OPEN = REGISTRY.gauge('yca_upstream_circuit_open', '1 while the circuit breaker is not closed',
+                                       ['upstream'])
+STAGE_ACTIVE = REGISTRY.gauge('yca_stage_active', 'Analyses inside a limited stage', ['stage'])
+STAGE_WAITING = REGISTRY.gauge('yca_stage_waiting', 'Analyses waiting to enter a limited stage', ['stage'])
+STAGE_WAIT_SECONDS = REGISTRY.counter('yca_stage_wait_seconds_total', 'Time spent waiting for a stage slot',
+                                      ['stage'])
+
+def collect_metrics():
+    """Copy the state the pools, caches and upstreams keep themselves into the registry"""
+    for status, count in job_manager.stats().items():
+        JOBS.set(count, status=status)
+    pool = driver_pool.stats()
+    BROWSERS.set(pool['size'] - pool['idle'], state='busy')
+    BROWSERS.set(pool['idle'], state='idle')
+    BROWSER_STARTS.set(pool['started'])
+    BROWSER_RECYCLES.set(pool['recycled'])
+    BROWSER_CRASHES.set(pool['crashed'])
+    BROWSER_IDLE_PAGES.set(pool['idle_pages'])
+    BROWSER_IDLE_JS_HEAP.set(pool['idle_js_heap_bytes'])
+    transcript_cache = subtitle_downloader.cache.stats()
+    for event in ('hits', 'misses', 'negative_hits', 'evictions'):
+        CACHE_EVENTS.set(transcript_cache[event], cache='transcripts', event=event)
+    CACHE_BYTES.set(transcript_cache['total_bytes'])
+    response_cache = llm_cache.stats()
+    for event in ('hits', 'misses', 'evictions'):
+        CACHE_EVENTS.set(response_cache[event], cache='llm', event=event)
+    LLM_TOKENS_SAVED.set(response_cache['tokens_saved'])
+    for upstream in (transcript_upstream, llm_upstream):
+        upstream_stats = upstream.stats()
+        for event in ('calls', 'succeeded', 'failed', 'retries', 'throttled', 'upstream_errors', 'rejected'):
+            UPSTREAM_EVENTS.set(upstream_stats[event], upstream=upstream.name, event=event)
+        UPSTREAM_THROTTLE_SECONDS.set(upstream_stats['throttle_seconds'], upstream=upstream.name)
+        UPSTREAM_CIRCUIT_OPEN.set(upstream_stats['circuit'] != 'closed', upstream=upstream.name)
+    for stage, stage_stats in stage_limits.stats().items():
+        STAGE_ACTIVE.set(stage_stats['active'], stage=stage)
+        STAGE_WAITING.set(stage_stats['waiting'], stage=stage)
+        STAGE_WAIT_SECONDS.set(stage_stats['wait_seconds'], stage=stage)
+
+REGISTRY.add_collector(collect_metrics)
+
+def parse_number(value, name, cast=int, minimum=None):
+    """
+    Convert a request parameter to a number, raising ValueError with a message for the client
+
+    Args:
+        value: Raw query string or header value
+        name: Parameter name used in the error message
+        cast: int or float
+        minimum: Smallest accepted value, if any
+    """
+    try:
+        number = cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be a number, got {value!r}')
+    if not math.isfinite(number):
+        raise ValueError(f'{name} must be a finite number, got {value!r}')
+    if minimum is not None and number < minimum:
+        raise ValueError(f'{name} must be at least {minimum}, got {value!r}')
+    return number
 
 @app.route('/')
 def index():
@@ -28,10 +188,20 @@ def index():
 
 @app.route('/analyze', methods=['POST'])
 def analyze_channel():
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    try:
+        months_back = parse_number(data.get('months_back', 2), 'months_back', minimum=1)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     try:
-        data = request.get_json()
         channel_url = data.get('channel_url')
-        months_back = int(data.get('months_back', 2))
+        backend = data.get('backend', 'browser')
+        full_refresh = bool(data.get('full_refresh', False))
+        bypass_cache = bool(data.get('bypass_cache', False))
+        idea_mode = data.get('idea_mode', IDEA_GENERATION_MODE)
+        include_timings = bool(data.get('timings', False))
         
         logger.info(f"Analyzing channel: {channel_url} for past {months_back} months")
         
@@ -39,72 +209,380 @@ def analyze_channel():
             logger.error("Channel URL is missing")
             return jsonify({'error': 'Channel URL is required'}), 400
             
-        # Initialize scraper and get videos
-        logger.info("Starting video scraping...")
-        scraper = YouTubeScraper()
-        videos = scraper.get_channel_videos(channel_url, months_back)
-        scraper.close()
-        logger.info(f"Found {len(videos)} videos")
+        if backend not in YouTubeScraper.BACKENDS:
+            return jsonify({'error': f'Unknown scraper backend: {backend}'}), 400
+        if idea_mode not in IdeaGenerator.MODES:
+            return jsonify({'error': f'Unknown idea generation mode: {idea_mode}'}), 400
+            
+        # Concurrent requests for the same analysis share one run
+        job, coalesced = job_manager.submit_coalesced(
+            analysis_key(channel_url, months_back, idea_mode), run_analysis, channel_url, months_back,
+            backend, full_refresh, bypass_cache, idea_mode, include_timings,
+            reuse_seconds=ANALYSIS_REUSE_SECONDS, fresh=full_refresh or bypass_cache
+        )
+        return jsonify({
+            'job_id': job.id,
+            'status': job.status,
+            'coalesced': coalesced,
+            'status_url': url_for('get_job', job_id=job.id),
+            'events_url': url_for('job_events', job_id=job.id)
+        }), 202
         
-        if not videos:
-            logger.error("No videos found for the channel")
-            return jsonify({'error': 'No videos found'}), 404
+    except Exception as e:
+        logger.error(f"Error queuing analysis: {str(e)}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/metrics')
+def metrics():
+    """Stage latencies, cache, failure and token counters and browser usage in Prometheus text format"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Stream job progress as Server-Sent Events"""
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+        
+    try:
+        since = parse_number(request.headers.get('Last-Event-ID', -1), 'Last-Event-ID', minimum=-1) + 1
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    def generate():
+        for event in job_manager.stream(job, since=since):
+            if event is None:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
             
-        # Download subtitles for videos
-        logger.info("Starting subtitle downloads...")
-        subtitles_data = {}
-        for i, video in enumerate(videos, 1):
-            logger.info(f"Processing video {i}/{len(videos)}: {video['title']}")
-            subtitle_path = subtitle_downloader.download_subtitle(video['url'])
-            if subtitle_path:
-                subtitle_text = subtitle_downloader.get_subtitle_text(subtitle_path)
-                subtitles_data[video['url']] = subtitle_text
-                logger.info(f"Successfully downloaded subtitles for video {i}")
-            else:
-                logger.warning(f"No subtitles found for video {i}")
-                
-        # Generate content ideas
-        logger.info("Generating content ideas...")
-        ideas = idea_generator.analyze_video_data(videos, subtitles_data)
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def analysis_key(channel_url, months_back, idea_mode):
+    """Requests with the same key produce the same analysis"""
+    return ('analysis', normalize_channel_url(channel_url), int(months_back), idea_mode)
+
+def run_analysis(job, channel_url, months_back, backend='browser', full_refresh=False,
+                 bypass_cache=False, idea_mode=None, include_timings=False):
+    """
+    Run the full scrape, subtitle and idea pipeline for one job
+    
+    Every stage is timed into the /metrics histograms; with include_timings
+    the per-stage breakdown is also returned as 'timings'. Requests that
+    attach to a running analysis get whatever that run was started with.
+    """
+    timer = StageTimer(ANALYSIS_STAGE_SECONDS)
+    try:
+        result = _run_analysis(job, timer, channel_url, months_back, backend, full_refresh, bypass_cache,
+                               idea_mode)
+    except Exception:
+        ANALYSES.inc(outcome='failed')
+        raise
+    ANALYSES.inc(outcome='completed')
+    if include_timings:
+        result['timings'] = timer.breakdown()
+    return result
+
+def _run_analysis(job, timer, channel_url, months_back, backend, full_refresh, bypass_cache, idea_mode):
+    # Scrape and download subtitles as one pipeline: each video's subtitles
+    # are requested as soon as the scraper extracts it
+    logger.info("Starting video scraping and subtitle downloads...")
+    job.update('scraping', message='Scraping channel videos')
+    videos = []
+    scrape_timing = {}
+    subtitle_progress = {'done': 0, 'found': 0, 'failed': 0, 'scraping': True}
+    
+    def report_subtitles():
+        job.update('subtitles', videos_scraped=len(videos), subtitles_done=subtitle_progress['done'],
+                   subtitles_total=len(videos), subtitles_found=subtitle_progress['found'],
+                   subtitles_failed=subtitle_progress['failed'], scraping=subtitle_progress['scraping'])
         
-        # Save analysis results
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        results = {
-            'channel_url': channel_url,
-            'analysis_date': timestamp,
-            'videos_analyzed': len(videos),
-            'videos_with_subtitles': len(subtitles_data),
-            'video_data': videos,
-            'generated_ideas': ideas
-        }
+    def scraped_urls():
+        # The scraping slot (and browser) is given back as soon as scrolling
+        # ends, while this analysis' downloads carry on
+        wait_start = time.perf_counter()
+        with stage_limits.stage('scraping'):
+            timer.add('scraping_wait', time.perf_counter() - wait_start)
+            scraper = YouTubeScraper(pool=driver_pool, extraction_mode=SCRAPER_EXTRACTION_MODE,
+                                     backend=backend, http_client=http_client, channel_index=channel_index)
+            try:
+                for video in scraper.iter_channel_videos(channel_url, months_back, incremental=not full_refresh):
+                    videos.append(video)
+                    yield video['url']
+                scrape_timing.update(scraper.wait_stats, scrolls=len(scraper.scroll_stats))
+            finally:
+                # Active scraping only; pauses while downloads catch up are not counted
+                timer.add('scraping', scraper.scrape_seconds)
+                scraper.close()
+        subtitle_progress['scraping'] = False
+        logger.info(f"Found {len(videos)} videos")
+        report_subtitles()
         
-        # Save to CSV for video data
-        logger.info("Saving results to files...")
-        df = pd.DataFrame(videos)
-        csv_path = f'static/results/videos_{timestamp}.csv'
-        df.to_csv(csv_path, index=False)
-        logger.info(f"Saved video data to {csv_path}")
+    def on_subtitle(url, text, failed):
+        subtitle_progress['done'] += 1
+        if text is not None:
+            subtitle_progress['found'] += 1
+        elif failed:
+            subtitle_progress['failed'] += 1
+        else:
+            logger.warning(f"No subtitles found for {url}")
+        report_subtitles()
         
-        # Save complete results to JSON
-        json_path = f'static/results/analysis_{timestamp}.json'
-        with open(json_path, 'w') as f:
-            json.dump(results, f, indent=2)
-        logger.info(f"Saved analysis results to {json_path}")
+    try:
+        # Scraping and downloads overlap, so this is their combined wall time
+        with timer.stage('scraping_and_subtitles'):
+            subtitles_data = subtitle_downloader.download_many(
+                scraped_urls(),
+                on_result=on_subtitle,
+                max_pending=SUBTITLE_QUEUE_SIZE,
+                executor=subtitle_executor
+            )
+    except Exception as e:
+        logger.error(f"Error scraping channel videos: {e}")
+        raise
+    
+    if not videos:
+        logger.error("No videos found for the channel")
+        raise ValueError('No videos found')
+        
+    # Label transcripts in the search index with their channel and title
+    search_index.set_video_metadata(channel_url, videos)
+    
+    # Group videos into topics from their transcripts
+    job.update('topics', message='Clustering transcripts into topics', subtitles_found=len(subtitles_data))
+    with timer.stage('topics'):
+        topics = cluster_videos(videos, subtitles_data)
+    
+    # Keep one transcript per group of re-uploads, clips and cross-posts in the prompt
+    with timer.stage('duplicates'):
+        prompt_subtitles, duplicate_groups = duplicate_detector.deduplicate(videos, subtitles_data)
             
+    # Generate content ideas
+    logger.info("Generating content ideas...")
+    job.update('llm', message='Waiting for content ideas', videos_scraped=len(videos),
+               subtitles_found=len(subtitles_data))
+    # Forward ideas to the browser as they are generated; the full text is saved below
+    llm_timings = {}
+    wait_start = time.perf_counter()
+    with stage_limits.stage('llm'):
+        timer.add('llm_wait', time.perf_counter() - wait_start)
+        with timer.stage('llm'):
+            ideas = idea_generator.analyze_video_data(videos, prompt_subtitles, use_cache=not bypass_cache,
+                                                      mode=idea_mode,
+                                                      on_token=lambda text: job.emit_chunk('token', text),
+                                                      topics=topics, timings=llm_timings,
+                                                      duplicate_of=duplicate_of(duplicate_groups))
+    
+    # Save analysis results
+    job.update('saving', message='Saving results')
+    logger.info("Saving results to the database...")
+    with timer.stage('saving'):
+        analysis_id = storage.save_analysis(
+            channel_url, videos, subtitles_data, ideas, months_back=months_back,
+            extra={'scrape_timing': scrape_timing, 'topics': topics, 'duplicate_groups': duplicate_groups}
+        )
+    logger.info(f"Saved analysis {analysis_id}")
+        
+    return {
+        'success': True,
+        'analysis_id': analysis_id,
+        'video_count': len(videos),
+        'subtitle_count': len(subtitles_data),
+        # Downloads that went wrong, as opposed to videos without subtitles
+        'subtitle_failures': subtitle_progress['failed'],
+        'ideas': ideas,
+        'topics': topics,
+        'duplicate_groups': duplicate_groups,
+        'channel_summary': summarize_channel(videos, months_back),
+        'analysis_url': f'/analyses/{analysis_id}',
+        'videos_url': f'/analyses/{analysis_id}/videos',
+        'charts_url': f'/analyses/{analysis_id}/charts',
+        'csv_url': f'/analyses/{analysis_id}/export.csv',
+        'json_url': f'/analyses/{analysis_id}/export.json',
+        'subtitle_cache': subtitle_downloader.cache.stats(),
+        'llm_cache': llm_cache.stats(),
+        'upstreams': {'transcripts': transcript_upstream.stats(), 'llm': llm_upstream.stats()},
+        'scrape_timing': scrape_timing,
+        'llm_usage': llm_timings
+    }
+
+@app.route('/batches', methods=['POST'])
+def analyze_batch():
+    """Queue analyses for several channels and compare them once they finish"""
+    try:
+        data = request.get_json() or {}
+        channels = parse_channels(data.get('channels'), int(data.get('months_back', 2)))
+        backend = data.get('backend', 'browser')
+        idea_mode = data.get('idea_mode', IDEA_GENERATION_MODE)
+        if backend not in YouTubeScraper.BACKENDS:
+            return jsonify({'error': f'Unknown scraper backend: {backend}'}), 400
+        if idea_mode not in IdeaGenerator.MODES:
+            return jsonify({'error': f'Unknown idea generation mode: {idea_mode}'}), 400
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+        
+    full_refresh = bool(data.get('full_refresh', False))
+    bypass_cache = bool(data.get('bypass_cache', False))
+    batch = batch_manager.submit(
+        run_analysis, channels,
+        key_for=lambda channel: analysis_key(channel['channel_url'], channel['months_back'], idea_mode),
+        reuse_seconds=ANALYSIS_REUSE_SECONDS, fresh=full_refresh or bypass_cache,
+        backend=backend, full_refresh=full_refresh, bypass_cache=bypass_cache, idea_mode=idea_mode
+    )
+    return jsonify({
+        'batch_id': batch.id,
+        'status': batch.status,
+        'status_url': url_for('get_batch', batch_id=batch.id),
+        'jobs': [
+            {'channel_url': channel['channel_url'], 'job_id': job.id,
+             'events_url': url_for('job_events', job_id=job.id)}
+            for channel, job in zip(batch.channels, batch.jobs)
+        ]
+    }), 202
+
+@app.route('/batches/<batch_id>')
+def get_batch(batch_id):
+    """Per-channel status and results plus the cross-channel comparison table"""
+    batch = batch_manager.get(batch_id)
+    if not batch:
+        return jsonify({'error': 'Batch not found'}), 404
+    return jsonify(dict(batch.to_dict(), stage_limits=stage_limits.stats()))
+
+@app.route('/batches/<batch_id>/comparison.csv')
+def export_batch_comparison(batch_id):
+    batch = batch_manager.get(batch_id)
+    if not batch:
+        return jsonify({'error': 'Batch not found'}), 404
+    return Response(batch.comparison_frame().to_csv(index=False), mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename=comparison_{batch_id}.csv'})
+
+@app.route('/videos/<video_id>/transcript')
+def get_video_transcript(video_id):
+    """Timestamped transcript segments between start and end (in seconds)"""
+    try:
+        start = parse_number(request.args.get('start', 0), 'start', cast=float, minimum=0)
+        end = request.args.get('end')
+        if end is not None:
+            end = parse_number(end, 'end', cast=float, minimum=start)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    reader = subtitle_downloader.segment_store.open(video_id)
+    if not reader:
+        return jsonify({'error': 'No timestamped transcript stored for this video'}), 404
+    with reader:
+        segments = reader.slice(start, end)
         return jsonify({
-            'success': True,
-            'video_count': len(videos),
-            'subtitle_count': len(subtitles_data),
-            'ideas': ideas,
-            'csv_file': f'videos_{timestamp}.csv',
-            'json_file': f'analysis_{timestamp}.json'
+            'video_id': video_id,
+            'start': start,
+            'end': end if end is not None else reader.duration,
+            'segments': segments,
+            'text': ' '.join(segment['text'] for segment in segments if segment['text'])
         })
+
+@app.route('/search')
+def search_transcripts():
+    """Ranked transcript hits for q across all channels, or one channel_url"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Please provide a search query'}), 400
+    try:
+        limit = min(parse_number(request.args.get('limit', 20), 'limit', minimum=1), 100)
+        offset = parse_number(request.args.get('offset', 0), 'offset', minimum=0)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    start = time.perf_counter()
+    results = search_index.search(query, channel_url=request.args.get('channel_url'), limit=limit, offset=offset)
+    return jsonify({
+        'query': query,
+        'took_ms': round((time.perf_counter() - start) * 1000, 2),
+        'results': results
+    })
+
+@app.route('/analyses')
+def list_analyses():
+    """Analysis history, newest first, optionally filtered by channel_url"""
+    try:
+        limit = min(parse_number(request.args.get('limit', 50), 'limit', minimum=1), 500)
+        offset = parse_number(request.args.get('offset', 0), 'offset', minimum=0)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(storage.list_analyses(request.args.get('channel_url'), limit=limit, offset=offset))
+
+@app.route('/analyses/<int:analysis_id>')
+def get_analysis(analysis_id):
+    analysis = storage.get_analysis(analysis_id)
+    if not analysis:
+        return jsonify({'error': 'Analysis not found'}), 404
+    return jsonify(analysis)
+
+@app.route('/analyses/<int:analysis_id>/videos')
+def get_analysis_videos(analysis_id):
+    """One page of an analysis' videos, filtered by title (q) and sorted"""
+    sort = request.args.get('sort', 'views-desc')
+    if sort not in SORT_OPTIONS:
+        return jsonify({'error': f'Unknown sort option: {sort}'}), 400
+    try:
+        page_number = parse_number(request.args.get('page', 1), 'page')
+        per_page = parse_number(request.args.get('per_page', 50), 'per_page')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    page = analysis_queries.videos(
+        analysis_id,
+        query=request.args.get('q', '').strip(),
+        sort=sort,
+        page=page_number,
+        per_page=per_page
+    )
+    if page is None:
+        return jsonify({'error': 'Analysis not found'}), 404
+    response = jsonify(page)
+    response.add_etag()
+    return response.make_conditional(request)
+
+@app.route('/analyses/<int:analysis_id>/charts')
+def get_analysis_charts(analysis_id):
+    """Precomputed chart aggregates; unchanged results are answered with 304"""
+    charts = analysis_queries.charts(analysis_id)
+    if charts is None:
+        return jsonify({'error': 'Analysis not found'}), 404
+    body, etag = charts
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+@app.route('/analyses/<int:analysis_id>/export.<fmt>')
+def export_analysis(analysis_id, fmt):
+    """Generate the CSV (videos) or JSON (full results) download on demand"""
+    analysis = storage.get_analysis(analysis_id)
+    if not analysis:
+        return jsonify({'error': 'Analysis not found'}), 404
         
-    except Exception as e:
-        logger.error(f"Error during analysis: {str(e)}", exc_info=True)
-        return jsonify({'error': str(e)}), 500
+    filename = f"analysis_{analysis['analysis_date']}"
+    if fmt == 'csv':
+        body = pd.DataFrame(analysis['video_data']).to_csv(index=False)
+        mimetype = 'text/csv'
+        filename = f"videos_{analysis['analysis_date']}"
+    elif fmt == 'json':
+        body = json.dumps(analysis, indent=2)
+        mimetype = 'application/json'
+    else:
+        return jsonify({'error': f'Unsupported export format: {fmt}'}), 400
+        
+    return Response(body, mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}.{fmt}'})
 
 if __name__ == '__main__':
-    # Create results directory if it doesn't exist
-    os.makedirs('static/results', exist_ok=True)
-    app.run(debug=True)
+    app.run(debug=True, threaded=True)
@@ -0,0 +1,281 @@
+import pandas as pd
+import argparse
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterator, List, Optional
+from channel_index import normalize_channel_url
+from job_manager import Job, JobManager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_CHANNELS = 100
+# Columns of the cross-channel comparison table, in display order
+COMPARISON_COLUMNS = ("channel_url", "months_back", "status", "video_count", "subtitle_count",
+                      "total_views", "mean_views", "median_views", "median_views_per_day",
+                      "uploads_per_week", "mean_duration_minutes", "top_video", "top_topic", "analysis_id")
+INTEGER_COLUMNS = ("video_count", "subtitle_count", "total_views", "mean_views", "median_views", "analysis_id")
+
+class StageLimiter:
+    def __init__(self, limits: Dict[str, int]):
+        """
+        Cap how many analyses are inside each pipeline stage at the same time
+
+        Args:
+            limits: Maximum concurrent holders per stage name, e.g.
+                {"scraping": 2, "llm": 2}. Stages not listed are unlimited.
+        """
+        self._semaphores = {stage: threading.BoundedSemaphore(limit) for stage, limit in limits.items()}
+        self._stats = {
+            stage: {"limit": limit, "active": 0, "waiting": 0, "entered": 0, "wait_seconds": 0.0}
+            for stage, limit in limits.items()
+        }
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Hold one slot of a stage for the duration of the with block"""
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            yield
+            return
+
+        stats = self._stats[name]
+        with self._lock:
+            stats["waiting"] += 1
+        start = time.perf_counter()
+        semaphore.acquire()
+        with self._lock:
+            stats["waiting"] -= 1
+            stats["active"] += 1
+            stats["entered"] += 1
+            stats["wait_seconds"] += time.perf_counter() - start
+        try:
+            yield
+        finally:
+            with self._lock:
+                stats["active"] -= 1
+            semaphore.release()
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                stage: dict(stats, wait_seconds=round(stats["wait_seconds"], 3))
+                for stage, stats in self._stats.items()
+            }
+
+def parse_channels(entries: List, default_months_back: int = 2) -> List[Dict]:
+    """
+    Normalize batch input into [{"channel_url", "months_back"}]
+
+    Entries may be channel URL strings or {"channel_url", "months_back"}
+    dictionaries. Repeated (channel, months_back) pairs are analyzed once.
+    """
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("Please provide a non-empty list of channels")
+    if len(entries) > MAX_BATCH_CHANNELS:
+        raise ValueError(f"A batch can hold at most {MAX_BATCH_CHANNELS} channels")
+
+    channels = []
+    seen = set()
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"channel_url": entry}
+        if not isinstance(entry, dict) or not str(entry.get("channel_url") or "").strip():
+            raise ValueError(f"Invalid channel entry: {entry!r}")
+        channel = {
+            "channel_url": entry["channel_url"].strip(),
+            "months_back": int(entry.get("months_back", default_months_back)),
+        }
+        if channel["months_back"] < 1:
+            raise ValueError(f"months_back must be at least 1 for {channel['channel_url']}")
+        key = (normalize_channel_url(channel["channel_url"]), channel["months_back"])
+        if key not in seen:
+            seen.add(key)
+            channels.append(channel)
+    return channels
+
+class Batch:
+    """Analyses of several channels submitted together"""
+
+    def __init__(self, batch_id: str, channels: List[Dict], jobs: List[Job]):
+        self.id = batch_id
+        self.channels = channels
+        self.jobs = jobs
+        self.created_at = time.time()
+
+    @property
+    def done(self) -> bool:
+        return all(job.done for job in self.jobs)
+
+    @property
+    def finished_at(self) -> Optional[float]:
+        if not self.done:
+            return None
+        return max((job.finished_at for job in self.jobs), default=self.created_at)
+
+    @property
+    def status(self) -> str:
+        if not self.done:
+            return "running"
+        failed = sum(job.status == "failed" for job in self.jobs)
+        if not failed:
+            return "completed"
+        return "failed" if failed == len(self.jobs) else "partial"
+
+    def wait(self, poll_seconds: float = 5.0):
+        """Block until every channel's analysis has finished"""
+        for job in self.jobs:
+            while not job.done:
+                job.wait_for_events(job.next_event_id, poll_seconds)
+
+    def comparison(self) -> List[Dict]:
+        """One row per channel, most median views per day first; unfinished channels last"""
+        rows = []
+        for channel, job in zip(self.channels, self.jobs):
+            result = job.result or {}
+            summary = result.get("channel_summary") or {}
+            top_video = summary.get("top_video") or {}
+            clusters = (result.get("topics") or {}).get("clusters") or []
+            rows.append({
+                "channel_url": channel["channel_url"],
+                "months_back": channel["months_back"],
+                "status": job.status,
+                "video_count": summary.get("video_count"),
+                "subtitle_count": result.get("subtitle_count"),
+                "total_views": summary.get("total_views"),
+                "mean_views": summary.get("mean_views"),
+                "median_views": summary.get("median_views"),
+                "median_views_per_day": summary.get("median_views_per_day"),
+                "uploads_per_week": summary.get("uploads_per_week"),
+                "mean_duration_minutes": summary.get("mean_duration_minutes"),
+                "top_video": top_video.get("title"),
+                "top_topic": ", ".join(clusters[0]["keywords"][:4]) if clusters else None,
+                "analysis_id": result.get("analysis_id"),
+            })
+        rows.sort(key=lambda row: row["median_views_per_day"] if row["median_views_per_day"] is not None
+                  else float("-inf"), reverse=True)
+        return rows
+
+    def comparison_frame(self) -> pd.DataFrame:
+        frame = pd.DataFrame(self.comparison(), columns=list(COMPARISON_COLUMNS))
+        # Nullable integers, so failed channels do not turn every count into a float
+        for column in INTEGER_COLUMNS:
+            frame[column] = frame[column].astype("Int64")
+        return frame
+
+    def to_dict(self) -> Dict:
+        return {
+            "batch_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "channels": [
+                {
+                    **channel,
+                    "job_id": job.id,
+                    "status": job.status,
+                    "stage": job.stage,
+                    "analysis_id": (job.result or {}).get("analysis_id"),
+                    "error": job.error,
+                }
+                for channel, job in zip(self.channels, self.jobs)
+            ],
+            "comparison": self.comparison(),
+        }
+
+class BatchManager:
+    def __init__(self, job_manager: JobManager, retention_seconds: int = 3600):
+        """
+        Run multi-channel batches as ordinary jobs on a shared JobManager
+
+        Each channel becomes one job, so batches share the job pool (and the
+        browser, subtitle and LLM limits inside it) with single analyses.
+
+        Args:
+            job_manager: Pool the per-channel analyses run on
+            retention_seconds: How long finished batches stay queryable
+        """
+        self.job_manager = job_manager
+        self.retention_seconds = retention_seconds
+        self._batches: Dict[str, Batch] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable, channels: List[Dict], key_for: Optional[Callable[[Dict], Hashable]] = None,
+               reuse_seconds: float = 0, fresh: bool = False, **kwargs) -> Batch:
+        """
+        Queue `func(job, channel_url, months_back, **kwargs)` for every channel
+
+        With key_for, channels are submitted through
+        JobManager.submit_coalesced, so a channel already being analyzed (or
+        analyzed within reuse_seconds) shares that job's result.
+        """
+        self._prune()
+        jobs = []
+        for channel in channels:
+            args = (func, channel["channel_url"], channel["months_back"])
+            if key_for:
+                job, _ = self.job_manager.submit_coalesced(key_for(channel), *args, reuse_seconds=reuse_seconds,
+                                                           fresh=fresh, **kwargs)
+            else:
+                job = self.job_manager.submit(*args, **kwargs)
+            jobs.append(job)
+        batch = Batch(uuid.uuid4().hex, channels, jobs)
+        with self._lock:
+            self._batches[batch.id] = batch
+        logger.info(f"Queued batch {batch.id} with {len(channels)} channels")
+        return batch
+
+    def get(self, batch_id: str) -> Optional[Batch]:
+        with self._lock:
+            return self._batches.get(batch_id)
+
+    def _prune(self):
+        """Forget finished batches older than the retention window"""
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [
+                batch_id for batch_id, batch in self._batches.items()
+                if batch.finished_at and batch.finished_at < cutoff
+            ]
+            for batch_id in expired:
+                del self._batches[batch_id]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze several YouTube channels and compare them")
+    parser.add_argument("channels", nargs="*", help="Channel URLs")
+    parser.add_argument("--file", help="File with one channel URL per line, optionally followed by months_back")
+    parser.add_argument("--months", type=int, default=2, help="Months to analyze for channels without their own value")
+    parser.add_argument("--backend", default="browser", choices=["browser", "http"], help="Scraper backend")
+    parser.add_argument("--output", help="Write the comparison table to this CSV file")
+    args = parser.parse_args()
+
+    entries: List = list(args.channels)
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split("#", 1)[0].split()
+                if parts:
+                    entries.append({"channel_url": parts[0], "months_back": int(parts[1]) if len(parts) > 1
+                                    else args.months})
+
+    # Imported here so the web app's shared pools are only created for CLI runs
+    from app import ANALYSIS_REUSE_SECONDS, IDEA_GENERATION_MODE, analysis_key, batch_manager, run_analysis
+    batch = batch_manager.submit(
+        run_analysis, parse_channels(entries, args.months),
+        key_for=lambda channel: analysis_key(channel["channel_url"], channel["months_back"], IDEA_GENERATION_MODE),
+        reuse_seconds=ANALYSIS_REUSE_SECONDS, backend=args.backend, idea_mode=IDEA_GENERATION_MODE
+    )
+    batch.wait()
+
+    for channel in batch.to_dict()["channels"]:
+        if channel["error"]:
+            print(f"{channel['channel_url']}: failed: {channel['error']}")
+    frame = batch.comparison_frame()
+    print(frame.drop(columns=["analysis_id"]).to_string(index=False))
+    if args.output:
+        frame.to_csv(args.output, index=False)
+        print(f"Saved comparison of {len(frame)} channels to {args.output}")
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def normalize_channel_url(channel_url: str) -> str:
+    """
+    Reduce a channel URL to a stable form, e.g. youtube.com/@name
+
+    Only the host and @handles are case-insensitive; /channel/UC... ids and
+    other path segments keep their case.
+    """
+    url = re.sub(r'^https?://', '', channel_url.strip(), flags=re.IGNORECASE)
+    url = url.split('?')[0].split('#')[0].rstrip('/')
+    host, _, path = url.partition('/')
+    host = re.sub(r'^(www\.|m\.)', '', host.lower())
+    segments = [segment.lower() if segment.startswith('@') else segment for segment in path.split('/')]
+    if segments and segments[-1].lower() == 'videos':
+        segments.pop()
+    return '/'.join([host] + segments).rstrip('/')
+
+class ChannelIndex:
+    def __init__(self, index_dir: str = "channel_index"):
+        """
+        Persisted per-channel record of known videos and their last-seen metadata
+
+        Args:
+            index_dir: Directory holding one JSON file per channel
+        """
+        self.index_dir = index_dir
+        self._lock = threading.Lock()
+        os.makedirs(index_dir, exist_ok=True)
+
+    def _path(self, channel_url: str) -> str:
+        key = normalize_channel_url(channel_url)
+        slug = re.sub(r'[^0-9A-Za-z_-]+', '_', key.split('/')[-1].lstrip('@'))[:40]
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+        return os.path.join(self.index_dir, f"{slug}_{digest}.json")
+
+    def load(self, channel_url: str) -> Dict[str, Dict]:
+        """Return known videos keyed by video ID"""
+        return self.load_record(channel_url).get('videos', {})
+
+    def load_record(self, channel_url: str) -> Dict:
+        """
+        Return the stored record for a channel
+
+        Besides 'videos' it holds 'covered_since' and 'scraped_at' (ISO
+        timestamps, absent for channels indexed before they were recorded):
+        every upload between the two was scraped, so the index is complete
+        for that range.
+        """
+        path = self._path(channel_url)
+        with self._lock:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                return {}
+            except Exception as e:
+                logger.error(f"Error loading channel index {path}: {e}")
+                return {}
+
+    def save(self, channel_url: str, videos: Dict[str, Dict], covered_since: Optional[str] = None,
+             scraped_at: Optional[str] = None):
+        """Replace the known videos for a channel and the range they completely cover"""
+        path = self._path(channel_url)
+        tmp_path = f"{path}.tmp"
+        record = {'channel_url': normalize_channel_url(channel_url), 'videos': videos}
+        if covered_since and scraped_at:
+            record.update(covered_since=covered_since, scraped_at=scraped_at)
+        with self._lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f)
+            os.replace(tmp_path, path)
+        logger.info(f"Saved {len(videos)} known videos to {path}")
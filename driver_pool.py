@@ -0,0 +1,196 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+import logging
+import threading
+import time
+from typing import List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_driver_path = None
+_driver_path_resolved = False
+_driver_path_lock = threading.Lock()
+
+def resolve_driver_path() -> Optional[str]:
+    """Resolve the chromedriver binary once per process and reuse it afterwards"""
+    global _driver_path, _driver_path_resolved
+    with _driver_path_lock:
+        if not _driver_path_resolved:
+            try:
+                _driver_path = ChromeDriverManager().install()
+            except Exception as e:
+                logger.error(f"Error with ChromeDriverManager: {e}")
+                _driver_path = None
+            _driver_path_resolved = True
+        return _driver_path
+
+def create_driver():
+    """Start a headless Chrome WebDriver with appropriate options"""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")  # New headless mode
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")  # Disable GPU hardware acceleration
+    chrome_options.add_argument("--window-size=1920,1080")  # Set window size
+    chrome_options.add_argument("--ignore-certificate-errors")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+
+    driver_path = resolve_driver_path()
+    if driver_path:
+        try:
+            return webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+        except Exception as e:
+            logger.error(f"Error starting Chrome with {driver_path}: {e}")
+    try:
+        # Fallback to direct Chrome instantiation
+        return webdriver.Chrome(options=chrome_options)
+    except Exception as e:
+        logger.error(f"Error creating Chrome driver: {e}")
+        raise
+
+class PooledDriver:
+    """A WebDriver owned by a DriverPool together with its usage counters"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.time()
+        self.broken = False
+        # Renderer JavaScript heap, measured each time the browser is returned
+        self.js_heap_bytes = 0
+
+class DriverPool:
+    def __init__(self, max_size: int = 2, max_pages: int = 50, checkout_timeout: float = 300):
+        """
+        Pool of warm headless Chrome instances shared between scrapers
+
+        Args:
+            max_size: Maximum number of browsers alive at the same time
+            max_pages: Pages a browser may load before it is replaced
+            checkout_timeout: Seconds to wait for a free browser before giving up
+        """
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.checkout_timeout = checkout_timeout
+        self._idle: List[PooledDriver] = []
+        self._size = 0
+        self.started = 0
+        # Replaced after max_pages, and discarded after crashing or failing a health check
+        self.recycled = 0
+        self.crashed = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def acquire(self) -> PooledDriver:
+        """Check out a healthy browser, starting one if the pool has room"""
+        deadline = time.time() + self.checkout_timeout
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is closed")
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        pooled = None
+                        break
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a free browser")
+                    self._condition.wait(remaining)
+            if pooled is None:
+                break
+
+            # Talk to the browser outside the lock: a hung one must not block other checkouts
+            if self._is_healthy(pooled):
+                return pooled
+            logger.warning("Discarding unhealthy pooled browser")
+            with self._condition:
+                self.crashed += 1
+            self._discard(pooled)
+
+        # Start the browser outside the lock so other checkouts are not blocked
+        try:
+            pooled = PooledDriver(create_driver())
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        logger.info("Started new pooled browser")
+        with self._condition:
+            self.started += 1
+        return pooled
+
+    def release(self, pooled: PooledDriver):
+        """Return a browser to the pool, recycling it if worn out or crashed"""
+        if not pooled.broken:
+            pooled.js_heap_bytes = self._js_heap_bytes(pooled)
+        with self._condition:
+            retire = self._closed or pooled.broken or pooled.pages >= self.max_pages
+            if not retire:
+                self._idle.append(pooled)
+                self._condition.notify()
+            elif pooled.broken:
+                self.crashed += 1
+            elif not self._closed:
+                logger.info(f"Recycling pooled browser after {pooled.pages} pages")
+                self.recycled += 1
+        if retire:
+            self._discard(pooled)
+
+    def close(self):
+        """Quit every idle browser and stop handing out new ones"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+    def stats(self):
+        with self._condition:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "started": self.started,
+                "recycled": self.recycled,
+                "crashed": self.crashed,
+                # Only idle browsers can be inspected without disturbing a scrape
+                "idle_pages": sum(pooled.pages for pooled in self._idle),
+                "idle_js_heap_bytes": sum(pooled.js_heap_bytes for pooled in self._idle),
+            }
+
+    @staticmethod
+    def _js_heap_bytes(pooled: PooledDriver) -> int:
+        """Chrome's used JS heap for the current page, 0 when it cannot be read"""
+        try:
+            return int(pooled.driver.execute_script(
+                "return (performance.memory && performance.memory.usedJSHeapSize) || 0"
+            ) or 0)
+        except Exception:
+            return 0
+
+    def _discard(self, pooled: PooledDriver):
+        """Quit a browser and free its slot; called without holding the lock"""
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.error(f"Error closing pooled browser: {e}")
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def _is_healthy(self, pooled: PooledDriver) -> bool:
+        try:
+            pooled.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
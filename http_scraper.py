@@ -0,0 +1,168 @@
+import requests
+from requests.adapters import HTTPAdapter
+import json
+import logging
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BROWSE_API_URL = "https://www.youtube.com/youtubei/v1/browse"
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+def extract_initial_data(html: str) -> Optional[Dict]:
+    """Pull the ytInitialData JSON object embedded in a YouTube page"""
+    match = re.search(r'(?:var\s+ytInitialData|window\["ytInitialData"\])\s*=\s*', html)
+    if not match:
+        return None
+    try:
+        data, _ = json.JSONDecoder().raw_decode(html, match.end())
+        return data
+    except ValueError as e:
+        logger.error(f"Error decoding ytInitialData: {e}")
+        return None
+
+def extract_innertube_config(html: str) -> Tuple[Optional[str], Optional[str]]:
+    """Find the InnerTube API key and web client version needed for continuations"""
+    api_key = re.search(r'"INNERTUBE_API_KEY"\s*:\s*"([^"]+)"', html)
+    client_version = re.search(r'"INNERTUBE_CLIENT_VERSION"\s*:\s*"([^"]+)"', html)
+    return (
+        api_key.group(1) if api_key else None,
+        client_version.group(1) if client_version else None,
+    )
+
+def _text(node: Optional[Dict]) -> str:
+    """Read a YouTube text node, which is either simpleText or a list of runs"""
+    if not node:
+        return ""
+    if "simpleText" in node:
+        return node["simpleText"]
+    return "".join(run.get("text", "") for run in node.get("runs", []))
+
+def parse_video_renderer(renderer: Dict) -> Optional[Dict]:
+    """Convert a videoRenderer into the same dict YouTubeScraper produces"""
+    video_id = renderer.get("videoId")
+    title = _text(renderer.get("title")).strip()
+    if not video_id or not title:
+        return None
+
+    views_text = _text(renderer.get("shortViewCountText")) or _text(renderer.get("viewCountText"))
+    views = views_text.lower().replace("views", "").replace("view", "").strip() or "0"
+    upload_date = _text(renderer.get("publishedTimeText")).lower() or "Unknown"
+
+    duration = _text(renderer.get("lengthText")).strip()
+    if not duration:
+        for overlay in renderer.get("thumbnailOverlays", []):
+            status = overlay.get("thumbnailOverlayTimeStatusRenderer")
+            if status:
+                duration = _text(status.get("text")).strip()
+                break
+
+    thumbnails = renderer.get("thumbnail", {}).get("thumbnails", [])
+    thumbnail_url = thumbnails[-1].get("url") if thumbnails else None
+
+    return {
+        "title": title,
+        "url": f"https://www.youtube.com/watch?v={video_id}",
+        "views": views,
+        "upload_date": upload_date,
+        "duration": duration,
+        "thumbnail_url": thumbnail_url,
+    }
+
+def parse_grid_items(items: List[Dict]) -> Tuple[List[Dict], Optional[str]]:
+    """Parse a list of rich grid items into videos plus the next continuation token"""
+    videos = []
+    continuation = None
+    for item in items:
+        renderer = item.get("richItemRenderer", {}).get("content", {}).get("videoRenderer")
+        if renderer:
+            video = parse_video_renderer(renderer)
+            if video:
+                videos.append(video)
+            continue
+        token = (
+            item.get("continuationItemRenderer", {})
+            .get("continuationEndpoint", {})
+            .get("continuationCommand", {})
+            .get("token")
+        )
+        if token:
+            continuation = token
+    return videos, continuation
+
+def parse_initial_videos(data: Dict) -> Tuple[List[Dict], Optional[str]]:
+    """Find the Videos tab grid in ytInitialData and parse its first page"""
+    tabs = data.get("contents", {}).get("twoColumnBrowseResultsRenderer", {}).get("tabs", [])
+    for tab in tabs:
+        tab_renderer = tab.get("tabRenderer", {})
+        grid = tab_renderer.get("content", {}).get("richGridRenderer")
+        if grid:
+            return parse_grid_items(grid.get("contents", []))
+    return [], None
+
+def parse_continuation_response(data: Dict) -> Tuple[List[Dict], Optional[str]]:
+    """Parse a browse API continuation response into videos and the next token"""
+    items = []
+    for action in data.get("onResponseReceivedActions", []):
+        append = action.get("appendContinuationItemsAction") or action.get("reloadContinuationItemsCommand")
+        if append:
+            items.extend(append.get("continuationItems", []))
+    return parse_grid_items(items)
+
+class ChannelPageClient:
+    def __init__(self, timeout: float = 15, pool_size: int = 10):
+        """
+        Fetch channel video listings over plain HTTP instead of a browser
+
+        Args:
+            timeout: Seconds before an HTTP request is abandoned
+            pool_size: Connections kept alive per host in the shared session
+        """
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(DEFAULT_HEADERS)
+        # Skip the EU cookie consent interstitial
+        self.session.cookies.set("CONSENT", "YES+1", domain=".youtube.com")
+
+    def iter_video_pages(self, videos_url: str, max_pages: int = 200) -> Iterator[List[Dict]]:
+        """Yield the channel's videos one page at a time, newest first"""
+        response = self.session.get(videos_url, params={"hl": "en"}, timeout=self.timeout)
+        response.raise_for_status()
+        html = response.text
+
+        data = extract_initial_data(html)
+        if not data:
+            logger.error(f"Could not find ytInitialData at {videos_url}")
+            return
+        videos, continuation = parse_initial_videos(data)
+        yield videos
+
+        api_key, client_version = extract_innertube_config(html)
+        pages = 1
+        while continuation and pages < max_pages:
+            if not client_version:
+                logger.error("Could not find InnerTube client version for continuations")
+                return
+            payload = {
+                "context": {"client": {"clientName": "WEB", "clientVersion": client_version, "hl": "en"}},
+                "continuation": continuation,
+            }
+            params = {"key": api_key, "prettyPrint": "false"} if api_key else {"prettyPrint": "false"}
+            response = self.session.post(BROWSE_API_URL, params=params, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            videos, continuation = parse_continuation_response(response.json())
+            pages += 1
+            yield videos
+
+    def close(self):
+        self.session.close()
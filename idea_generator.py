@@ -1,14 +1,61 @@
 import openai
 import pandas as pd
+import hashlib
 import json
 import logging
-from typing import List, Dict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional, Tuple
+from llm_cache import LLMResponseCache
+from prompt_builder import PromptBuilder, compress_transcript, count_tokens
+from video_metrics import rank_by_views
+from topic_clustering import format_topics_for_prompt
+from resilience import Upstream, UpstreamUnavailable
+from metrics import REGISTRY
+from storage import video_id_from_url
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Only stable fields: summaries are cached per video and transcript, while
+# views and other changing metrics go into the reduce prompt
+VIDEO_SUMMARY_PROMPT = """
+Summarize this YouTube video for a content strategist.
+
+Title: {title}
+
+Transcript excerpt:
+{transcript}
+
+In under 150 words, describe the topic, the hook used in the opening, how the video is
+structured, and what is most likely driving its views.
+"""
+
+# "call" is "ideas" for the final completion and "summary" for map step summaries
+LLM_SECONDS = REGISTRY.histogram("yca_llm_request_seconds", "Chat completion latency, streamed or not", ["call"])
+LLM_CALLS = REGISTRY.counter("yca_llm_calls_total", "Chat completions by outcome", ["call", "outcome"])
+LLM_TOKENS = REGISTRY.counter("yca_llm_tokens_total", "Tokens used by chat completions not served from cache",
+                              ["call"])
+PROMPT_SECONDS = REGISTRY.histogram(
+    "yca_prompt_build_seconds", "Time to build the ideas prompt, not counting LLM calls", ["mode"]
+)
+MAP_STEP_SECONDS = REGISTRY.histogram("yca_map_step_seconds", "Wall time of the concurrent per-video summaries")
+
+def is_retryable_openai_error(error: Exception) -> bool:
+    """Rate limits, timeouts, connection problems and server errors are transient"""
+    if isinstance(error, (openai.error.RateLimitError, openai.error.APIConnectionError, openai.error.Timeout,
+                          openai.error.ServiceUnavailableError, openai.error.TryAgain)):
+        return True
+    return isinstance(error, openai.error.APIError) and (error.http_status or 500) >= 500
+
 class IdeaGenerator:
-    def __init__(self, api_key: str, max_videos: int = 3, subtitle_chars: int = 1000):
+    MODES = ("single", "map_reduce")
+    
+    def __init__(self, api_key: str, max_videos: int = 3, subtitle_chars: int = 1000,
+                 model: str = "chatgpt-4o-latest", cache: Optional[LLMResponseCache] = None,
+                 token_budget: Optional[int] = None, mode: str = "single",
+                 map_workers: int = 4, map_tokens: int = 3000, api_base: Optional[str] = None,
+                 upstream: Optional[Upstream] = None):
         """
         Initialize OpenAI client with API key
         
@@ -16,19 +63,62 @@ class IdeaGenerator:
             api_key: OpenAI API key
             max_videos: Maximum number of videos to include subtitles for
             subtitle_chars: Maximum number of characters to include from each subtitle
+            model: Chat completion model to use
+            cache: Optional response cache so identical prompts are not sent twice
+            token_budget: Optional total prompt size in tokens. When set, subtitles
+                are compressed to fit instead of being cut at subtitle_chars, and the
+                video table is trimmed to the most viewed videos that fit
+            mode: "single" sends one prompt with all subtitles, "map_reduce"
+                summarizes each video concurrently and generates ideas from the summaries
+            map_workers: Maximum concurrent per-video summary calls in map_reduce mode
+            map_tokens: Transcript tokens sent with each per-video summary call
+            api_base: Optional OpenAI-compatible endpoint, e.g. a local stub server
+            upstream: Rate limit, retry and circuit breaker settings for LLM calls
         """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown analysis mode: {mode}")
         openai.api_key = api_key
+        if api_base:
+            openai.api_base = api_base
         self.max_videos = max_videos
         self.subtitle_chars = subtitle_chars
+        self.model = model
+        self.cache = cache
+        self.prompt_builder = PromptBuilder(token_budget) if token_budget else None
+        self.mode = mode
+        self.map_workers = map_workers
+        self.map_tokens = map_tokens
+        self.upstream = upstream or Upstream("llm", is_retryable_openai_error, rate=2, burst=4)
         
-    def analyze_video_data(self, videos_data: List[Dict], subtitles_data: Dict[str, str]) -> str:
+    def analyze_video_data(self, videos_data: List[Dict], subtitles_data: Dict[str, str],
+                           use_cache: bool = True, mode: Optional[str] = None,
+                           on_token: Optional[Callable[[str], None]] = None,
+                           topics: Optional[Dict] = None, timings: Optional[Dict] = None,
+                           duplicate_of: Optional[Dict[str, str]] = None) -> str:
         """
         Analyze video data and subtitles to generate content ideas
         
         Args:
             videos_data: List of video metadata dictionaries
             subtitles_data: Dictionary mapping video URLs to subtitle text
+            use_cache: Set to False to bypass the response cache for this request
+            mode: Optional override of the generator's analysis mode
+            on_token: Optional callback receiving the ideas text as it is generated;
+                the completion is streamed when set and the full text is still returned
+            topics: Optional topic clusters from topic_clustering.cluster_videos,
+                summarized into the prompt
+            timings: Optional dictionary filled for this request with the seconds
+                spent building the prompt (without LLM calls), in the map step
+                and in LLM calls (summed over calls), completion counts and tokens
+            duplicate_of: Optional map from the URLs of near-duplicate videos
+                left out of subtitles_data to the title of the video kept instead
+        
+        UpstreamUnavailable is raised when the LLM's circuit is open or its
+        retries ran out, so the analysis fails rather than saving a placeholder.
         """
+        mode = mode or self.mode
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown analysis mode: {mode}")
         try:
             # Log received data
             logger.info(f"Analyzing {len(videos_data)} videos")
@@ -46,57 +136,231 @@ class IdeaGenerator:
                     logger.info(f"  Subtitle length: {subtitle_length} chars")
             
             # Prepare data for GPT analysis
-            analysis_prompt = self._prepare_analysis_prompt(videos_data, subtitles_data)
+            usage: List[Dict] = []
+            map_seconds = 0.0
+            if mode == "map_reduce":
+                map_start = time.perf_counter()
+                summaries = self._summarize_videos(videos_data, subtitles_data, use_cache, usage)
+                map_seconds = time.perf_counter() - map_start
+                MAP_STEP_SECONDS.observe(map_seconds)
+                
+            prompt_start = time.perf_counter()
+            topic_summary = format_topics_for_prompt(topics)
+            if mode == "map_reduce":
+                analysis_prompt = self._prepare_reduce_prompt(videos_data, subtitles_data, summaries, topic_summary,
+                                                              duplicate_of)
+            else:
+                analysis_prompt = self._prepare_analysis_prompt(videos_data, subtitles_data, topic_summary,
+                                                                duplicate_of)
+            prompt_seconds = time.perf_counter() - prompt_start
+            PROMPT_SECONDS.observe(prompt_seconds, mode=mode)
             
             # Log the prompt before sending to GPT
             logger.info("\nSending prompt to GPT:\n%s", analysis_prompt)
             
             # Get response from GPT-4
-            response = openai.ChatCompletion.create(
-                model="chatgpt-4o-latest",
-                messages=[
+            response_content = self._complete(
+                [
                     {
                         "role": "user",
                         "content": analysis_prompt
                     }
-                ]
+                ],
+                use_cache=use_cache,
+                on_token=on_token,
+                usage=usage
             )
+            if timings is not None:
+                timings.update(
+                    prompt_seconds=round(prompt_seconds, 3),
+                    map_seconds=round(map_seconds, 3),
+                    llm_seconds=round(sum(call['seconds'] for call in usage), 3),
+                    llm_calls=len(usage),
+                    cached_calls=sum(1 for call in usage if call['cached']),
+                    tokens=sum(call['tokens'] for call in usage if not call['cached'])
+                )
             
             # Log the response
-            response_content = response.choices[0].message['content']
             logger.info("\nGPT Response:\n%s", response_content)
             
-            # Log token usage
-            tokens_used = response.usage.total_tokens
-            logger.info(f"Total tokens used: {tokens_used}")
-            
             return response_content
             
+        except UpstreamUnavailable:
+            # Fail the analysis instead of saving (and reusing) a placeholder
+            raise
         except openai.error.OpenAIError as e:
             logger.error(f"OpenAI API error: {e}")
             return "Error generating ideas"
             
-    def _prepare_analysis_prompt(self, videos_data: List[Dict], subtitles_data: Dict[str, str]) -> str:
-        """Prepare prompt for GPT analysis"""
-        # Convert views to numeric format
-        for video in videos_data:
-            views_str = video['views'].lower().replace('k', '000').replace('m', '000000')
-            views_str = ''.join(filter(str.isdigit, views_str))
-            video['views_count'] = int(views_str) if views_str else 0
+    def _complete(self, messages: List[Dict], use_cache: bool = True,
+                  on_token: Optional[Callable[[str], None]] = None, call: str = "ideas",
+                  usage: Optional[List[Dict]] = None, cache_key: Optional[str] = None, **params) -> str:
+        """
+        Run a chat completion, answering from the response cache when possible
+        
+        call labels the completion in metrics; usage, when given, gets one
+        {"call", "seconds", "tokens", "cached"} entry appended. cache_key
+        replaces the default key, a hash of the model, messages and params.
+        """
+        start = time.perf_counter()
+        if self.cache and use_cache:
+            cache_key = cache_key or self.cache.make_key(self.model, messages, **params)
+            cached = self.cache.get(cache_key)
+            if cached:
+                logger.info(f"Using cached response, saved {cached.get('total_tokens', 0)} tokens")
+                if on_token:
+                    on_token(cached['content'])
+                LLM_CALLS.inc(call=call, outcome="cached")
+                if usage is not None:
+                    usage.append({"call": call, "seconds": time.perf_counter() - start,
+                                  "tokens": cached.get('total_tokens', 0), "cached": True})
+                return cached['content']
+                
+        try:
+            if on_token:
+                response_content, tokens_used = self._stream_completion(messages, on_token, **params)
+            else:
+                response = self.upstream.call(openai.ChatCompletion.create, model=self.model, messages=messages,
+                                              **params)
+                response_content = response.choices[0].message['content']
+                tokens_used = response.usage.total_tokens
+        except Exception:
+            LLM_CALLS.inc(call=call, outcome="error")
+            raise
+        seconds = time.perf_counter() - start
+        LLM_SECONDS.observe(seconds, call=call)
+        LLM_CALLS.inc(call=call, outcome="completed")
+        LLM_TOKENS.inc(tokens_used, call=call)
+        if usage is not None:
+            usage.append({"call": call, "seconds": seconds, "tokens": tokens_used, "cached": False})
+        
+        # Log token usage
+        logger.info(f"Total tokens used: {tokens_used}")
+        
+        if self.cache:
+            self.cache.put(cache_key or self.cache.make_key(self.model, messages, **params),
+                           response_content, tokens_used)
+        return response_content
             
-        # Sort videos by views
-        sorted_videos = sorted(videos_data, key=lambda x: x['views_count'], reverse=True)
+    def _stream_completion(self, messages: List[Dict], on_token: Callable[[str], None],
+                           **params) -> Tuple[str, int]:
+        """Stream a chat completion to on_token and return the assembled text and token count"""
+        chunks = []
+        # Only opening the stream is retried; tokens already forwarded cannot be taken back
+        stream = self.upstream.call(openai.ChatCompletion.create, model=self.model, messages=messages,
+                                    stream=True, **params)
+        for chunk in stream:
+            delta = chunk.choices[0].delta.get('content') if chunk.choices else None
+            if delta:
+                chunks.append(delta)
+                on_token(delta)
+        response_content = "".join(chunks)
+        
+        # Streamed responses carry no usage block, so count tokens locally
+        tokens_used = sum(count_tokens(m['content']) for m in messages) + count_tokens(response_content)
+        return response_content, tokens_used
         
-        # Prepare video performance summary
-        video_summary = "\n".join([
+    def _rank_videos(self, videos_data: List[Dict]) -> List[Dict]:
+        """Return copies of the videos with parsed metrics, most viewed first"""
+        return rank_by_views(videos_data)
+        
+    def _video_summary(self, sorted_videos: List[Dict], subtitles_data: Dict[str, str],
+                       duplicate_of: Optional[Dict[str, str]] = None) -> str:
+        """Prepare video performance summary"""
+        duplicate_of = duplicate_of or {}
+        
+        def subtitle_status(url: str) -> str:
+            if url in subtitles_data:
+                return "Yes"
+            if url in duplicate_of:
+                return f"Same content as '{duplicate_of[url]}'"
+            return "No"
+            
+        rows = [
             f"Title: {v['title']}\n"
             f"Views: {v['views']}\n"
+            f"Views Per Day: {v['views_per_day']:.0f}\n"
             f"Duration: {v['duration']}\n"
             f"Upload Date: {v['upload_date']}\n"
-            f"Has Subtitles: {'Yes' if v['url'] in subtitles_data else 'No'}\n"
+            f"Has Subtitles: {subtitle_status(v['url'])}\n"
             for v in sorted_videos
-        ])
+        ]
+        if self.prompt_builder:
+            # Large channels would otherwise spend the whole budget on the table
+            return self.prompt_builder.fit_rows(rows)
+        return "\n".join(rows)
+        
+    def _summarize_videos(self, videos_data: List[Dict], subtitles_data: Dict[str, str],
+                          use_cache: bool = True,
+                          usage: Optional[List[Dict]] = None) -> List[Tuple[Dict, Optional[str]]]:
+        """Map step: summarize the most viewed videos with subtitles concurrently"""
+        sorted_videos = self._rank_videos(videos_data)
+        to_summarize = [video for video in sorted_videos if video['url'] in subtitles_data][:self.max_videos]
+        
+        logger.info(f"Summarizing {len(to_summarize)} videos with {self.map_workers} workers")
+        with ThreadPoolExecutor(max_workers=max(1, self.map_workers)) as executor:
+            summaries = list(executor.map(
+                lambda video: self._summarize_video(video, subtitles_data[video['url']], use_cache, usage),
+                to_summarize
+            ))
+        return list(zip(to_summarize, summaries))
         
+    def _prepare_reduce_prompt(self, videos_data: List[Dict], subtitles_data: Dict[str, str],
+                               summaries: List[Tuple[Dict, Optional[str]]], topic_summary: str = "",
+                               duplicate_of: Optional[Dict[str, str]] = None) -> str:
+        """Reduce step: build the final ideas prompt from the video summaries"""
+        sorted_videos = self._rank_videos(videos_data)
+        video_summary = self._video_summary(sorted_videos, subtitles_data, duplicate_of)
+        summary_analysis = "".join(
+            f"\nSummary of '{video['title']}':\n{summary}\n"
+            for video, summary in summaries if summary
+        )
+        logger.info(f"Including summaries for {sum(1 for _, summary in summaries if summary)} videos")
+        return self._format_prompt(video_summary, summary_analysis, topic_summary)
+        
+    def _summarize_video(self, video: Dict, subtitle_text: str, use_cache: bool = True,
+                         usage: Optional[List[Dict]] = None) -> Optional[str]:
+        """
+        Map step: summarize one video's transcript
+        
+        Summaries are cached by video ID and transcript hash, so they are
+        reused across runs until the transcript changes.
+        """
+        prompt = VIDEO_SUMMARY_PROMPT.format(
+            title=video['title'],
+            transcript=compress_transcript(subtitle_text, self.map_tokens)
+        )
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(
+                self.model, [], call="summary", video_id=video_id_from_url(video['url']),
+                transcript=hashlib.sha256(subtitle_text.encode('utf-8')).hexdigest(),
+                template=hashlib.sha256(VIDEO_SUMMARY_PROMPT.encode('utf-8')).hexdigest(),
+                map_tokens=self.map_tokens
+            )
+        try:
+            return self._complete([{"role": "user", "content": prompt}], use_cache=use_cache, call="summary",
+                                  usage=usage, cache_key=cache_key, temperature=0)
+        except UpstreamUnavailable:
+            raise
+        except openai.error.OpenAIError as e:
+            logger.error(f"OpenAI API error summarizing {video['url']}: {e}")
+            return None
+            
+    def _prepare_analysis_prompt(self, videos_data: List[Dict], subtitles_data: Dict[str, str],
+                                 topic_summary: str = "", duplicate_of: Optional[Dict[str, str]] = None) -> str:
+        """Prepare prompt for GPT analysis"""
+        sorted_videos = self._rank_videos(videos_data)
+        video_summary = self._video_summary(sorted_videos, subtitles_data, duplicate_of)
+        
+        if self.prompt_builder:
+            subtitle_analysis = self.prompt_builder.build_subtitle_section(
+                sorted_videos, subtitles_data,
+                fixed_prompt=self._format_prompt(video_summary, "", topic_summary),
+                max_videos=self.max_videos
+            )
+            return self._format_prompt(video_summary, subtitle_analysis, topic_summary)
+            
         # Add subtitle analysis for top performing videos
         subtitle_analysis = ""
         videos_with_subtitles = 0
@@ -119,12 +383,20 @@ class IdeaGenerator:
                 
         logger.info(f"Including subtitles for {videos_with_subtitles} videos")
         
+        return self._format_prompt(video_summary, subtitle_analysis, topic_summary)
+        
+    def _format_prompt(self, video_summary: str, subtitle_analysis: str, topic_summary: str = "") -> str:
+        """Fill the analysis prompt template"""
+        topic_section = f"""
+        Transcript Topics (best performing first):
+        {topic_summary}
+""" if topic_summary else ""
         prompt = f"""
         Analyze this YouTube channel's content performance and generate strategic content ideas.
 
         Video Performance Data:
         {video_summary}
-
+{topic_section}
         Key Content Analysis from Top Performing Videos:
         {subtitle_analysis}
 
@@ -0,0 +1,255 @@
+import bisect
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class Job:
+    """A single background analysis run and its progress history"""
+    # Streamed text is published at most this often, merged into one event
+    CHUNK_SECONDS = 0.25
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = "queued"
+        self.stage = "queued"
+        self.progress: Dict = {}
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        # Coalescing key and number of later submissions served by this job
+        self.key: Optional[Hashable] = None
+        self.attached = 0
+        self.events: List[Dict] = []
+        self._next_event_id = 0
+        # Streamed text not published yet, and the event types it has been sent as
+        self._chunk_type: Optional[str] = None
+        self._chunk_parts: List[str] = []
+        self._chunk_flushed_at: Optional[float] = None
+        self._chunk_types = set()
+        self._condition = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    @property
+    def next_event_id(self) -> int:
+        """ID the next event will get; events before it may already be dropped"""
+        with self._condition:
+            return self._next_event_id
+
+    def update(self, stage: str, **progress):
+        """Record a progress update for the current stage and wake up listeners"""
+        with self._condition:
+            self.stage = stage
+            self.progress = progress
+            self._append_event("progress", {"stage": stage, **progress})
+
+    def emit(self, event_type: str, **data):
+        """Publish a custom event without changing the stage"""
+        with self._condition:
+            self._append_event(event_type, data)
+
+    def emit_chunk(self, event_type: str, text: str):
+        """
+        Publish streamed text, e.g. LLM tokens, as `{"text": ...}` events
+
+        Text is merged into one event per CHUNK_SECONDS so a long stream keeps
+        a few hundred events rather than one per token. Chunk events are
+        dropped when the job finishes, since the result holds the full text.
+        """
+        with self._condition:
+            if self._chunk_type != event_type:
+                self._flush_chunk()
+                self._chunk_type = event_type
+            self._chunk_parts.append(text)
+            if self._chunk_flushed_at is None or time.monotonic() - self._chunk_flushed_at >= self.CHUNK_SECONDS:
+                self._flush_chunk()
+
+    def _start(self):
+        with self._condition:
+            self.status = "running"
+            self._append_event("status", {"status": self.status})
+
+    def _finish(self, result: Optional[Dict] = None, error: Optional[str] = None):
+        with self._condition:
+            self.result = result
+            self.error = error
+            self.status = "failed" if error else "completed"
+            self.stage = self.status
+            self.finished_at = time.time()
+            if error:
+                self._append_event("failed", {"error": error})
+            else:
+                self._append_event("completed", {"result": result})
+            # Event IDs are kept, so Last-Event-ID still resumes after the dropped chunks
+            self.events = [event for event in self.events if event["event"] not in self._chunk_types]
+
+    def _append_event(self, event_type: str, data: Dict):
+        self._flush_chunk()
+        self._publish(event_type, data)
+
+    def _flush_chunk(self):
+        """Publish buffered streamed text; the caller holds the condition"""
+        if self._chunk_parts:
+            self._chunk_types.add(self._chunk_type)
+            self._publish(self._chunk_type, {"text": "".join(self._chunk_parts)})
+            self._chunk_parts = []
+            self._chunk_flushed_at = time.monotonic()
+
+    def _publish(self, event_type: str, data: Dict):
+        self.events.append({"id": self._next_event_id, "event": event_type, "data": data})
+        self._next_event_id += 1
+        self._condition.notify_all()
+
+    def wait_for_events(self, since: int, timeout: float) -> List[Dict]:
+        """Block until there are events with an ID of at least `since` or the timeout expires"""
+        with self._condition:
+            if self._next_event_id <= since and not self.done:
+                self._condition.wait(timeout)
+            return self.events[bisect.bisect_left(self.events, since, key=lambda event: event["id"]):]
+
+    def to_dict(self) -> Dict:
+        with self._condition:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+                "attached": self.attached,
+            }
+
+class JobManager:
+    def __init__(self, max_workers: int = 2, retention_seconds: int = 3600):
+        """
+        Run analysis jobs on a bounded worker pool
+
+        Args:
+            max_workers: Maximum number of jobs running at the same time
+            retention_seconds: How long finished jobs stay queryable
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+        self.retention_seconds = retention_seconds
+        self._jobs: Dict[str, Job] = {}
+        # Latest job per coalescing key
+        self._keyed: Dict[Hashable, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable, *args, **kwargs) -> Job:
+        """Queue `func(job, *args, **kwargs)` and return its job immediately"""
+        with self._lock:
+            job = self._create()
+        self.executor.submit(self._run, job, func, args, kwargs)
+        logger.info(f"Queued job {job.id}")
+        return job
+
+    def submit_coalesced(self, key: Hashable, func: Callable, *args, reuse_seconds: float = 0,
+                         fresh: bool = False, **kwargs) -> Tuple[Job, bool]:
+        """
+        Single-flight submit: identical work is only run once
+
+        A submission whose key matches a queued or running job attaches to
+        that job instead of starting another. A job that completed less than
+        reuse_seconds ago is handed out as is. Failed jobs are never reused.
+
+        Args:
+            key: Identifies equivalent work, e.g. (channel, months_back)
+            reuse_seconds: How long a completed job's result is served again
+            fresh: Never reuse a finished job; a new one is started unless the
+                same work is already in flight
+
+        Returns:
+            Tuple of (job, whether an existing job was returned)
+        """
+        with self._lock:
+            existing = self._keyed.get(key)
+            if existing and self._reusable(existing, reuse_seconds, fresh):
+                existing.attached += 1
+                logger.info(f"Attached to job {existing.id} for {key}")
+                return existing, True
+
+            job = self._create()
+            job.key = key
+            self._keyed[key] = job
+        self.executor.submit(self._run, job, func, args, kwargs)
+        logger.info(f"Queued job {job.id} for {key}")
+        return job, False
+
+    @staticmethod
+    def _reusable(job: Job, reuse_seconds: float, fresh: bool) -> bool:
+        if not job.done:
+            return True
+        if fresh or job.status != "completed":
+            return False
+        return time.time() - job.finished_at <= reuse_seconds
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Number of retained jobs per status"""
+        counts = {"queued": 0, "running": 0, "completed": 0, "failed": 0}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+    def stream(self, job: Job, since: int = 0, heartbeat: float = 15.0) -> Iterator[Optional[Dict]]:
+        """
+        Yield job events as they happen until the job finishes
+
+        None is yielded whenever `heartbeat` seconds pass without new events
+        so callers can keep idle connections alive.
+        """
+        position = since
+        while True:
+            events = job.wait_for_events(position, heartbeat)
+            if not events:
+                yield None
+            for event in events:
+                yield event
+            if events:
+                position = events[-1]["id"] + 1
+            if job.done and position >= job.next_event_id:
+                return
+
+    def _create(self) -> Job:
+        """Register a new queued job; the caller holds the lock"""
+        self._prune()
+        job = Job(uuid.uuid4().hex)
+        self._jobs[job.id] = job
+        return job
+
+    def _run(self, job: Job, func: Callable, args: tuple, kwargs: dict):
+        job._start()
+        try:
+            result = func(job, *args, **kwargs)
+            job._finish(result=result)
+            logger.info(f"Job {job.id} completed")
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}", exc_info=True)
+            job._finish(error=str(e))
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window; the caller holds the lock"""
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if job.key is not None and self._keyed.get(job.key) is job:
+                del self._keyed[job.key]
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class LLMResponseCache:
+    STATS_FILE = "_stats.json"
+
+    def __init__(self, cache_dir: str = "llm_cache", ttl: int = 7 * 24 * 3600,
+                 max_bytes: int = 50 * 1024 * 1024, stats_flush_interval: float = 30):
+        """
+        Content-addressed disk cache of chat completion responses
+
+        Args:
+            cache_dir: Directory holding one JSON file per cached response
+            ttl: Seconds a cached response stays valid
+            max_bytes: Maximum total size of cached responses; least recently used
+                are evicted beyond this
+            stats_flush_interval: Seconds between writes of the hit/miss counters to disk
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats_flush_interval = stats_flush_interval
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._stats_path = os.path.join(cache_dir, self.STATS_FILE)
+        self._stats = self._load_stats()
+        self._stats_dirty = False
+        self._stats_flushed_at = time.monotonic()
+        # Listed once here, then kept up to date by put, expiry and eviction
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict], **params) -> str:
+        """Hash everything that influences the completion into a cache key"""
+        payload = json.dumps({"model": model, "messages": messages, "params": params},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached {"content", "total_tokens"} entry or None"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        except Exception as e:
+            logger.error(f"Error reading LLM cache entry {path}: {e}")
+            self._count("misses")
+            return None
+
+        if time.time() - entry.get("created_at", 0) > self.ttl:
+            with self._lock:
+                self._remove(path)
+            self._count("misses")
+            return None
+
+        # Bump the modification time so eviction treats it as recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        self._count("hits", tokens_saved=entry.get("total_tokens") or 0)
+        return entry
+
+    def put(self, key: str, content: str, total_tokens: int = 0):
+        entry = {"created_at": time.time(), "content": content, "total_tokens": total_tokens}
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with self._lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            size = os.path.getsize(tmp_path)
+            try:
+                previous_size = os.path.getsize(path)
+            except OSError:
+                previous_size = 0
+            os.replace(tmp_path, path)
+            self._total_bytes += size - previous_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, total_bytes=self._total_bytes)
+
+    def flush(self):
+        """Write counters changed since the last flush to disk"""
+        with self._lock:
+            if self._stats_dirty:
+                self._save_stats()
+
+    def _count(self, counter: str, tokens_saved: int = 0):
+        with self._lock:
+            self._stats[counter] += 1
+            self._stats["tokens_saved"] += tokens_saved
+            self._stats_dirty = True
+            if time.monotonic() - self._stats_flushed_at >= self.stats_flush_interval:
+                self._save_stats()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) of every cached response on disk"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json") or name == self.STATS_FILE:
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _remove(self, path: str):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        self._total_bytes -= size
+
+    def _evict(self):
+        """Drop the least recently used entries until the cache fits in max_bytes"""
+        entries = sorted(self._entries())
+        # Resync with the disk in case files were removed behind our back
+        self._total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self._total_bytes -= size
+                self._stats["evictions"] += 1
+                self._stats_dirty = True
+            except OSError as e:
+                logger.error(f"Error evicting LLM cache entry {path}: {e}")
+
+    def _load_stats(self) -> Dict[str, int]:
+        stats = {"hits": 0, "misses": 0, "evictions": 0, "tokens_saved": 0}
+        try:
+            with open(self._stats_path, 'r', encoding='utf-8') as f:
+                stats.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error loading LLM cache stats: {e}")
+        return stats
+
+    def _save_stats(self):
+        tmp_path = f"{self._stats_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._stats, f)
+            os.replace(tmp_path, self._stats_path)
+        except OSError as e:
+            logger.error(f"Error saving LLM cache stats: {e}")
+            return
+        self._stats_dirty = False
+        self._stats_flushed_at = time.monotonic()
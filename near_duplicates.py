@@ -0,0 +1,250 @@
+import numpy as np
+import logging
+import os
+import re
+import threading
+import zlib
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, List, Set, Tuple
+from storage import video_id_from_url
+from video_metrics import build_video_frame
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Multiplier of the rolling hash that turns word hashes into shingle hashes
+SHINGLE_BASE = np.uint64(1_000_003)
+
+class NearDuplicateDetector:
+    def __init__(self, signature_dir: str = "subtitles", num_perm: int = 128, bands: int = 32,
+                 threshold: float = 0.8, shingle_size: int = 5, window_size: int = 200):
+        """
+        MinHash/LSH detection of re-uploaded, clipped or cross-posted transcripts
+
+        Each transcript is indexed as overlapping windows of window_size
+        shingles, so a clip shares near-identical windows with the video it
+        was cut from even though the two whole transcripts are not similar.
+        Candidate pairs are then checked for exact shingle containment.
+
+        Args:
+            signature_dir: Directory the `{video_id}.minhash` signatures are kept in,
+                normally the transcript cache directory
+            num_perm: MinHash permutations per signature
+            bands: LSH bands; num_perm / bands rows each. More bands find
+                less similar candidates
+            threshold: Share of the shorter transcript's word shingles that must
+                also occur in the other one, so clips of a video count as duplicates
+            shingle_size: Words per shingle
+            window_size: Shingles per indexed window, which is roughly the
+                shortest clip (in words) that is reliably found
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.signature_dir = signature_dir
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.window_size = window_size
+        self._lock = threading.Lock()
+        os.makedirs(signature_dir, exist_ok=True)
+        # Fixed seed: stored signatures must stay comparable across runs
+        rng = np.random.default_rng(1)
+        self._a = rng.integers(0, 1 << 64, size=(num_perm, 1), dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 1 << 64, size=(num_perm, 1), dtype=np.uint64)
+
+    def path_for(self, video_id: str) -> str:
+        return os.path.join(self.signature_dir, f"{video_id}.minhash")
+
+    def shingle_hashes(self, text: str) -> np.ndarray:
+        """Stable 32-bit hashes of every run of shingle_size words, deduplicated and sorted"""
+        return np.unique(self._shingle_sequence(text))
+
+    def _shingle_sequence(self, text: str) -> np.ndarray:
+        """Shingle hashes in the order the shingles occur in the text"""
+        words = re.findall(r"[a-z0-9']+", text.lower())
+        if not words:
+            return np.zeros(0, dtype=np.uint64)
+        # Hash each distinct word once, then combine neighbours with a rolling hash
+        word_hashes: Dict[str, int] = {}
+        hashes = np.fromiter(
+            (word_hashes.setdefault(word, zlib.crc32(word.encode('utf-8'))) for word in words),
+            dtype=np.uint64, count=len(words)
+        )
+        size = min(self.shingle_size, len(hashes))
+        shingles = np.zeros(len(hashes) - size + 1, dtype=np.uint64)
+        for offset in range(size):
+            shingles = shingles * SHINGLE_BASE + hashes[offset:offset + len(shingles)]
+        return shingles & np.uint64(0xFFFFFFFF)
+
+    def compute_signature(self, text: str) -> np.ndarray:
+        """MinHash signature: the minimum of each hash permutation over the shingles"""
+        return self._minhash(self.shingle_hashes(text))
+
+    def window_signatures(self, text: str) -> np.ndarray:
+        """
+        MinHash signatures (windows x num_perm) of runs of window_size shingles
+
+        Windows overlap by half, so any stretch of 1.5 windows of a video
+        fully contains one of its windows.
+        """
+        return self._window_minhash(self._shingle_sequence(text))
+
+    def _window_minhash(self, sequence: np.ndarray) -> np.ndarray:
+        half = max(1, self.window_size // 2)
+        if sequence.size <= half:
+            return self._minhash(sequence)[np.newaxis, :]
+        # Minimum of every permutation over each half window; a window is two
+        # neighbouring halves, and repeated shingles do not change a minimum
+        block_mins = np.empty((self.num_perm, -(-sequence.size // half)), dtype=np.uint64)
+        chunk = half * max(1, 4096 // half)
+        for start in range(0, sequence.size, chunk):
+            permuted = (self._a * sequence[start:start + chunk] + self._b) >> np.uint64(32)
+            mins = np.minimum.reduceat(permuted, np.arange(0, permuted.shape[1], half), axis=1)
+            block_mins[:, start // half:start // half + mins.shape[1]] = mins
+        return np.minimum(block_mins[:, :-1], block_mins[:, 1:]).T.astype(np.uint32)
+
+    def _minhash(self, shingles: np.ndarray) -> np.ndarray:
+        if shingles.size == 0:
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        # Multiply-add-shift hashing: (a * x + b) wraps modulo 2^64 and the
+        # top 32 bits are the permuted value
+        signature = np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint64)
+        for start in range(0, shingles.size, 4096):
+            chunk = shingles[start:start + 4096]
+            permuted = (self._a * chunk + self._b) >> np.uint64(32)
+            signature = np.minimum(signature, permuted.min(axis=1))
+        return signature.astype(np.uint32)
+
+    def signature(self, video_id: str, text: str) -> Tuple[np.ndarray, int]:
+        """
+        Load the stored (window signatures, shingle count) for a transcript,
+        computing and storing them if needed
+        """
+        path = self.path_for(video_id)
+        try:
+            # File layout, little endian uint32: shingle count, window size,
+            # window count, then the window signatures
+            stored = np.fromfile(path, dtype='<u4')
+            if stored.size >= 3 and stored[1] == self.window_size \
+                    and stored.size == 3 + int(stored[2]) * self.num_perm:
+                return stored[3:].reshape(-1, self.num_perm), int(stored[0])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error reading MinHash signature {path}: {e}")
+
+        sequence = self._shingle_sequence(text)
+        shingle_count = np.unique(sequence).size
+        signatures = self._window_minhash(sequence)
+        tmp_path = f"{path}.tmp"
+        with self._lock:
+            header = [shingle_count, self.window_size, len(signatures)]
+            np.concatenate([header, signatures.ravel()]).astype('<u4').tofile(tmp_path)
+            os.replace(tmp_path, path)
+        return signatures, shingle_count
+
+    def find_groups(self, videos: List[Dict], subtitles_data: Dict[str, str]) -> List[Dict]:
+        """
+        Group videos whose transcripts are near-duplicates
+
+        Returns:
+            One entry per group of two or more videos. The video with the most
+            complete transcript (then the most views) is the representative;
+            the rest are listed as duplicates with their overlap
+        """
+        frame = build_video_frame([video for video in videos if video.get('url') in subtitles_data])
+        if len(frame) < 2:
+            return []
+        urls = frame['url'].tolist()
+        stored = [self.signature(video_id_from_url(url), subtitles_data[url]) for url in urls]
+        sizes = np.array([count for _, count in stored], dtype=float)
+        shingle_sets: Dict[int, np.ndarray] = {}
+        overlaps: Dict[Tuple[int, int], float] = {}
+
+        def overlap(first: int, second: int) -> float:
+            """Share of the smaller shingle set contained in the other, computed exactly"""
+            pair = (min(first, second), max(first, second))
+            if pair not in overlaps:
+                for index in pair:
+                    if index not in shingle_sets:
+                        shingle_sets[index] = self.shingle_hashes(subtitles_data[urls[index]])
+                smaller = min(shingle_sets[first].size, shingle_sets[second].size)
+                common = np.intersect1d(shingle_sets[first], shingle_sets[second], assume_unique=True).size
+                overlaps[pair] = common / smaller if smaller else 0.0
+            return overlaps[pair]
+
+        parent = list(range(len(urls)))
+
+        def find(index: int) -> int:
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+
+        for first, second in sorted(self._candidate_pairs([signatures for signatures, _ in stored])):
+            if overlap(first, second) >= self.threshold:
+                parent[find(second)] = find(first)
+
+        groups = defaultdict(list)
+        for index in range(len(urls)):
+            groups[find(index)].append(index)
+
+        views = frame['views_count'].to_numpy()
+        result = []
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            members.sort(key=lambda index: (sizes[index], views[index]), reverse=True)
+            representative = members[0]
+            result.append({
+                "representative": urls[representative],
+                "title": frame['title'].iloc[representative],
+                "duplicates": [
+                    {
+                        "url": urls[index],
+                        "title": frame['title'].iloc[index],
+                        "similarity": round(overlap(index, representative), 3),
+                    }
+                    for index in members[1:]
+                ],
+            })
+        logger.info(f"Found {len(result)} near-duplicate groups among {len(urls)} transcripts")
+        return result
+
+    def _candidate_pairs(self, window_signatures: List[np.ndarray]) -> Set[Tuple[int, int]]:
+        """Pairs of videos (by position) with any windows sharing a whole LSH band"""
+        videos = len(window_signatures)
+        signatures = np.concatenate(window_signatures)
+        owners = np.repeat(np.arange(videos), [len(windows) for windows in window_signatures])
+        rows = self.num_perm // self.bands
+        pairs = set()
+        for band in range(self.bands):
+            _, band_ids = np.unique(signatures[:, band * rows:(band + 1) * rows], axis=0, return_inverse=True)
+            # One entry per (band value, video), sorted by band value
+            entries = np.unique(band_ids.ravel() * videos + owners)
+            band_of, owner_of = np.divmod(entries, videos)
+            shared = np.bincount(band_of)[band_of] > 1
+            if not shared.any():
+                continue
+            band_of, owner_of = band_of[shared], owner_of[shared]
+            for members in np.split(owner_of, np.flatnonzero(np.diff(band_of)) + 1):
+                pairs.update(combinations(members.tolist(), 2))
+        return pairs
+
+    def deduplicate(self, videos: List[Dict], subtitles_data: Dict[str, str]) -> Tuple[Dict[str, str], List[Dict]]:
+        """
+        Drop the transcripts of near-duplicate videos, keeping each group's representative
+
+        Returns:
+            Tuple of (subtitles without duplicates, duplicate groups)
+        """
+        groups = self.find_groups(videos, subtitles_data)
+        duplicate_urls = {duplicate["url"] for group in groups for duplicate in group["duplicates"]}
+        unique_subtitles = {url: text for url, text in subtitles_data.items() if url not in duplicate_urls}
+        return unique_subtitles, groups
+
+def duplicate_of(groups: List[Dict]) -> Dict[str, str]:
+    """Map each duplicate's URL to the title of its group's representative"""
+    return {duplicate["url"]: group["title"] for group in groups for duplicate in group["duplicates"]}
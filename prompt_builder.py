@@ -0,0 +1,220 @@
+import numpy as np
+import logging
+import re
+from typing import Dict, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # Listed in requirements.txt; without it token counts are estimated
+    tiktoken = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+if tiktoken is None:
+    logger.warning("tiktoken is not installed, so prompt token budgets use a length based estimate")
+
+# Rough characters per token for English text when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+SENTENCE_SEPARATOR = " ... "
+# Tokens the chat format adds around the prompt message
+MESSAGE_OVERHEAD_TOKENS = 8
+# Transcripts without punctuation are cut into pseudo-sentences of this many words
+MAX_SENTENCE_WORDS = 30
+
+STOPWORDS = frozenset("""
+a about after all also am an and any are as at be because been but by can could did do does
+doing don't for from get got had has have he her here him his how i i'm if in into is it it's
+its just know like me my no not now of oh okay on one or our out really right so some that
+that's the their them then there they this to too um uh up us was we well were what when which
+who will with would yeah you your
+""".split())
+_STOPWORD_ARRAY = np.array(sorted(STOPWORDS))
+
+_encoding = None
+
+def count_tokens(text: str) -> int:
+    """Count tokens locally with tiktoken, or estimate them from the text length"""
+    global _encoding
+    if not text:
+        return 0
+    if tiktoken is not None:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        return len(_encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+def split_sentences(text: str) -> List[str]:
+    """Split on sentence punctuation, chunking unpunctuated runs of words"""
+    sentences = []
+    for part in re.split(r'(?<=[.!?])\s+', text.strip()):
+        words = part.split()
+        for start in range(0, len(words), MAX_SENTENCE_WORDS):
+            sentences.append(" ".join(words[start:start + MAX_SENTENCE_WORDS]))
+    return [sentence for sentence in sentences if sentence]
+
+def score_sentences(sentences: List[str]) -> np.ndarray:
+    """
+    Score sentences by the average TF-IDF weight of their content words
+
+    Words that recur across the transcript but are not in every sentence
+    score highest. The whole transcript is scored in a handful of array ops.
+    """
+    tokens = [re.findall(r"[a-z0-9']+", sentence.lower()) for sentence in sentences]
+    lengths = np.fromiter((len(words) for words in tokens), dtype=np.int64, count=len(tokens))
+    words = np.array([word for sentence_words in tokens for word in sentence_words], dtype=str)
+    if words.size == 0:
+        return np.zeros(len(sentences))
+
+    sentence_ids = np.repeat(np.arange(len(sentences)), lengths)
+    keep = ~np.isin(words, _STOPWORD_ARRAY)
+    words, sentence_ids = words[keep], sentence_ids[keep]
+    if words.size == 0:
+        return np.zeros(len(sentences))
+
+    vocabulary, word_ids = np.unique(words, return_inverse=True)
+    term_frequency = np.bincount(word_ids, minlength=len(vocabulary)).astype(float)
+    # Number of sentences each word appears in
+    pairs = np.unique(sentence_ids * len(vocabulary) + word_ids)
+    sentence_frequency = np.bincount(pairs % len(vocabulary), minlength=len(vocabulary))
+    weights = np.log1p(term_frequency) * np.log((1 + len(sentences)) / (1 + sentence_frequency))
+
+    totals = np.bincount(sentence_ids, weights=weights[word_ids], minlength=len(sentences))
+    counts = np.bincount(sentence_ids, minlength=len(sentences))
+    return np.divide(totals, counts, out=np.zeros(len(sentences)), where=counts > 0)
+
+def compress_transcript(text: str, max_tokens: int) -> str:
+    """Keep the highest scoring sentences, in their original order, within max_tokens"""
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    sentences = split_sentences(text)
+    scores = score_sentences(sentences)
+    # Count each sentence with the " ... " separator that joins it to the next
+    sentence_tokens = np.array([count_tokens(sentence + SENTENCE_SEPARATOR) for sentence in sentences])
+
+    # Greedily take the best sentences, skipping any that no longer fit in the budget
+    order = np.argsort(-scores, kind="stable")
+    selected = []
+    used = 0
+    smallest = sentence_tokens.min()
+    for index in order:
+        if used + sentence_tokens[index] <= max_tokens:
+            selected.append(index)
+            used += sentence_tokens[index]
+            if max_tokens - used < smallest:
+                break
+    if not selected:
+        # Not even one sentence fits, so cut the best one at a word boundary
+        return truncate_words(sentences[order[0]], max_tokens)
+    excerpt = SENTENCE_SEPARATOR.join(sentences[i] for i in sorted(selected))
+    # Token counts are not exactly additive, so drop the weakest sentences if the join ran over
+    while len(selected) > 1 and count_tokens(excerpt) > max_tokens:
+        selected.pop()
+        excerpt = SENTENCE_SEPARATOR.join(sentences[i] for i in sorted(selected))
+    return excerpt
+
+def truncate_words(text: str, max_tokens: int) -> str:
+    """Longest prefix of whole words that fits in max_tokens"""
+    words = text.split()
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(" ".join(words[:middle])) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return " ".join(words[:low])
+
+def allocate_budget(weights: np.ndarray, needs: np.ndarray, budget: int) -> np.ndarray:
+    """
+    Split a token budget proportionally to weights without giving any item
+    more than it needs; what short items leave over goes to the others
+    """
+    weights = np.asarray(weights, dtype=float)
+    needs = np.asarray(needs, dtype=float)
+    allocation = np.zeros(len(needs))
+    active = needs > 0
+    remaining = float(budget)
+    while remaining >= 1 and active.any():
+        active_weights = np.where(active, np.maximum(weights, 0), 0)
+        if active_weights.sum() <= 0:
+            active_weights = active.astype(float)
+        share = remaining * active_weights / active_weights.sum()
+        grant = np.minimum(share, needs - allocation)
+        allocation += grant
+        remaining -= grant.sum()
+        satisfied = allocation >= needs - 1e-9
+        if not (active & satisfied).any():
+            break
+        active &= ~satisfied
+    return np.floor(allocation).astype(int)
+
+class PromptBuilder:
+    def __init__(self, token_budget: int = 24000, min_tokens_per_video: int = 50, table_share: float = 0.5):
+        """
+        Fit transcript excerpts into a prompt token budget
+
+        Args:
+            token_budget: Total tokens allowed for the whole prompt
+            min_tokens_per_video: Allocations smaller than this are dropped
+            table_share: Fraction of the budget the video performance table may use
+        """
+        self.token_budget = token_budget
+        self.min_tokens_per_video = min_tokens_per_video
+        self.table_share = table_share
+
+    def fit_rows(self, rows: List[str]) -> str:
+        """
+        Join the video table rows that fit in table_share of the budget
+
+        Rows are expected most important first; the rest are replaced by a
+        line saying how many were left out.
+        """
+        limit = int(self.token_budget * self.table_share)
+        row_tokens = np.cumsum([count_tokens(row) + 1 for row in rows])
+        kept = int(np.searchsorted(row_tokens, limit, side="right"))
+        if kept == len(rows):
+            return "\n".join(rows)
+        logger.info(f"Video table trimmed to {kept} of {len(rows)} videos to fit {limit} tokens")
+        return "\n".join(rows[:kept] + [f"({len(rows) - kept} less viewed videos omitted)\n"])
+
+    def build_subtitle_section(self, ranked_videos: List[Dict], subtitles_data: Dict[str, str],
+                               fixed_prompt: str, max_videos: Optional[int] = None) -> str:
+        """
+        Compress transcripts of ranked videos into the budget left after fixed_prompt
+
+        Each video's share of the budget is weighted by its view count
+        (`views_count`), and its transcript is reduced to fit by extractive
+        summarization rather than truncation.
+        """
+        videos = [video for video in ranked_videos if video['url'] in subtitles_data]
+        if max_videos is not None:
+            videos = videos[:max_videos]
+        if not videos:
+            return ""
+
+        headers = [f"\nSubtitle content for '{video['title']}':\n" for video in videos]
+        available = (self.token_budget - MESSAGE_OVERHEAD_TOKENS - count_tokens(fixed_prompt)
+                     - sum(count_tokens(h) for h in headers))
+        if available <= 0:
+            logger.warning("Token budget exhausted before adding any subtitles")
+            return ""
+
+        needs = np.array([count_tokens(subtitles_data[video['url']]) for video in videos])
+        weights = np.array([video.get('views_count', 0) for video in videos], dtype=float) + 1
+        allocation = allocate_budget(weights, needs, available)
+
+        sections = []
+        for header, video, tokens in zip(headers, videos, allocation):
+            if tokens < self.min_tokens_per_video:
+                continue
+            excerpt = compress_transcript(subtitles_data[video['url']], int(tokens))
+            if excerpt:
+                sections.append(f"{header}{excerpt}\n")
+
+        logger.info(f"Fitted subtitles for {len(sections)} videos into {available} tokens "
+                    f"({int(needs.sum())} tokens before compression)")
+        return "".join(sections)
@@ -0,0 +1,200 @@
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class UpstreamUnavailable(Exception):
+    """An upstream call could not be completed: retries ran out or its circuit is open"""
+
+    def __init__(self, upstream: str, message: str):
+        super().__init__(f"{upstream}: {message}")
+        self.upstream = upstream
+
+class CircuitOpenError(UpstreamUnavailable):
+    """Raised without calling the upstream while its circuit breaker is open"""
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        """
+        Client-side rate limiter shared by every thread calling one upstream
+
+        Args:
+            rate: Tokens added per second, i.e. the sustained request rate
+            capacity: Largest burst allowed after a quiet period
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        """
+        Stop calling an upstream that keeps failing
+
+        After failure_threshold consecutive failures the circuit opens and
+        calls are rejected for reset_timeout seconds. Then a single trial
+        call is let through: success closes the circuit, failure opens it again.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.opened = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+class Upstream:
+    def __init__(self, name: str, is_retryable: Callable[[Exception], bool], rate: float = 5,
+                 burst: float = 10, max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 8,
+                 failure_threshold: int = 5, reset_timeout: float = 30):
+        """
+        Rate limiting, retries and circuit breaking around calls to one external service
+
+        Args:
+            name: Label used in logs, errors and counters
+            is_retryable: Tells transient errors (throttling, timeouts, 5xx)
+                from answers such as "no transcript"; only the former are retried
+                and count against the circuit breaker
+            rate: Sustained calls per second allowed by the token bucket
+            burst: Calls allowed at once after a quiet period
+            max_attempts: Tries per call, including the first
+            base_delay: Backoff before the first retry; doubles on every retry
+            max_delay: Upper bound on one backoff
+            failure_threshold: Consecutive transient failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+        """
+        self.name = name
+        self.is_retryable = is_retryable
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._counters = {"calls": 0, "succeeded": 0, "failed": 0, "retries": 0, "throttled": 0,
+                          "throttle_seconds": 0.0, "upstream_errors": 0, "rejected": 0}
+        self._lock = threading.Lock()
+
+    def call(self, func: Callable, *args, **kwargs):
+        """
+        Call func(*args, **kwargs) within the rate limit, retrying transient errors
+
+        Non-retryable errors are raised unchanged. UpstreamUnavailable is raised
+        when the circuit is open or every attempt failed with a transient error.
+        """
+        self._count("calls")
+        for attempt in range(1, self.max_attempts + 1):
+            if not self.breaker.allow():
+                self._count("rejected")
+                self._count("failed")
+                raise CircuitOpenError(self.name, "circuit open, not calling upstream")
+
+            waited = self.bucket.acquire()
+            if waited:
+                self._count("throttled")
+                self._count("throttle_seconds", waited)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if not self.is_retryable(e):
+                    # The upstream answered; the request itself was refused
+                    self.breaker.record_success()
+                    self._count("failed")
+                    raise
+                self.breaker.record_failure()
+                self._count("upstream_errors")
+                if attempt == self.max_attempts:
+                    self._count("failed")
+                    raise UpstreamUnavailable(
+                        self.name, f"giving up after {attempt} attempts: {_describe(e)}"
+                    ) from e
+                delay = self._backoff(attempt, e)
+                logger.warning(f"{self.name} call failed ({_describe(e)}), "
+                               f"retry {attempt}/{self.max_attempts - 1} in {delay:.2f}s")
+                self._count("retries")
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            self._count("succeeded")
+            return result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+        counters["throttle_seconds"] = round(counters["throttle_seconds"], 3)
+        return dict(counters, circuit=self.breaker.state, circuit_opened=self.breaker.opened)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, or the server's Retry-After when it sends one"""
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _count(self, counter: str, amount: float = 1):
+        with self._lock:
+            self._counters[counter] += amount
+
+def _describe(error: Exception) -> str:
+    """Error type and first line of its message; some client errors span paragraphs"""
+    message = str(error).strip().splitlines()
+    return f"{type(error).__name__}: {message[0]}" if message else type(error).__name__
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(error, "headers", None) or {}
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        return max(0.0, float(value)) if value is not None else None
+    except (AttributeError, TypeError, ValueError):
+        return None
@@ -0,0 +1,193 @@
+import numpy as np
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAGIC = b"YCASEG1\0"
+# magic, segment count, block count, segments per block
+HEADER = struct.Struct("<8sIII")
+
+class SegmentReader:
+    """
+    Memory-mapped view of one stored transcript
+
+    File layout after the header (all little endian):
+        starts         uint32[n]      segment start in milliseconds
+        durations      uint32[n]      segment duration in milliseconds
+        text_offsets   uint32[n + 1]  offset of each segment in the decompressed text
+        block_offsets  uint64[b + 1]  offset of each compressed block after the arrays
+        blocks         zlib streams, each holding the text of block_size segments
+
+    Timing arrays are read straight from the mapping, and a query only
+    decompresses the blocks holding the segments it returns.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, block_count, self.block_size = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a transcript segment file: {path}")
+
+        offset = HEADER.size
+        self._starts = np.frombuffer(self._mmap, dtype='<u4', count=count, offset=offset)
+        offset += 4 * count
+        self._durations = np.frombuffer(self._mmap, dtype='<u4', count=count, offset=offset)
+        offset += 4 * count
+        self._text_offsets = np.frombuffer(self._mmap, dtype='<u4', count=count + 1, offset=offset)
+        offset += 4 * (count + 1)
+        self._block_offsets = np.frombuffer(self._mmap, dtype='<u8', count=block_count + 1, offset=offset)
+        self._data_offset = offset + 8 * (block_count + 1)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def duration(self) -> float:
+        """Seconds from the start of the transcript to the end of its last segment"""
+        if not len(self):
+            return 0.0
+        return float((self._starts[-1] + self._durations[-1]) / 1000)
+
+    def segments(self, start_index: int = 0, end_index: Optional[int] = None) -> List[Dict]:
+        """Return segments [start_index, end_index) as {"text", "start", "duration"} dicts"""
+        end_index = len(self) if end_index is None else min(end_index, len(self))
+        start_index = max(0, start_index)
+        if start_index >= end_index:
+            return []
+
+        texts = self._texts(start_index, end_index)
+        starts = self._starts[start_index:end_index] / 1000
+        durations = self._durations[start_index:end_index] / 1000
+        return [
+            {"text": text, "start": float(start), "duration": float(duration)}
+            for text, start, duration in zip(texts, starts, durations)
+        ]
+
+    def slice(self, start_seconds: float = 0, end_seconds: Optional[float] = None) -> List[Dict]:
+        """Return the segments spoken between start_seconds and end_seconds"""
+        start_index, end_index = self._range(start_seconds, end_seconds)
+        return self.segments(start_index, end_index)
+
+    def text(self, start_seconds: float = 0, end_seconds: Optional[float] = None) -> str:
+        """
+        Plain text between two times; with no arguments this is the same
+        text SubtitleDownloader writes to the .txt transcript
+        """
+        start_index, end_index = self._range(start_seconds, end_seconds)
+        return ' '.join(text for text in self._texts(start_index, end_index) if text)
+
+    def first_seconds(self, seconds: float) -> str:
+        return self.text(0, seconds)
+
+    def close(self):
+        # Drop the array views first; an mmap cannot close while they are exported
+        self._starts = self._durations = self._text_offsets = self._block_offsets = None
+        self._mmap.close()
+        self._file.close()
+
+    def _range(self, start_seconds: float, end_seconds: Optional[float]):
+        """Index range of segments that overlap [start_seconds, end_seconds)"""
+        start_ms = max(0, int(start_seconds * 1000))
+        end_index = len(self) if end_seconds is None else \
+            int(np.searchsorted(self._starts, int(end_seconds * 1000), side='left'))
+        # Include the segment still being spoken at start_seconds
+        start_index = int(np.searchsorted(self._starts, start_ms, side='right')) - 1
+        if start_index < 0 or self._starts[start_index] + self._durations[start_index] <= start_ms:
+            start_index += 1
+        return start_index, max(start_index, end_index)
+
+    def _texts(self, start_index: int, end_index: int) -> List[str]:
+        """Decode segment texts, decompressing only the blocks that hold them"""
+        if start_index >= end_index:
+            return []
+        first_block = start_index // self.block_size
+        last_block = (end_index - 1) // self.block_size
+        data = b"".join(
+            zlib.decompress(self._mmap[self._data_offset + int(self._block_offsets[block]):
+                                       self._data_offset + int(self._block_offsets[block + 1])])
+            for block in range(first_block, last_block + 1)
+        )
+
+        base = int(self._text_offsets[first_block * self.block_size])
+        offsets = self._text_offsets[start_index:end_index + 1].astype(np.int64) - base
+        return [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
+class SegmentStore:
+    def __init__(self, store_dir: str = os.path.join("subtitles", "segments"), block_size: int = 64,
+                 compression_level: int = 6):
+        """
+        Compact on-disk store of timestamped transcript segments, one file per video
+
+        Args:
+            store_dir: Directory holding the `{video_id}.seg` files
+            block_size: Segments compressed together; smaller blocks make
+                slice queries decompress less at a small cost in file size
+            compression_level: zlib compression level for the text blocks
+        """
+        self.store_dir = store_dir
+        self.block_size = block_size
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+
+    def path_for(self, video_id: str) -> str:
+        return os.path.join(self.store_dir, f"{video_id}.seg")
+
+    def exists(self, video_id: str) -> bool:
+        return os.path.exists(self.path_for(video_id))
+
+    def put(self, video_id: str, segments: List[Dict]) -> str:
+        """Write a transcript's segments, sorted by start time, and return the file path"""
+        ordered = sorted(segments, key=lambda segment: segment['start'])
+        encoded = [(segment.get('text') or '').strip().encode('utf-8') for segment in ordered]
+        starts = np.array([round(segment['start'] * 1000) for segment in ordered], dtype='<u4')
+        durations = np.array([round(segment.get('duration', 0) * 1000) for segment in ordered], dtype='<u4')
+        text_offsets = np.zeros(len(encoded) + 1, dtype='<u4')
+        np.cumsum([len(text) for text in encoded], out=text_offsets[1:])
+
+        blocks = [
+            zlib.compress(b"".join(encoded[i:i + self.block_size]), self.compression_level)
+            for i in range(0, len(encoded), self.block_size)
+        ]
+        block_offsets = np.zeros(len(blocks) + 1, dtype='<u8')
+        np.cumsum([len(block) for block in blocks], out=block_offsets[1:])
+
+        path = self.path_for(video_id)
+        tmp_path = f"{path}.tmp"
+        with self._lock:
+            with open(tmp_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, len(encoded), len(blocks), self.block_size))
+                for array in (starts, durations, text_offsets, block_offsets):
+                    f.write(array.tobytes())
+                for block in blocks:
+                    f.write(block)
+            # Readers that already mapped the old file keep their snapshot
+            os.replace(tmp_path, path)
+        return path
+
+    def open(self, video_id: str) -> Optional[SegmentReader]:
+        """Map a stored transcript for reading, or return None if it is not stored"""
+        path = self.path_for(video_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            return SegmentReader(path)
+        except Exception as e:
+            logger.error(f"Error opening transcript segments {path}: {e}")
+            return None
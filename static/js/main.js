@@ -4,8 +4,11 @@ let uploadTimelineChart = null;
 let durationChart = null;
 let engagementChart = null;
 
-// Store the video data globally for filtering and sorting
-let globalVideoData = [];
+// Video list endpoint of the analysis being shown; filtering, sorting
+// and paging happen server-side
+let currentVideosUrl = null;
+let currentPage = 1;
+const VIDEOS_PER_PAGE = 50;
 
 document.addEventListener('DOMContentLoaded', function() {
     const form = document.getElementById('analyzeForm');
@@ -19,6 +22,7 @@ document.addEventListener('DOMContentLoaded', function() {
         // Get form values
         const channelUrl = document.getElementById('channelUrl').value;
         const monthsBack = document.getElementById('monthsBack').value;
+        const backend = document.getElementById('scraperBackend').value;
         
         // Show loading, hide results and error
         loading.style.display = 'block';
@@ -34,44 +38,46 @@ document.addEventListener('DOMContentLoaded', function() {
                 },
                 body: JSON.stringify({
                     channel_url: channelUrl,
-                    months_back: monthsBack
+                    months_back: monthsBack,
+                    backend: backend
                 })
             });
             
-            const data = await response.json();
+            const job = await response.json();
             
             if (!response.ok) {
-                throw new Error(data.error || 'An error occurred during analysis');
+                throw new Error(job.error || 'An error occurred during analysis');
             }
             
-            // Fetch the full analysis data from the JSON file
-            const analysisResponse = await fetch(`/static/results/${data.json_file}`);
-            const analysisData = await analysisResponse.json();
+            // Wait for the background job to finish while showing its progress
+            const data = await waitForJob(job.events_url);
+            
+            // Fetch the precomputed chart data for the stored analysis
+            const chartsResponse = await fetch(data.charts_url);
+            const charts = await chartsResponse.json();
             
             // Update basic stats
             document.getElementById('videoCount').textContent = data.video_count;
             document.getElementById('subtitleCount').textContent = data.subtitle_count;
             document.getElementById('ideasText').textContent = data.ideas;
+            populateTopics(data.topics);
             
-            // Calculate and display total views
-            const totalViews = calculateTotalViews(analysisData.video_data);
-            document.getElementById('totalViews').textContent = formatNumber(totalViews);
+            // Display total views
+            document.getElementById('totalViews').textContent = formatNumber(charts.total_views);
             
             // Update download links
-            document.getElementById('csvDownload').href = `/static/results/${data.csv_file}`;
-            document.getElementById('jsonDownload').href = `/static/results/${data.json_file}`;
-            
-            // Store video data globally
-            globalVideoData = analysisData.video_data;
+            document.getElementById('csvDownload').href = data.csv_url;
+            document.getElementById('jsonDownload').href = data.json_url;
             
-            // Populate video table
-            populateVideoTable(globalVideoData);
+            // Populate video table with the first page
+            currentVideosUrl = data.videos_url;
+            await loadVideoPage(1);
             
             // Create charts
-            createViewsChart(globalVideoData);
-            createUploadTimelineChart(globalVideoData);
-            createDurationChart(globalVideoData);
-            createEngagementChart(globalVideoData);
+            createViewsChart(charts.views);
+            createUploadTimelineChart(charts.upload_timeline);
+            createDurationChart(charts.duration);
+            createEngagementChart(charts.engagement);
             
             // Show results
             results.style.display = 'block';
@@ -86,13 +92,24 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
     
-    // Set up event listeners for filtering and sorting
+    // Set up event listeners for filtering, sorting and paging
+    let searchTimer = null;
     document.getElementById('videoSearch').addEventListener('input', function() {
-        filterAndSortVideos();
+        // Wait for a pause in typing before asking the server
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(() => loadVideoPage(1), 300);
     });
     
     document.getElementById('videoSort').addEventListener('change', function() {
-        filterAndSortVideos();
+        loadVideoPage(1);
+    });
+    
+    document.getElementById('prevPage').addEventListener('click', function() {
+        loadVideoPage(currentPage - 1);
+    });
+    
+    document.getElementById('nextPage').addEventListener('click', function() {
+        loadVideoPage(currentPage + 1);
     });
     
     // Set up event listeners for advanced features
@@ -127,6 +144,71 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 });
 
+// Follow a job's progress stream until it completes or fails
+function waitForJob(eventsUrl) {
+    const loadingMessage = document.getElementById('loadingMessage');
+    const streamingIdeas = document.getElementById('streamingIdeas');
+    streamingIdeas.textContent = '';
+    streamingIdeas.style.display = 'none';
+    
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(eventsUrl);
+        
+        source.addEventListener('progress', function(e) {
+            loadingMessage.textContent = describeProgress(JSON.parse(e.data));
+        });
+        
+        // Show the ideas while they are still being generated
+        source.addEventListener('token', function(e) {
+            streamingIdeas.textContent += JSON.parse(e.data).text;
+            streamingIdeas.style.display = 'block';
+        });
+        
+        source.addEventListener('completed', function(e) {
+            source.close();
+            streamingIdeas.style.display = 'none';
+            resolve(JSON.parse(e.data).result);
+        });
+        
+        source.addEventListener('failed', function(e) {
+            source.close();
+            streamingIdeas.style.display = 'none';
+            reject(new Error(JSON.parse(e.data).error || 'An error occurred during analysis'));
+        });
+        
+        source.onerror = function() {
+            // EventSource reconnects on its own unless the stream was closed for good
+            if (source.readyState === EventSource.CLOSED) {
+                reject(new Error('Lost connection to the analysis job'));
+            }
+        };
+    });
+}
+
+// Turn a job progress event into a status line
+function describeProgress(progress) {
+    switch (progress.stage) {
+        case 'scraping':
+            return progress.videos_scraped !== undefined
+                ? `Scraped ${progress.videos_scraped} videos`
+                : 'Scraping channel videos...';
+        case 'subtitles': {
+            const failed = progress.subtitles_failed ? `, ${progress.subtitles_failed} failed` : '';
+            return progress.scraping
+                ? `Downloading subtitles ${progress.subtitles_done}/${progress.subtitles_total}${failed} (still scraping)...`
+                : `Downloading subtitles ${progress.subtitles_done}/${progress.subtitles_total}${failed}...`;
+        }
+        case 'topics':
+            return 'Finding topics in transcripts...';
+        case 'llm':
+            return 'Generating content ideas...';
+        case 'saving':
+            return 'Saving results...';
+        default:
+            return 'Analyzing channel content... This may take a few minutes.';
+    }
+}
+
 // Helper function to format numbers
 function formatNumber(num) {
     if (num >= 1000000) {
@@ -138,120 +220,60 @@ function formatNumber(num) {
     return num.toString();
 }
 
-// Calculate total views from video data
-function calculateTotalViews(videoData) {
-    return videoData.reduce((total, video) => {
-        // Parse the views string (e.g., "1.3m", "215k") to a number
-        const viewsStr = video.views || "0";
-        let multiplier = 1;
-        
-        if (viewsStr.toLowerCase().includes('k')) {
-            multiplier = 1000;
-        } else if (viewsStr.toLowerCase().includes('m')) {
-            multiplier = 1000000;
-        }
-        
-        // Extract the numeric part and multiply
-        const numericPart = parseFloat(viewsStr.replace(/[^0-9.]/g, ''));
-        const views = isNaN(numericPart) ? 0 : numericPart * multiplier;
-        
-        return total + views;
-    }, 0);
-}
-
-// Filter and sort videos based on search input and sort selection
-function filterAndSortVideos() {
-    const searchTerm = document.getElementById('videoSearch').value.toLowerCase();
-    const sortOption = document.getElementById('videoSort').value;
-    
-    // Filter videos based on search term
-    let filteredVideos = globalVideoData.filter(video => 
-        video.title.toLowerCase().includes(searchTerm)
-    );
+// Fetch one page of videos matching the search input and sort selection
+async function loadVideoPage(page) {
+    if (!currentVideosUrl) return;
+    
+    const params = new URLSearchParams({
+        q: document.getElementById('videoSearch').value,
+        sort: document.getElementById('videoSort').value,
+        page: page,
+        per_page: VIDEOS_PER_PAGE
+    });
+    const response = await fetch(`${currentVideosUrl}?${params}`);
+    const data = await response.json();
     
-    // Sort videos based on selected option
-    switch(sortOption) {
-        case 'views-desc':
-            filteredVideos.sort((a, b) => parseViewsString(b.views) - parseViewsString(a.views));
-            break;
-        case 'views-asc':
-            filteredVideos.sort((a, b) => parseViewsString(a.views) - parseViewsString(b.views));
-            break;
-        case 'date-desc':
-            filteredVideos.sort((a, b) => compareDates(b.upload_date, a.upload_date));
-            break;
-        case 'date-asc':
-            filteredVideos.sort((a, b) => compareDates(a.upload_date, b.upload_date));
-            break;
-        case 'duration-desc':
-            filteredVideos.sort((a, b) => parseDuration(b.duration) - parseDuration(a.duration));
-            break;
-        case 'duration-asc':
-            filteredVideos.sort((a, b) => parseDuration(a.duration) - parseDuration(b.duration));
-            break;
+    if (!response.ok) {
+        throw new Error(data.error || 'Could not load videos');
     }
     
-    // Update the table with filtered and sorted videos
-    populateVideoTable(filteredVideos);
+    // Update the table and pager
+    currentPage = data.page;
+    populateVideoTable(data.videos);
+    document.getElementById('pageInfo').textContent = `Page ${data.page} of ${data.pages} (${data.total} videos)`;
+    document.getElementById('prevPage').disabled = data.page <= 1;
+    document.getElementById('nextPage').disabled = data.page >= data.pages;
 }
 
-// Helper function to parse views string to number for sorting
-function parseViewsString(viewsStr) {
-    if (!viewsStr) return 0;
-    
-    let multiplier = 1;
-    if (viewsStr.toLowerCase().includes('k')) {
-        multiplier = 1000;
-    } else if (viewsStr.toLowerCase().includes('m')) {
-        multiplier = 1000000;
+// List topic clusters found in the transcripts, best performing first
+function populateTopics(topics) {
+    const card = document.getElementById('topicsCard');
+    const list = document.getElementById('topicsList');
+    list.innerHTML = '';
+    
+    if (!topics || !topics.clusters.length) {
+        card.style.display = 'none';
+        return;
     }
     
-    const numericPart = parseFloat(viewsStr.replace(/[^0-9.]/g, ''));
-    return isNaN(numericPart) ? 0 : numericPart * multiplier;
-}
-
-// Helper function to compare dates for sorting
-function compareDates(dateA, dateB) {
-    // Convert relative dates to a numeric value for comparison
-    function dateToValue(dateStr) {
-        if (!dateStr) return 0;
+    topics.clusters.forEach(cluster => {
+        const item = document.createElement('li');
+        item.className = 'list-group-item';
         
-        const now = new Date();
+        const heading = document.createElement('div');
+        heading.style.fontWeight = '500';
+        heading.textContent = cluster.keywords.slice(0, 5).join(', ');
         
-        if (dateStr.includes('day')) {
-            const days = parseInt(dateStr);
-            return now - (days * 24 * 60 * 60 * 1000);
-        } else if (dateStr.includes('week')) {
-            const weeks = parseInt(dateStr);
-            return now - (weeks * 7 * 24 * 60 * 60 * 1000);
-        } else if (dateStr.includes('month')) {
-            const months = parseInt(dateStr);
-            return now - (months * 30 * 24 * 60 * 60 * 1000);
-        } else if (dateStr.includes('year')) {
-            const years = parseInt(dateStr);
-            return now - (years * 365 * 24 * 60 * 60 * 1000);
-        }
+        const stats = document.createElement('small');
+        stats.className = 'text-muted';
+        stats.textContent = `${cluster.size} videos · avg ${formatNumber(cluster.mean_views)} views · ` +
+            `${Math.round(cluster.view_share * 100)}% of views`;
         
-        return 0;
-    }
-    
-    return dateToValue(dateA) - dateToValue(dateB);
-}
-
-// Helper function to parse duration string to seconds for sorting
-function parseDuration(durationStr) {
-    if (!durationStr) return 0;
-    
-    const parts = durationStr.split(':');
-    if (parts.length === 2) {
-        // MM:SS format
-        return parseInt(parts[0]) * 60 + parseInt(parts[1]);
-    } else if (parts.length === 3) {
-        // HH:MM:SS format
-        return parseInt(parts[0]) * 3600 + parseInt(parts[1]) * 60 + parseInt(parts[2]);
-    }
-    
-    return 0;
+        item.appendChild(heading);
+        item.appendChild(stats);
+        list.appendChild(item);
+    });
+    card.style.display = 'block';
 }
 
 // Populate video table with data
@@ -301,7 +323,7 @@ function populateVideoTable(videoData) {
 }
 
 // Create views chart
-function createViewsChart(videoData) {
+function createViewsChart(viewsData) {
     // Destroy existing chart if it exists
     if (viewsChart) {
         viewsChart.destroy();
@@ -309,30 +331,11 @@ function createViewsChart(videoData) {
     
     const ctx = document.getElementById('viewsChart').getContext('2d');
     
-    // Prepare data
-    const labels = videoData.map(video => {
-        // Truncate long titles
-        const title = video.title;
+    // Prepare data, truncating long titles
+    const labels = viewsData.labels.map(title => {
         return title.length > 20 ? title.substring(0, 20) + '...' : title;
     });
     
-    // Parse views from the views string instead of using views_count
-    const viewsData = videoData.map(video => {
-        // Parse the views string (e.g., "1.3m", "215k") to a number
-        const viewsStr = video.views || "0";
-        let multiplier = 1;
-        
-        if (viewsStr.toLowerCase().includes('k')) {
-            multiplier = 1000;
-        } else if (viewsStr.toLowerCase().includes('m')) {
-            multiplier = 1000000;
-        }
-        
-        // Extract the numeric part and multiply
-        const numericPart = parseFloat(viewsStr.replace(/[^0-9.]/g, ''));
-        return isNaN(numericPart) ? 0 : numericPart * multiplier;
-    });
-    
     // Create gradient
     const gradient = ctx.createLinearGradient(0, 0, 0, 400);
     gradient.addColorStop(0, '#03C0C1');
@@ -344,7 +347,7 @@ function createViewsChart(videoData) {
             labels: labels,
             datasets: [{
                 label: 'Views',
-                data: viewsData,
+                data: viewsData.values,
                 backgroundColor: gradient,
                 borderColor: '#009C9D',
                 borderWidth: 1,
@@ -396,7 +399,7 @@ function createViewsChart(videoData) {
 }
 
 // Create upload timeline chart
-function createUploadTimelineChart(videoData) {
+function createUploadTimelineChart(timeline) {
     // Destroy existing chart if it exists
     if (uploadTimelineChart) {
         uploadTimelineChart.destroy();
@@ -404,19 +407,9 @@ function createUploadTimelineChart(videoData) {
     
     const ctx = document.getElementById('uploadTimelineChart').getContext('2d');
     
-    // Process data to group by upload time
-    const uploadGroups = {};
-    
-    videoData.forEach(video => {
-        const uploadDate = video.upload_date || 'Unknown';
-        if (!uploadGroups[uploadDate]) {
-            uploadGroups[uploadDate] = 0;
-        }
-        uploadGroups[uploadDate]++;
-    });
-    
-    const labels = Object.keys(uploadGroups);
-    const counts = Object.values(uploadGroups);
+    // Videos are grouped by upload time server-side
+    const labels = timeline.labels;
+    const counts = timeline.counts;
     
     // Create gradient
     const gradient = ctx.createLinearGradient(0, 0, 0, 400);
@@ -469,7 +462,7 @@ function createUploadTimelineChart(videoData) {
 }
 
 // Create duration chart
-function createDurationChart(videoData) {
+function createDurationChart(durationData) {
     // Destroy existing chart if it exists
     if (durationChart) {
         durationChart.destroy();
@@ -477,27 +470,9 @@ function createDurationChart(videoData) {
     
     const ctx = document.getElementById('durationChart').getContext('2d');
     
-    // Process data to categorize durations
-    const durationCategories = {
-        'Short (< 10 min)': 0,
-        'Medium (10-20 min)': 0,
-        'Long (> 20 min)': 0
-    };
-    
-    videoData.forEach(video => {
-        const duration = parseDuration(video.duration);
-        
-        if (duration < 600) { // Less than 10 minutes
-            durationCategories['Short (< 10 min)']++;
-        } else if (duration < 1200) { // 10-20 minutes
-            durationCategories['Medium (10-20 min)']++;
-        } else { // More than 20 minutes
-            durationCategories['Long (> 20 min)']++;
-        }
-    });
-    
-    const labels = Object.keys(durationCategories);
-    const data = Object.values(durationCategories);
+    // Durations are bucketed into short, medium and long server-side
+    const labels = durationData.labels;
+    const data = durationData.counts;
     
     // Create chart
     durationChart = new Chart(ctx, {
@@ -547,7 +522,7 @@ function createDurationChart(videoData) {
 }
 
 // Create engagement chart (views per video duration)
-function createEngagementChart(videoData) {
+function createEngagementChart(topEngagement) {
     // Destroy existing chart if it exists
     if (engagementChart) {
         engagementChart.destroy();
@@ -555,26 +530,7 @@ function createEngagementChart(videoData) {
     
     const ctx = document.getElementById('engagementChart').getContext('2d');
     
-    // Calculate engagement (views per minute) for each video
-    const engagementData = videoData.map(video => {
-        const views = parseViewsString(video.views);
-        const duration = parseDuration(video.duration) / 60; // Convert to minutes
-        
-        // Avoid division by zero
-        const engagement = duration > 0 ? views / duration : 0;
-        
-        return {
-            title: video.title,
-            engagement: engagement,
-            views: views,
-            duration: duration
-        };
-    });
-    
-    // Sort by engagement and take top 5
-    const topEngagement = engagementData
-        .sort((a, b) => b.engagement - a.engagement)
-        .slice(0, 5);
+    // The top 5 videos by views per minute are selected server-side
     
     // Create chart
     engagementChart = new Chart(ctx, {
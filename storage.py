@@ -0,0 +1,326 @@
+from sqlalchemy import (
+    Column, DateTime, ForeignKey, Integer, JSON, String, Text, create_engine, func, select
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from channel_index import normalize_channel_url
+from video_metrics import add_metrics
+from datetime import datetime
+import glob
+import json
+import logging
+import os
+import re
+import sys
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Base = declarative_base()
+
+def video_id_from_url(video_url: str) -> str:
+    """Return the 11 character video ID of a watch URL, or the URL itself"""
+    match = re.search(r'(?:v=|youtu\.be/|embed/)([0-9A-Za-z_-]{11})', video_url or '')
+    return match.group(1) if match else video_url
+
+class Channel(Base):
+    __tablename__ = "channels"
+
+    id = Column(Integer, primary_key=True)
+    key = Column(String(255), unique=True, nullable=False, index=True)
+    url = Column(String(512), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+
+class Video(Base):
+    __tablename__ = "videos"
+
+    id = Column(String(32), primary_key=True)
+    channel_id = Column(Integer, ForeignKey("channels.id"), nullable=False, index=True)
+    title = Column(Text, nullable=False)
+    url = Column(String(512), nullable=False)
+    views = Column(String(64))
+    upload_date = Column(String(64))
+    duration = Column(String(32))
+    thumbnail_url = Column(Text)
+    updated_at = Column(DateTime, nullable=False, default=datetime.now)
+
+class Transcript(Base):
+    __tablename__ = "transcripts"
+
+    video_id = Column(String(32), ForeignKey("videos.id"), primary_key=True)
+    text = Column(Text, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.now)
+
+class Analysis(Base):
+    __tablename__ = "analyses"
+
+    id = Column(Integer, primary_key=True)
+    channel_id = Column(Integer, ForeignKey("channels.id"), nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.now, index=True)
+    months_back = Column(Integer)
+    videos_analyzed = Column(Integer, nullable=False, default=0)
+    videos_with_subtitles = Column(Integer, nullable=False, default=0)
+    generated_ideas = Column(Text)
+    extra = Column(JSON)
+
+class AnalysisVideo(Base):
+    """Snapshot of a video's metadata as it was when an analysis ran"""
+    __tablename__ = "analysis_videos"
+
+    analysis_id = Column(Integer, ForeignKey("analyses.id"), primary_key=True)
+    video_id = Column(String(32), ForeignKey("videos.id"), primary_key=True, index=True)
+    position = Column(Integer, nullable=False)
+    views = Column(String(64))
+    upload_date = Column(String(64))
+
+class Storage:
+    UPSERT_CHUNK_SIZE = 500
+
+    def __init__(self, db_url: str = "sqlite:///yca.db"):
+        """
+        SQL storage for channels, videos, transcripts and analyses
+
+        Args:
+            db_url: SQLAlchemy database URL
+        """
+        connect_args = {"check_same_thread": False} if db_url.startswith("sqlite") else {}
+        self.engine = create_engine(db_url, connect_args=connect_args)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+
+    def _insert(self, table):
+        if self.engine.dialect.name == "postgresql":
+            return postgresql_insert(table)
+        return sqlite_insert(table)
+
+    def _upsert(self, session: Session, table, rows: List[Dict], key_columns: List[str]):
+        """Insert rows, updating the non-key columns of rows that already exist"""
+        # Chunk to stay below the database's bound parameter limit
+        for start in range(0, len(rows), self.UPSERT_CHUNK_SIZE):
+            chunk = rows[start:start + self.UPSERT_CHUNK_SIZE]
+            stmt = self._insert(table).values(chunk)
+            update_columns = {
+                column: stmt.excluded[column] for column in chunk[0] if column not in key_columns
+            }
+            session.execute(stmt.on_conflict_do_update(index_elements=key_columns, set_=update_columns))
+
+    def _channel_id(self, session: Session, channel_url: str) -> int:
+        key = normalize_channel_url(channel_url)
+        channel = session.scalar(select(Channel).where(Channel.key == key))
+        if not channel:
+            channel = Channel(key=key, url=channel_url)
+            session.add(channel)
+            session.flush()
+        return channel.id
+
+    def upsert_videos(self, channel_url: str, videos: List[Dict]) -> int:
+        """Insert or update a channel's videos in one statement and return the channel ID"""
+        with self.Session.begin() as session:
+            channel_id = self._channel_id(session, channel_url)
+            self._upsert_videos(session, channel_id, videos)
+            return channel_id
+
+    def _upsert_videos(self, session: Session, channel_id: int, videos: List[Dict]):
+        now = datetime.now()
+        rows = {}
+        for video in videos:
+            video_id = video_id_from_url(video["url"])
+            rows[video_id] = {
+                "id": video_id,
+                "channel_id": channel_id,
+                "title": video.get("title") or "",
+                "url": video["url"],
+                "views": video.get("views"),
+                "upload_date": video.get("upload_date"),
+                "duration": video.get("duration"),
+                "thumbnail_url": video.get("thumbnail_url"),
+                "updated_at": now,
+            }
+        self._upsert(session, Video.__table__, list(rows.values()), ["id"])
+
+    def upsert_transcripts(self, subtitles_data: Dict[str, str]):
+        """Store transcripts keyed by video URL; their videos must already exist"""
+        with self.Session.begin() as session:
+            self._upsert_transcripts(session, subtitles_data)
+
+    def _upsert_transcripts(self, session: Session, subtitles_data: Dict[str, str]):
+        now = datetime.now()
+        rows = {
+            video_id_from_url(url): {"video_id": video_id_from_url(url), "text": text, "updated_at": now}
+            for url, text in subtitles_data.items()
+        }
+        self._upsert(session, Transcript.__table__, list(rows.values()), ["video_id"])
+
+    def save_analysis(self, channel_url: str, videos: List[Dict], subtitles_data: Dict[str, str],
+                      ideas: str, months_back: Optional[int] = None, extra: Optional[Dict] = None,
+                      created_at: Optional[datetime] = None, videos_with_subtitles: Optional[int] = None) -> int:
+        """Store an analysis run together with its videos and transcripts and return its ID"""
+        with self.Session.begin() as session:
+            channel_id = self._channel_id(session, channel_url)
+            self._upsert_videos(session, channel_id, videos)
+            self._upsert_transcripts(session, subtitles_data)
+
+            analysis = Analysis(
+                channel_id=channel_id,
+                created_at=created_at or datetime.now(),
+                months_back=months_back,
+                videos_analyzed=len(videos),
+                videos_with_subtitles=len(subtitles_data) if videos_with_subtitles is None else videos_with_subtitles,
+                generated_ideas=ideas,
+                extra=extra,
+            )
+            session.add(analysis)
+            session.flush()
+
+            snapshots = {}
+            for position, video in enumerate(videos):
+                video_id = video_id_from_url(video["url"])
+                snapshots.setdefault(video_id, {
+                    "analysis_id": analysis.id,
+                    "video_id": video_id,
+                    "position": position,
+                    "views": video.get("views"),
+                    "upload_date": video.get("upload_date"),
+                })
+            if snapshots:
+                session.execute(AnalysisVideo.__table__.insert(), list(snapshots.values()))
+            logger.info(f"Saved analysis {analysis.id} with {len(videos)} videos")
+            return analysis.id
+
+    def get_analysis(self, analysis_id: int) -> Optional[Dict]:
+        """
+        Return an analysis in the same shape as the old analysis_<ts>.json files,
+        with parsed metrics (views_count, duration_seconds, published_at, ...)
+        added to each video
+        """
+        with self.Session() as session:
+            analysis = session.get(Analysis, analysis_id)
+            if not analysis:
+                return None
+            channel = session.get(Channel, analysis.channel_id)
+            rows = session.execute(
+                select(Video, AnalysisVideo)
+                .join(AnalysisVideo, AnalysisVideo.video_id == Video.id)
+                .where(AnalysisVideo.analysis_id == analysis_id)
+                .order_by(AnalysisVideo.position)
+            ).all()
+            video_data = add_metrics([
+                {
+                    "title": video.title,
+                    "url": video.url,
+                    "views": snapshot.views,
+                    "upload_date": snapshot.upload_date,
+                    "duration": video.duration,
+                    "thumbnail_url": video.thumbnail_url,
+                }
+                for video, snapshot in rows
+            ], reference=analysis.created_at)
+            return {
+                "analysis_id": analysis.id,
+                "channel_url": channel.url,
+                "analysis_date": analysis.created_at.strftime('%Y%m%d_%H%M%S'),
+                "videos_analyzed": analysis.videos_analyzed,
+                "videos_with_subtitles": analysis.videos_with_subtitles,
+                "video_data": video_data,
+                "generated_ideas": analysis.generated_ideas,
+                **(analysis.extra or {}),
+            }
+
+    def list_analyses(self, channel_url: Optional[str] = None, limit: int = 50, offset: int = 0) -> List[Dict]:
+        """Return analysis summaries, newest first, optionally for a single channel"""
+        with self.Session() as session:
+            query = (
+                select(Analysis, Channel)
+                .join(Channel, Channel.id == Analysis.channel_id)
+                .order_by(Analysis.created_at.desc())
+                .limit(limit)
+                .offset(offset)
+            )
+            if channel_url:
+                query = query.where(Channel.key == normalize_channel_url(channel_url))
+            return [
+                {
+                    "analysis_id": analysis.id,
+                    "channel_url": channel.url,
+                    "analysis_date": analysis.created_at.strftime('%Y%m%d_%H%M%S'),
+                    "months_back": analysis.months_back,
+                    "videos_analyzed": analysis.videos_analyzed,
+                    "videos_with_subtitles": analysis.videos_with_subtitles,
+                }
+                for analysis, channel in session.execute(query).all()
+            ]
+
+    def get_transcript(self, video_id: str) -> Optional[str]:
+        with self.Session() as session:
+            transcript = session.get(Transcript, video_id)
+            return transcript.text if transcript else None
+
+    def count_analyses(self) -> int:
+        with self.Session() as session:
+            return session.scalar(select(func.count(Analysis.id)))
+
+    def import_results_dir(self, results_dir: str = "static/results", subtitles_dir: str = "subtitles") -> int:
+        """
+        Import the analysis_<ts>.json files written by earlier versions
+
+        Transcripts found in subtitles_dir are attached to the imported videos.
+        Files whose timestamp and channel were already imported are skipped.
+        Returns the number of analyses imported.
+        """
+        imported = 0
+        for path in sorted(glob.glob(os.path.join(results_dir, "analysis_*.json"))):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    results = json.load(f)
+                created_at = datetime.strptime(results["analysis_date"], '%Y%m%d_%H%M%S')
+                channel_url = results["channel_url"]
+                videos = results.get("video_data", [])
+
+                with self.Session() as session:
+                    exists = session.scalar(
+                        select(Analysis.id)
+                        .join(Channel, Channel.id == Analysis.channel_id)
+                        .where(Channel.key == normalize_channel_url(channel_url), Analysis.created_at == created_at)
+                    )
+                if exists:
+                    continue
+
+                videos = [video for video in map(self._repair_imported_video, videos) if video]
+                subtitles_data = {}
+                for video in videos:
+                    subtitle_path = os.path.join(subtitles_dir, f"{video_id_from_url(video['url'])}.en.txt")
+                    if os.path.exists(subtitle_path):
+                        with open(subtitle_path, 'r', encoding='utf-8') as f:
+                            subtitles_data[video['url']] = f.read()
+
+                self.save_analysis(
+                    channel_url, videos, subtitles_data, results.get("generated_ideas"),
+                    created_at=created_at,
+                    videos_with_subtitles=results.get("videos_with_subtitles"),
+                )
+                imported += 1
+            except Exception as e:
+                logger.error(f"Error importing {path}: {e}")
+        logger.info(f"Imported {imported} analyses from {results_dir}")
+        return imported
+
+    @staticmethod
+    def _repair_imported_video(video: Dict) -> Optional[Dict]:
+        """Older result files can lack the video URL; recover it from the thumbnail"""
+        if video.get("url"):
+            return video
+        match = re.search(r'/vi/([0-9A-Za-z_-]{11})/', video.get("thumbnail_url") or "")
+        if not match:
+            return None
+        return {**video, "url": f"https://www.youtube.com/watch?v={match.group(1)}"}
+
+if __name__ == "__main__":
+    # Usage: python storage.py import [results_dir]
+    if len(sys.argv) >= 2 and sys.argv[1] == "import":
+        results_dir = sys.argv[2] if len(sys.argv) > 2 else "static/results"
+        count = Storage().import_results_dir(results_dir)
+        print(f"Imported {count} analyses from {results_dir}")
+    else:
+        print("Usage: python storage.py import [results_dir]")
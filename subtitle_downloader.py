@@ -1,24 +1,176 @@
-from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
+from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound, \
+    TooManyRequests, YouTubeRequestFailed
+import requests
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import logging
 import os
 import re
-from typing import Dict, Optional
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from transcript_cache import TranscriptCache
+from transcript_search import TranscriptSearchIndex
+from segment_store import SegmentReader, SegmentStore
+from resilience import Upstream, UpstreamUnavailable
+from metrics import REGISTRY
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+TRANSCRIPT_SECONDS = REGISTRY.histogram(
+    "yca_transcript_fetch_seconds", "Time to get one video's transcript, from cache or YouTube", ["outcome"]
+)
+TRANSCRIPT_ERRORS = REGISTRY.counter(
+    "yca_transcript_errors_total", "Transcript downloads that failed with an unexpected error"
+)
+
+def is_retryable_transcript_error(error: Exception) -> bool:
+    """Throttling and network failures are worth retrying; missing transcripts are not"""
+    return isinstance(error, (TooManyRequests, YouTubeRequestFailed, requests.ConnectionError, requests.Timeout))
+
 class SubtitleDownloader:
-    def __init__(self, output_dir: str = "subtitles"):
-        """Initialize the subtitle downloader with output directory"""
+    def __init__(self, output_dir: str = "subtitles", negative_cache_ttl: int = 24 * 3600,
+                 max_cache_bytes: int = 500 * 1024 * 1024,
+                 search_index: Optional[TranscriptSearchIndex] = None,
+                 upstream: Optional[Upstream] = None):
+        """
+        Initialize the subtitle downloader with output directory
+        
+        Args:
+            output_dir: Directory where transcripts are saved and cached
+            negative_cache_ttl: Seconds to remember videos without transcripts
+            max_cache_bytes: Size limit for the transcripts kept in output_dir
+            search_index: Optional full-text index updated as transcripts are saved
+            upstream: Rate limit, retry and circuit breaker settings for YouTube
+                transcript requests; pass one Upstream to share it between downloaders
+        """
         self.output_dir = output_dir
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
+        self.cache = TranscriptCache(output_dir, negative_ttl=negative_cache_ttl, max_bytes=max_cache_bytes)
+        self.search_index = search_index
+        # Timestamped segments, kept alongside the plain-text transcripts
+        self.segment_store = SegmentStore(os.path.join(output_dir, "segments"))
+        self.cache.add_sidecar(self.segment_store.path_for)
+        self.upstream = upstream or Upstream("transcripts", is_retryable_transcript_error)
             
     def download_subtitle(self, video_url: str) -> Optional[str]:
-        """Download subtitle for a given YouTube video URL"""
+        """
+        Download subtitle for a given YouTube video URL
+        
+        Returns None when the video has no transcript. Raises
+        UpstreamUnavailable when YouTube kept throttling or failing, so that
+        is never mistaken for a video without subtitles.
+        """
+        downloaded, _ = self._download(video_url)
+        return downloaded[0] if downloaded else None
+        
+    def open_segments(self, video_url: str) -> Optional[SegmentReader]:
+        """Map the timestamped segments of a downloaded transcript, if they were stored"""
+        video_id = self._extract_video_id(video_url)
+        return self.segment_store.open(video_id) if video_id else None
+        
+    def download_many(self, video_urls: Iterable[str], max_workers: int = 8,
+                      on_result: Optional[Callable[[str, Optional[str], bool], None]] = None,
+                      max_pending: Optional[int] = None,
+                      executor: Optional[ThreadPoolExecutor] = None) -> Dict[str, str]:
+        """
+        Download subtitles for several videos concurrently
+        
+        URLs are pulled from video_urls only as download slots free up, so a
+        generator (e.g. YouTubeScraper.iter_channel_videos) is consumed while
+        it is still producing and is paused when downloads fall behind.
+        
+        Args:
+            video_urls: YouTube video URLs to fetch subtitles for
+            max_workers: Maximum number of downloads running at the same time
+            on_result: Optional callback invoked with (url, text or None, failed) as
+                each download finishes. failed is True when the download itself
+                went wrong (throttling, an open circuit, unexpected errors) rather
+                than the video having no subtitles
+            max_pending: Maximum number of URLs taken from video_urls but not
+                finished yet; defaults to twice max_workers
+            executor: Optional pool shared with other callers, so several analyses
+                together never run more downloads than its size. It is left
+                running; without one a private pool of max_workers is used
+            
+        Returns:
+            Dictionary mapping video URLs to subtitle text. Videos without
+            subtitles or whose download failed are left out.
+        """
+        max_workers = max(1, max_workers)
+        max_pending = max(max_workers, max_pending or 2 * max_workers)
+        subtitles = {}
+        seen = set()
+        pending = {}
+        failed = []
+        
+        def finish(future):
+            url = pending.pop(future)
+            try:
+                downloaded, outcome = future.result()
+            except Exception as e:
+                logger.error(f"Error downloading subtitles for {url}: {e}")
+                downloaded, outcome = None, "unavailable"
+            if outcome in ("error", "unavailable"):
+                failed.append(url)
+                
+            text = downloaded[1] if downloaded else None
+            if text is not None:
+                subtitles[url] = text
+            if on_result:
+                on_result(url, text, outcome in ("error", "unavailable"))
+                
+        owns_executor = executor is None
+        if owns_executor:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            for url in video_urls:
+                if not url or url in seen:
+                    continue
+                seen.add(url)
+                # Report downloads that finished while the producer was busy
+                for future in [future for future in pending if future.done()]:
+                    finish(future)
+                # Backpressure: stop pulling URLs until a pending download finishes
+                while len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finish(future)
+                pending[executor.submit(self._download, url)] = url
+                
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(future)
+        finally:
+            if owns_executor:
+                executor.shutdown(wait=True)
+                
+        logger.info(f"Downloaded subtitles for {len(subtitles)}/{len(seen)} videos"
+                    + (f", {len(failed)} failed" if failed else ""))
+        return subtitles
+        
+    def _download(self, video_url: str) -> Tuple[Optional[Tuple[str, str]], str]:
+        """Fetch and save the subtitle for a video like _fetch, and record its latency"""
+        start = time.perf_counter()
+        outcome = "unavailable"
+        try:
+            downloaded, outcome = self._fetch(video_url)
+            return downloaded, outcome
+        finally:
+            TRANSCRIPT_SECONDS.observe(time.perf_counter() - start, outcome=outcome)
+            
+    def _fetch(self, video_url: str) -> Tuple[Optional[Tuple[str, str]], str]:
+        """
+        Fetch and save the subtitle for a video
+        
+        Returns:
+            Tuple of ((path, text) or None, outcome), the outcome being one of
+            "cached", "downloaded", "missing" or "error"
+        """
         if not video_url:
             logger.error("Received empty video URL")
-            return None
+            return None, "error"
             
         logger.info(f"Attempting to download subtitles for: {video_url}")
         try:
@@ -26,13 +178,25 @@ class SubtitleDownloader:
             video_id = self._extract_video_id(video_url)
             if not video_id:
                 logger.error(f"Could not extract video ID from URL: {video_url}")
-                return None
+                return None, "error"
                 
             logger.info(f"Video ID: {video_id}")
             
+            # Serve from the transcript cache when possible
+            cached_text = self.cache.get(video_id)
+            if cached_text is not None:
+                logger.info(f"Using cached transcript for video: {video_id}")
+                # Transcripts cached before the index existed are indexed on first use
+                if self.search_index and not self.search_index.contains(video_id):
+                    self._index_transcript(video_id, cached_text)
+                return (self.cache.path_for(video_id), cached_text), "cached"
+            if self.cache.is_known_missing(video_id):
+                logger.info(f"Skipping video without transcript (cached): {video_id}")
+                return None, "missing"
+                
             # Get available transcript list
             try:
-                transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+                transcript_list = self.upstream.call(YouTubeTranscriptApi.list_transcripts, video_id)
                 # Get available languages without accessing private attributes
                 available_languages = []
                 for transcript in transcript_list:
@@ -40,7 +204,8 @@ class SubtitleDownloader:
                 logger.info(f"Available transcripts: {available_languages}")
             except (TranscriptsDisabled, NoTranscriptFound) as e:
                 logger.info(f"No transcripts available for video: {video_id}. Error: {str(e)}")
-                return None
+                self.cache.put_missing(video_id)
+                return None, "missing"
                 
             # Try to get English transcript
             transcript = None
@@ -61,30 +226,51 @@ class SubtitleDownloader:
                         logger.info(f"Translated transcript from another language to English")
                     except (NoTranscriptFound, Exception) as e:
                         logger.info(f"Could not find or translate any transcript: {str(e)}")
-                        return None
+                        if isinstance(e, NoTranscriptFound):
+                            self.cache.put_missing(video_id)
+                        return None, "missing"
             
             if not transcript:
                 logger.info("No English transcript found")
-                return None
+                self.cache.put_missing(video_id)
+                return None, "missing"
                 
             # Fetch the transcript data
-            transcript_data = transcript.fetch()
+            transcript_data = self.upstream.call(transcript.fetch)
             logger.info(f"Successfully fetched transcript with {len(transcript_data)} entries")
             
+            # Keep the timing of every segment before flattening to text
+            try:
+                self.segment_store.put(video_id, transcript_data)
+            except Exception as e:
+                logger.error(f"Error storing transcript segments for {video_id}: {e}")
+                
             # Convert transcript to plain text
             text_content = self._convert_transcript_to_text(transcript_data)
             
             # Save to file
-            txt_path = os.path.join(self.output_dir, f"{video_id}.en.txt")
-            with open(txt_path, 'w', encoding='utf-8') as txt_file:
-                txt_file.write(text_content)
+            txt_path = self.cache.put(video_id, text_content)
+            self._index_transcript(video_id, text_content)
                 
             logger.info(f"Successfully saved transcript to: {txt_path}")
-            return txt_path
-                
+            return (txt_path, text_content), "downloaded"
+            
+        except UpstreamUnavailable:
+            # Not cached as missing: the transcript may well exist
+            raise
         except Exception as e:
             logger.error(f"Error downloading subtitles for {video_url}: {e}")
-            return None
+            TRANSCRIPT_ERRORS.inc()
+            return None, "error"
+            
+    def _index_transcript(self, video_id: str, text: str):
+        """Add a transcript to the search index; indexing errors never fail a download"""
+        if not self.search_index:
+            return
+        try:
+            self.search_index.add(video_id, text)
+        except Exception as e:
+            logger.error(f"Error indexing transcript for {video_id}: {e}")
             
     def _extract_video_id(self, video_url: str) -> Optional[str]:
         """Extract YouTube video ID from URL"""
@@ -0,0 +1,103 @@
+import openai
+import pytest
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+# The application modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+class OpenAIStub:
+    """Local OpenAI-compatible chat completions endpoint with scripted failures"""
+
+    def __init__(self):
+        # Request bodies in arrival order
+        self.requests: List[Dict] = []
+        # (status, headers) answered before the normal reply, one per request
+        self.failures: List[Tuple[int, Dict[str, str]]] = []
+        # Builds the completion text from a request body
+        self.reply: Callable[[Dict], str] = lambda body: "IDEAS"
+        # Seconds every successful reply takes
+        self.delay = 0.0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def api_base(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub._lock:
+                    stub.requests.append(body)
+                    failure = stub.failures.pop(0) if stub.failures else None
+                if failure:
+                    status, headers = failure
+                    self._send(status, {"error": {"message": "scripted failure", "type": "stub"}}, headers)
+                    return
+                time.sleep(stub.delay)
+                content = stub.reply(body)
+                self._send(200, {
+                    "id": "stub", "object": "chat.completion",
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                 "finish_reason": "stop"}],
+                    "usage": {"total_tokens": len(content.split()) + 10},
+                })
+
+            def _send(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+@pytest.fixture
+def openai_stub():
+    stub = OpenAIStub()
+    stub.start()
+    api_base, api_key = openai.api_base, openai.api_key
+    try:
+        yield stub
+    finally:
+        stub.stop()
+        # IdeaGenerator configures the openai module globally
+        openai.api_base, openai.api_key = api_base, api_key
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    """
+    The Flask app module, imported once with its data files in a temporary directory
+
+    Tests that touch storage swap the module's storage objects for their own.
+    """
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("app"))
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    app.app.config["TESTING"] = True
+    return app
@@ -0,0 +1,76 @@
+import pytest
+from datetime import datetime
+from analysis_queries import MAX_PER_PAGE, AnalysisQueryCache
+from storage import Storage
+
+CHANNEL_URL = "https://www.youtube.com/@cabinbuilder"
+
+def make_videos(count: int):
+    return [
+        {"title": f"{'Cabin' if n % 2 else 'Garden'} video {n}", "url": f"https://www.youtube.com/watch?v=vid{n:08d}",
+         "views": f"{n * 10} views", "upload_date": f"{n + 1} days ago", "duration": f"{n % 30}:00",
+         "thumbnail_url": None}
+        for n in range(count)
+    ]
+
+@pytest.fixture
+def analysis(app_module, monkeypatch):
+    storage = Storage("sqlite:///:memory:")
+    monkeypatch.setattr(app_module, "storage", storage)
+    monkeypatch.setattr(app_module, "analysis_queries", AnalysisQueryCache(storage))
+    analysis_id = storage.save_analysis(CHANNEL_URL, make_videos(120), {}, "IDEAS", months_back=2,
+                                        created_at=datetime(2024, 3, 1))
+    return app_module.app.test_client(), analysis_id
+
+def test_videos_are_paginated_and_clamped(analysis):
+    client, analysis_id = analysis
+    body = client.get(f"/analyses/{analysis_id}/videos?page=2&per_page=50").get_json()
+    assert (body["total"], body["page"], body["per_page"], body["pages"]) == (120, 2, 50, 3)
+    assert len(body["videos"]) == 50
+
+    body = client.get(f"/analyses/{analysis_id}/videos?page=0&per_page=100000").get_json()
+    assert (body["page"], body["per_page"]) == (1, MAX_PER_PAGE)
+    assert len(body["videos"]) == 120
+    body = client.get(f"/analyses/{analysis_id}/videos?page=9").get_json()
+    assert body["videos"] == []
+
+def test_videos_are_filtered_and_sorted(analysis):
+    client, analysis_id = analysis
+    body = client.get(f"/analyses/{analysis_id}/videos?q=cabin&sort=views-asc&per_page=5").get_json()
+    assert body["total"] == 60
+    assert [video["views_count"] for video in body["videos"]] == [10, 30, 50, 70, 90]
+
+    body = client.get(f"/analyses/{analysis_id}/videos?sort=views-desc&per_page=1").get_json()
+    assert body["videos"][0]["title"] == "Cabin video 119"
+
+def test_bad_video_queries_are_rejected(analysis):
+    client, analysis_id = analysis
+    response = client.get(f"/analyses/{analysis_id}/videos?sort=title;drop table videos")
+    assert response.status_code == 400
+    assert "Unknown sort option" in response.get_json()["error"]
+    assert client.get(f"/analyses/{analysis_id}/videos?per_page=lots").status_code == 400
+    assert client.get("/analyses/999/videos").status_code == 404
+
+def test_video_pages_are_conditional(analysis):
+    client, analysis_id = analysis
+    response = client.get(f"/analyses/{analysis_id}/videos")
+    etag = response.headers["ETag"]
+    assert client.get(f"/analyses/{analysis_id}/videos", headers={"If-None-Match": etag}).status_code == 304
+    other = client.get(f"/analyses/{analysis_id}/videos?page=2", headers={"If-None-Match": etag})
+    assert other.status_code == 200
+
+def test_charts_are_aggregated_once_and_answer_304_when_unchanged(analysis):
+    client, analysis_id = analysis
+    response = client.get(f"/analyses/{analysis_id}/charts")
+    assert response.status_code == 200
+    charts = response.get_json()
+    assert charts["total_views"] == sum(n * 10 for n in range(120))
+    assert len(charts["views"]["labels"]) == 50
+    assert sum(charts["duration"]["counts"]) == 120
+    assert len(charts["engagement"]) == 5
+
+    etag = response.headers["ETag"]
+    cached = client.get(f"/analyses/{analysis_id}/charts", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.data == b""
+    assert client.get("/analyses/999/charts").status_code == 404
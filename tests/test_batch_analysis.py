@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import pytest
+from batch_analysis import MAX_BATCH_CHANNELS, StageLimiter, parse_channels
+
+def test_parse_channels_normalizes_and_deduplicates():
+    channels = parse_channels([
+        "https://www.youtube.com/@Cabin",
+        {"channel_url": " youtube.com/@cabin/videos ", "months_back": 2},
+        {"channel_url": "https://www.youtube.com/@Cabin", "months_back": 6},
+        "https://www.youtube.com/@garden",
+    ], default_months_back=2)
+    assert channels == [
+        {"channel_url": "https://www.youtube.com/@Cabin", "months_back": 2},
+        {"channel_url": "https://www.youtube.com/@Cabin", "months_back": 6},
+        {"channel_url": "https://www.youtube.com/@garden", "months_back": 2},
+    ]
+
+@pytest.mark.parametrize("entries", [
+    None,
+    [],
+    "https://www.youtube.com/@cabin",
+    [""],
+    [{"months_back": 2}],
+    [42],
+    [{"channel_url": "https://www.youtube.com/@cabin", "months_back": 0}],
+    [{"channel_url": "https://www.youtube.com/@cabin", "months_back": "six"}],
+    [f"https://www.youtube.com/@channel{n}" for n in range(MAX_BATCH_CHANNELS + 1)],
+])
+def test_parse_channels_rejects_bad_input(entries):
+    with pytest.raises(ValueError):
+        parse_channels(entries)
+
+def test_stage_limiter_caps_concurrent_holders():
+    limiter = StageLimiter({"scraping": 2})
+    lock = threading.Lock()
+    active = [0, 0]  # current, peak
+
+    def work():
+        with limiter.stage("scraping"):
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert active[1] == 2
+    stats = limiter.stats()["scraping"]
+    assert (stats["limit"], stats["active"], stats["waiting"], stats["entered"]) == (2, 0, 0, 6)
+    assert stats["wait_seconds"] > 0
+
+def test_stage_limiter_releases_on_errors_and_ignores_unknown_stages():
+    limiter = StageLimiter({"llm": 1})
+    with pytest.raises(RuntimeError):
+        with limiter.stage("llm"):
+            raise RuntimeError("LLM call failed")
+    with limiter.stage("llm"):
+        assert limiter.stats()["llm"]["active"] == 1
+    with limiter.stage("saving"):
+        pass
+    assert "saving" not in limiter.stats()
+
+def test_cli_rejects_unknown_backend():
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "batch_analysis.py")
+    result = subprocess.run([sys.executable, script, "--backend", "htp", "https://www.youtube.com/@cabin"],
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 2
+    assert "invalid choice: 'htp'" in result.stderr
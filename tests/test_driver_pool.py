@@ -0,0 +1,73 @@
+import threading
+import time
+import driver_pool
+from driver_pool import DriverPool
+
+class FakeDriver:
+    def __init__(self, hang: float = 0.0):
+        self.hang = hang
+        self.quit_called = False
+
+    def execute_script(self, script, *args):
+        time.sleep(self.hang)
+        return 1
+
+    def quit(self):
+        time.sleep(self.hang)
+        self.quit_called = True
+
+def fake_drivers(monkeypatch, hangs):
+    """Make the pool start FakeDrivers, hanging for the given seconds in order"""
+    hangs = list(hangs)
+    monkeypatch.setattr(driver_pool, "create_driver", lambda: FakeDriver(hangs.pop(0) if hangs else 0.0))
+
+def in_background(func, *args):
+    thread = threading.Thread(target=func, args=args)
+    thread.start()
+    return thread
+
+def test_hung_quit_does_not_block_other_checkouts(monkeypatch):
+    fake_drivers(monkeypatch, [0.0, 0.0])
+    pool = DriverPool(max_size=2)
+    first, second = pool.acquire(), pool.acquire()
+    first.broken = True
+    first.driver.hang = 1.0
+
+    quitting = in_background(pool.release, first)
+    time.sleep(0.05)
+    start = time.perf_counter()
+    pool.release(second)
+    assert pool.acquire() is second
+    assert pool.stats()["crashed"] == 1
+    assert time.perf_counter() - start < 0.5
+    quitting.join()
+    assert first.driver.quit_called
+    assert pool.stats()["size"] == 1
+
+def test_hung_health_check_does_not_block_releases(monkeypatch):
+    fake_drivers(monkeypatch, [0.0, 0.0])
+    pool = DriverPool(max_size=2)
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first)
+    first.driver.hang = 1.0
+
+    checking = in_background(pool.acquire)
+    time.sleep(0.05)
+    start = time.perf_counter()
+    pool.release(second)
+    pool.stats()
+    assert time.perf_counter() - start < 0.5
+    checking.join()
+
+def test_recycled_counts_only_worn_out_browsers(monkeypatch):
+    fake_drivers(monkeypatch, [])
+    pool = DriverPool(max_size=2, max_pages=2)
+    worn, other = pool.acquire(), pool.acquire()
+    worn.pages = 2
+    pool.release(worn)
+    pool.close()
+    pool.release(other)
+
+    stats = pool.stats()
+    assert (stats["recycled"], stats["crashed"], stats["size"]) == (1, 0, 0)
+    assert worn.driver.quit_called and other.driver.quit_called
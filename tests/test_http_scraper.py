@@ -0,0 +1,107 @@
+import json
+import os
+import pytest
+from conftest import FIXTURES_DIR
+from http_scraper import (BROWSE_API_URL, ChannelPageClient, extract_initial_data, extract_innertube_config,
+                          parse_continuation_response, parse_initial_videos)
+
+VIDEOS_URL = "https://www.youtube.com/@cabinbuilder/videos"
+
+def fixture_text(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.text)
+
+class FakeSession:
+    """Serves the saved channel page for GET and queued continuation pages for POST"""
+    def __init__(self, html: str, continuations: dict):
+        self.html = html
+        self.continuations = continuations
+        self.posts = []
+
+    def get(self, url, params=None, timeout=None):
+        return FakeResponse(self.html)
+
+    def post(self, url, params=None, json=None, timeout=None):
+        self.posts.append((url, params, json))
+        return FakeResponse(fixture_text(self.continuations[json["continuation"]]))
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def client():
+    client = ChannelPageClient()
+    client.session.close()
+    client.session = FakeSession(fixture_text("channel_videos.html"), {
+        "TOKEN_PAGE_2": "continuation_page2.json",
+        "TOKEN_PAGE_3": "continuation_page3.json",
+    })
+    return client
+
+def test_initial_page_is_parsed():
+    html = fixture_text("channel_videos.html")
+    videos, continuation = parse_initial_videos(extract_initial_data(html))
+
+    assert continuation == "TOKEN_PAGE_2"
+    assert extract_innertube_config(html) == ("AIzaSyFIXTUREKEY", "2.20240301.01.00")
+    # The Shorts reel item has no videoRenderer and is skipped
+    assert [video["url"] for video in videos] == [
+        "https://www.youtube.com/watch?v=aAaAaAaAa01",
+        "https://www.youtube.com/watch?v=aAaAaAaAa02",
+        "https://www.youtube.com/watch?v=aAaAaAaAa03",
+    ]
+    assert videos[0] == {
+        "title": "How I Built a Cabin in 30 Days",
+        "url": "https://www.youtube.com/watch?v=aAaAaAaAa01",
+        "views": "1.2m",
+        "upload_date": "2 days ago",
+        "duration": "18:42",
+        "thumbnail_url": "https://i.ytimg.com/vi/aAaAaAaAa01/hqdefault.jpg?sqp=large",
+    }
+    # Title from runs and duration from the thumbnail overlay when lengthText is missing
+    assert videos[1]["title"] == "Tiny House Tour"
+    assert videos[1]["duration"] == "12:05"
+    assert videos[2]["views"] == "1"
+
+def test_continuation_pages_end_without_a_token():
+    videos, continuation = parse_continuation_response(json.loads(fixture_text("continuation_page2.json")))
+    assert [video["title"] for video in videos] == ["Winter Storm at the Cabin", "Building the Loft"]
+    assert continuation == "TOKEN_PAGE_3"
+
+    videos, continuation = parse_continuation_response(json.loads(fixture_text("continuation_page3.json")))
+    assert [video["title"] for video in videos] == ["First Video Ever"]
+    assert continuation is None
+
+def test_iter_video_pages_follows_continuations_until_the_end(client):
+    pages = list(client.iter_video_pages(VIDEOS_URL))
+
+    assert [len(page) for page in pages] == [3, 2, 1]
+    posts = client.session.posts
+    assert [payload["continuation"] for _, _, payload in posts] == ["TOKEN_PAGE_2", "TOKEN_PAGE_3"]
+    url, params, payload = posts[0]
+    assert url == BROWSE_API_URL
+    assert params["key"] == "AIzaSyFIXTUREKEY"
+    assert payload["context"]["client"]["clientVersion"] == "2.20240301.01.00"
+
+def test_iter_video_pages_respects_max_pages(client):
+    pages = list(client.iter_video_pages(VIDEOS_URL, max_pages=2))
+    assert [len(page) for page in pages] == [3, 2]
+    assert len(client.session.posts) == 1
+
+def test_missing_initial_data(client):
+    html = "<html><head><title>Before you continue to YouTube</title></head><body></body></html>"
+    assert extract_initial_data(html) is None
+
+    client.session.html = html
+    assert list(client.iter_video_pages(VIDEOS_URL)) == []
+    assert client.session.posts == []
@@ -0,0 +1,78 @@
+from idea_generator import IdeaGenerator
+from llm_cache import LLMResponseCache
+from resilience import Upstream
+
+def make_videos(views: str):
+    return [
+        {"url": f"https://www.youtube.com/watch?v=video{i:06d}", "title": f"Video {i}", "views": views,
+         "upload_date": f"{i + 1} days ago", "duration": "10:00"}
+        for i in range(3)
+    ]
+
+def summarize_or_generate(body):
+    prompt = body["messages"][0]["content"]
+    if prompt.lstrip().startswith("Summarize"):
+        title = prompt.split("Title: ", 1)[1].splitlines()[0]
+        return f"SUMMARY {title}"
+    return "IDEAS"
+
+def make_generator(openai_stub, cache_dir):
+    openai_stub.reply = summarize_or_generate
+    return IdeaGenerator("key", max_videos=3, mode="map_reduce", api_base=openai_stub.api_base,
+                         cache=LLMResponseCache(str(cache_dir)), upstream=Upstream("llm", lambda e: False, rate=1000,
+                                                                                   burst=1000))
+
+def test_map_reduce_summarizes_each_video_then_generates_ideas(openai_stub, tmp_path):
+    generator = make_generator(openai_stub, tmp_path)
+    videos = make_videos("1K views")
+    subtitles = {video["url"]: f"transcript of {video['title']} " * 50 for video in videos}
+    timings = {}
+
+    assert generator.analyze_video_data(videos, subtitles, timings=timings) == "IDEAS"
+    prompts = [body["messages"][0]["content"] for body in openai_stub.requests]
+    assert sum(prompt.lstrip().startswith("Summarize") for prompt in prompts) == 3
+    # The reduce prompt is built from the summaries, not the transcripts
+    assert all(f"SUMMARY Video {i}" in prompts[-1] for i in range(3))
+    assert "transcript of" not in prompts[-1]
+    assert timings["llm_calls"] == 4
+    assert timings["cached_calls"] == 0
+
+def test_summaries_are_reused_when_only_views_change(openai_stub, tmp_path):
+    generator = make_generator(openai_stub, tmp_path)
+    subtitles = {video["url"]: f"transcript of {video['title']} " * 50 for video in make_videos("1K views")}
+    generator.analyze_video_data(make_videos("1K views"), subtitles)
+    openai_stub.requests.clear()
+
+    timings = {}
+    generator.analyze_video_data(make_videos("2K views"), subtitles, timings=timings)
+    # Only the ideas call reaches the LLM; its prompt carries the new view counts
+    assert len(openai_stub.requests) == 1
+    assert "2K views" in openai_stub.requests[0]["messages"][0]["content"]
+    assert timings["cached_calls"] == 3
+
+def test_changed_transcript_is_summarized_again(openai_stub, tmp_path):
+    generator = make_generator(openai_stub, tmp_path)
+    videos = make_videos("1K views")
+    subtitles = {video["url"]: f"transcript of {video['title']} " * 50 for video in videos}
+    generator.analyze_video_data(videos, subtitles)
+    openai_stub.requests.clear()
+
+    subtitles[videos[0]["url"]] = "a corrected transcript " * 50
+    generator.analyze_video_data(videos, subtitles)
+    summaries = [body for body in openai_stub.requests
+                 if body["messages"][0]["content"].lstrip().startswith("Summarize")]
+    assert len(summaries) == 1
+    assert "corrected transcript" in summaries[0]["messages"][0]["content"]
+
+def test_timings_separate_llm_calls_from_prompt_building(openai_stub, tmp_path):
+    generator = make_generator(openai_stub, tmp_path)
+    openai_stub.delay = 0.1
+    videos = make_videos("1K views")
+    subtitles = {video["url"]: f"transcript of {video['title']} " * 50 for video in videos}
+    timings = {}
+
+    generator.analyze_video_data(videos, subtitles, use_cache=False, timings=timings)
+    # Three summaries and the ideas call, each at least 0.1s
+    assert timings["llm_seconds"] >= 0.4
+    assert timings["map_seconds"] >= 0.1
+    assert timings["prompt_seconds"] < 0.1
@@ -0,0 +1,124 @@
+import threading
+from job_manager import Job, JobManager
+
+def test_streamed_text_is_merged_into_chunk_events():
+    job = Job("job")
+    job.CHUNK_SECONDS = 3600
+    for token in ["Five ", "ideas ", "for ", "your ", "channel"]:
+        job.emit_chunk("token", token)
+
+    # The first token is published straight away, the rest wait for the next flush
+    assert [event["data"]["text"] for event in job.events if event["event"] == "token"] == ["Five "]
+    job.update("saving")
+    tokens = [event["data"]["text"] for event in job.events if event["event"] == "token"]
+    assert tokens == ["Five ", "ideas for your channel"]
+    assert job.events[-1]["event"] == "progress"
+
+def test_chunk_events_are_dropped_when_the_job_finishes_but_ids_are_kept():
+    manager = JobManager(max_workers=1)
+    release = threading.Event()
+
+    def work(job):
+        for n in range(1000):
+            job.emit_chunk("token", f"{n} ")
+        release.wait(5)
+        return {"ideas": "done"}
+
+    job = manager.submit(work)
+    first = next(event for event in manager.stream(job) if event and event["event"] == "token")
+    release.set()
+    events = list(event for event in manager.stream(job, since=first["id"] + 1) if event)
+
+    assert events[-1]["event"] == "completed"
+    assert all(event["event"] != "token" for event in job.events)
+    # A client resuming from a dropped chunk gets the remaining events, not a replay
+    assert [event["event"] for event in manager.stream(job, since=first["id"] + 1) if event] == ["completed"]
+    ids = [event["id"] for event in job.events]
+    assert ids == sorted(ids)
+    assert job.next_event_id == ids[-1] + 1
+
+def coalesced_work(calls, release=None):
+    def work(job, channel, months_back):
+        calls.append((channel, months_back))
+        if release is not None:
+            release.wait(5)
+        return {"channel": channel}
+    return work
+
+def wait_done(job):
+    while not job.done:
+        job.wait_for_events(job.next_event_id, 1)
+
+def test_concurrent_identical_submits_share_one_job():
+    manager = JobManager(max_workers=4)
+    calls, release = [], threading.Event()
+    work = coalesced_work(calls, release)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        manager.submit_coalesced(("analysis", "chan", 2, "single"), work, "chan", 2))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    release.set()
+
+    jobs = {job.id for job, _ in results}
+    assert len(jobs) == 1
+    assert sorted(coalesced for _, coalesced in results) == [False] + [True] * 7
+    wait_done(results[0][0])
+    assert calls == [("chan", 2)]
+    assert results[0][0].attached == 7
+
+def test_completed_job_is_reused_only_within_the_window(monkeypatch):
+    manager = JobManager(max_workers=1)
+    calls = []
+    key = ("analysis", "chan", 2, "single")
+    first, _ = manager.submit_coalesced(key, coalesced_work(calls), "chan", 2, reuse_seconds=60)
+    wait_done(first)
+
+    again, coalesced = manager.submit_coalesced(key, coalesced_work(calls), "chan", 2, reuse_seconds=60)
+    assert (again, coalesced) == (first, True)
+    fresh, coalesced = manager.submit_coalesced(key, coalesced_work(calls), "chan", 2, reuse_seconds=60, fresh=True)
+    assert fresh is not first and not coalesced
+    wait_done(fresh)
+
+    finished_at = fresh.finished_at
+    monkeypatch.setattr("job_manager.time.time", lambda: finished_at + 61)
+    later, coalesced = manager.submit_coalesced(key, coalesced_work(calls), "chan", 2, reuse_seconds=60)
+    assert later is not fresh and not coalesced
+    wait_done(later)
+    assert len(calls) == 3
+
+def test_failed_job_is_not_reused():
+    manager = JobManager(max_workers=1)
+    key = ("analysis", "chan", 2, "single")
+
+    def fail(job):
+        raise RuntimeError("scrape failed")
+
+    failed, _ = manager.submit_coalesced(key, fail, reuse_seconds=3600)
+    wait_done(failed)
+    assert failed.status == "failed"
+
+    retry, coalesced = manager.submit_coalesced(key, coalesced_work([]), "chan", 2, reuse_seconds=3600)
+    assert retry is not failed and not coalesced
+    wait_done(retry)
+    assert retry.status == "completed"
+
+def test_different_analysis_keys_do_not_collide(app_module):
+    analysis_key = app_module.analysis_key
+    manager = JobManager(max_workers=4)
+    calls, release = [], threading.Event()
+    work = coalesced_work(calls, release)
+    keys = [analysis_key("https://www.youtube.com/@Chan", 2, "single"),
+            analysis_key("https://www.youtube.com/@Chan", 3, "single"),
+            analysis_key("https://www.youtube.com/@Chan", 2, "map_reduce")]
+    jobs = [manager.submit_coalesced(key, work, "chan", 2, reuse_seconds=3600) for key in keys]
+    # The same channel spelled differently is the same analysis
+    same, coalesced = manager.submit_coalesced(analysis_key("youtube.com/@chan/videos", 2, "single"), work,
+                                               "chan", 2, reuse_seconds=3600)
+    release.set()
+
+    assert len({job.id for job, _ in jobs}) == 3
+    assert not any(coalesced for _, coalesced in jobs)
+    assert (same, coalesced) == (jobs[0][0], True)
@@ -0,0 +1,62 @@
+import json
+import os
+import time
+from llm_cache import LLMResponseCache
+
+def read_stats(cache: LLMResponseCache) -> dict:
+    with open(os.path.join(cache.cache_dir, cache.STATS_FILE), encoding='utf-8') as f:
+        return json.load(f)
+
+def test_counters_are_flushed_periodically_not_per_lookup(tmp_path):
+    cache = LLMResponseCache(str(tmp_path), stats_flush_interval=3600)
+    cache.put("a" * 64, "hello", total_tokens=10)
+    for _ in range(5):
+        assert cache.get("a" * 64)["content"] == "hello"
+    cache.get("b" * 64)
+
+    assert not os.path.exists(os.path.join(cache.cache_dir, cache.STATS_FILE))
+    assert cache.stats()["hits"] == 5
+
+    cache.flush()
+    assert read_stats(cache) == {"hits": 5, "misses": 1, "evictions": 0, "tokens_saved": 50}
+    # Counters survive a restart
+    assert LLMResponseCache(str(tmp_path)).stats()["hits"] == 5
+
+def test_size_is_tracked_without_listing_the_directory(tmp_path, monkeypatch):
+    cache = LLMResponseCache(str(tmp_path), max_bytes=1000)
+    listings = []
+    real_listdir = os.listdir
+    monkeypatch.setattr(os, "listdir", lambda path: listings.append(path) or real_listdir(path))
+
+    cache.put("a" * 64, "x" * 100)
+    cache.put("a" * 64, "x" * 200)
+    size = os.path.getsize(os.path.join(cache.cache_dir, "a" * 64 + ".json"))
+    assert cache.stats()["total_bytes"] == size
+    assert listings == []
+
+    # Going over max_bytes lists the directory once and evicts the oldest entries
+    for index in range(10):
+        cache.put(str(index) * 64, "y" * 200)
+    stats = cache.stats()
+    assert stats["total_bytes"] <= 1000
+    assert stats["evictions"] > 0
+    assert stats["total_bytes"] == sum(
+        os.path.getsize(os.path.join(cache.cache_dir, name))
+        for name in real_listdir(cache.cache_dir) if name != cache.STATS_FILE
+    )
+
+def test_eviction_drops_least_recently_used_entries(tmp_path):
+    cache = LLMResponseCache(str(tmp_path), max_bytes=10_000)
+    keys = [str(n) * 64 for n in range(3)]
+    for age, key in zip((300, 200, 100), keys):
+        cache.put(key, "x" * 2000)
+        path = os.path.join(cache.cache_dir, f"{key}.json")
+        os.utime(path, (time.time() - age, time.time() - age))
+
+    # The oldest write is read again, so the second one is now least recently used
+    assert cache.get(keys[0])
+    cache.put("9" * 64, "x" * 5000)
+
+    assert cache.get(keys[0]) and cache.get(keys[2])
+    assert cache.get(keys[1]) is None
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,49 @@
+import random
+from idea_generator import IdeaGenerator
+from near_duplicates import NearDuplicateDetector, duplicate_of
+
+def transcript(seed: int, words: int) -> str:
+    rng = random.Random(seed)
+    return " ".join(f"word{rng.randrange(3000)}" for _ in range(words))
+
+def video(video_id: str, views: str = "1K views") -> dict:
+    return {"url": f"https://www.youtube.com/watch?v={video_id}", "title": video_id, "views": views,
+            "upload_date": "1 day ago", "duration": "10:00"}
+
+def test_short_clips_of_a_longer_video_are_grouped(tmp_path):
+    full = transcript(1, 3000).split()
+    for share in (0.1, 0.25, 0.5):
+        detector = NearDuplicateDetector(str(tmp_path / str(share)))
+        start = len(full) // 3
+        clip = " ".join(full[start:start + int(len(full) * share)])
+        videos = [video("fullvideo01"), video("clipvideo01"), video("othervideo1")]
+        subtitles = {videos[0]["url"]: " ".join(full), videos[1]["url"]: clip, videos[2]["url"]: transcript(2, 2000)}
+
+        groups = detector.find_groups(videos, subtitles)
+        assert len(groups) == 1
+        assert groups[0]["representative"] == videos[0]["url"]
+        assert [duplicate["url"] for duplicate in groups[0]["duplicates"]] == [videos[1]["url"]]
+        assert groups[0]["duplicates"][0]["similarity"] == 1.0
+
+def test_stored_signatures_are_reused(tmp_path):
+    videos = [video("fullvideo01"), video("reupload001")]
+    text = transcript(3, 1000)
+    subtitles = {videos[0]["url"]: text, videos[1]["url"]: text}
+    first = NearDuplicateDetector(str(tmp_path)).find_groups(videos, subtitles)
+
+    # A fresh detector reads the same signatures from disk
+    assert (tmp_path / "fullvideo01.minhash").exists()
+    assert NearDuplicateDetector(str(tmp_path)).find_groups(videos, subtitles) == first
+    assert len(first) == 1
+
+def test_duplicates_are_labelled_in_the_prompt(tmp_path):
+    videos = [video("fullvideo01", "2K views"), video("reupload001")]
+    text = transcript(4, 1000)
+    unique, groups = NearDuplicateDetector(str(tmp_path)).deduplicate(
+        videos, {videos[0]["url"]: text, videos[1]["url"]: text}
+    )
+
+    prompt = IdeaGenerator("key")._prepare_analysis_prompt(videos, unique, duplicate_of=duplicate_of(groups))
+    assert "Has Subtitles: Yes" in prompt
+    assert "Has Subtitles: Same content as 'fullvideo01'" in prompt
+    assert "Has Subtitles: No" not in prompt
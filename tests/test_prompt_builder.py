@@ -0,0 +1,73 @@
+import numpy as np
+from prompt_builder import allocate_budget, compress_transcript, count_tokens, split_sentences
+
+def test_short_transcripts_are_returned_unchanged():
+    text = "Short and sweet."
+    assert compress_transcript(text, 100) == text
+    assert compress_transcript(text, 0) == ""
+
+def test_sentences_that_do_not_fit_are_skipped_not_the_rest():
+    # The top scoring sentence repeats the transcript's key words and is too long for the budget
+    long_sentence = " ".join(["cabin roof timber frame insulation"] * 5) + "."
+    short_sentences = [f"The cabin roof {word} was fine." for word in ("timber", "frame", "insulation")]
+    filler = [f"Filler sentence number {n} about nothing." for n in range(20)]
+    text = " ".join([long_sentence] + short_sentences + filler)
+    budget = count_tokens(long_sentence) - 1
+
+    excerpt = compress_transcript(text, budget)
+
+    assert long_sentence not in excerpt
+    assert all(sentence in excerpt for sentence in short_sentences)
+    assert count_tokens(excerpt) <= budget + len(excerpt.split(" ... "))
+
+def test_selected_sentences_keep_their_original_order():
+    sentences = [f"Sentence {n} talks about topic{n % 3} and topic{n % 5}." for n in range(40)]
+    excerpt = compress_transcript(" ".join(sentences), 60)
+    kept = excerpt.split(" ... ")
+    assert len(kept) > 1
+    assert [sentences.index(sentence) for sentence in kept] == sorted(sentences.index(sentence) for sentence in kept)
+
+def test_truncates_at_a_word_boundary_only_when_no_sentence_fits():
+    words = [f"word{n}" for n in range(25)]
+    text = " ".join(words) + ". " + " ".join(reversed(words)) + "."
+    excerpt = compress_transcript(text, 5)
+    assert excerpt
+    assert count_tokens(excerpt) <= 5
+    assert all(word in words for word in excerpt.split())
+
+def test_unpunctuated_text_is_split_into_pseudo_sentences():
+    sentences = split_sentences(" ".join(["word"] * 65))
+    assert [len(sentence.split()) for sentence in sentences] == [30, 30, 5]
+
+def test_allocate_budget_is_proportional_to_weights():
+    allocation = allocate_budget(np.array([3, 1]), np.array([1000, 1000]), 400)
+    assert allocation.tolist() == [300, 100]
+
+def test_allocate_budget_gives_leftovers_to_items_that_need_more():
+    allocation = allocate_budget(np.array([1, 1, 1]), np.array([10, 1000, 1000]), 310)
+    assert allocation.tolist() == [10, 150, 150]
+
+def test_allocate_budget_never_exceeds_needs_or_budget():
+    allocation = allocate_budget(np.array([5, 0, 1]), np.array([50, 20, 0]), 1000)
+    assert allocation.tolist() == [50, 20, 0]
+    allocation = allocate_budget(np.array([1, 2, 3]), np.array([500, 500, 500]), 100)
+    assert allocation.sum() <= 100
+    assert (allocation <= 500).all()
+
+def test_large_channel_prompt_stays_within_the_token_budget():
+    from idea_generator import IdeaGenerator
+
+    videos = [
+        {"url": f"https://www.youtube.com/watch?v=video{i:06d}", "title": f"Video number {i} about cabins",
+         "views": f"{1000 - i}K views", "upload_date": f"{i + 1} days ago", "duration": "10:00"}
+        for i in range(1000)
+    ]
+    subtitles = {video["url"]: "The cabin roof was rebuilt with timber. " * 200 for video in videos[:20]}
+    generator = IdeaGenerator("key", max_videos=10, token_budget=4000)
+
+    prompt = generator._prepare_analysis_prompt(videos, subtitles)
+
+    assert count_tokens(prompt) <= 4000
+    assert "Video number 0 about cabins" in prompt
+    assert "less viewed videos omitted" in prompt
+    assert "Subtitle content for 'Video number 0 about cabins'" in prompt
@@ -0,0 +1,187 @@
+import pytest
+import time
+import resilience
+from idea_generator import IdeaGenerator, is_retryable_openai_error
+from resilience import CircuitBreaker, CircuitOpenError, TokenBucket, Upstream, UpstreamUnavailable
+from subtitle_downloader import SubtitleDownloader, is_retryable_transcript_error
+
+class Transient(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__("transient")
+        self.headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+
+class Refused(Exception):
+    pass
+
+def flaky(failures, error=Transient):
+    """A callable failing `failures` times before returning "ok", counting its calls"""
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error()
+        return "ok"
+    return call, calls
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays instead of sleeping"""
+    recorded = []
+    monkeypatch.setattr(resilience.time, "sleep", recorded.append)
+    return recorded
+
+def make_upstream(**kwargs):
+    settings = dict(rate=1000, burst=1000, max_attempts=4, base_delay=0.5, max_delay=8,
+                    failure_threshold=5, reset_timeout=30)
+    settings.update(kwargs)
+    return Upstream("test", lambda e: isinstance(e, Transient), **settings)
+
+def test_token_bucket_allows_burst_then_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=5)
+    start = time.perf_counter()
+    waits = [bucket.acquire() for _ in range(10)]
+    elapsed = time.perf_counter() - start
+
+    assert waits[:5] == [0.0] * 5
+    assert all(wait > 0 for wait in waits[5:])
+    # Five tokens beyond the burst at 50 per second
+    assert elapsed >= 0.09
+
+def test_transient_errors_are_retried_with_growing_backoff(sleeps, monkeypatch):
+    # Full jitter: take the top of each backoff range
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: high)
+    upstream = make_upstream()
+    func, calls = flaky(3)
+
+    assert upstream.call(func) == "ok"
+    assert len(calls) == 4
+    assert sleeps == [0.5, 1.0, 2.0]
+    assert upstream.stats()["retries"] == 3
+    assert upstream.stats()["succeeded"] == 1
+
+def test_backoff_is_capped_and_jittered(sleeps):
+    upstream = make_upstream(max_attempts=8, base_delay=1, max_delay=3, failure_threshold=100)
+    func, _ = flaky(7)
+
+    upstream.call(func)
+    assert len(sleeps) == 7
+    assert all(0 <= delay <= 3 for delay in sleeps)
+    assert all(delay <= 2 ** attempt for attempt, delay in enumerate(sleeps))
+
+def test_retry_after_header_is_honoured(sleeps):
+    upstream = make_upstream(max_delay=8)
+    func, _ = flaky(2, lambda: Transient(retry_after=1.5))
+
+    upstream.call(func)
+    assert sleeps == [1.5, 1.5]
+
+def test_non_retryable_errors_are_raised_immediately(sleeps):
+    upstream = make_upstream()
+    func, calls = flaky(1, Refused)
+
+    with pytest.raises(Refused):
+        upstream.call(func)
+    assert len(calls) == 1
+    assert sleeps == []
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+def test_gives_up_after_max_attempts(sleeps):
+    upstream = make_upstream(max_attempts=3)
+    func, calls = flaky(10)
+
+    with pytest.raises(UpstreamUnavailable) as raised:
+        upstream.call(func)
+    assert not isinstance(raised.value, CircuitOpenError)
+    assert len(calls) == 3
+    assert upstream.stats()["failed"] == 1
+
+def test_circuit_opens_after_consecutive_failures_and_rejects_calls(sleeps):
+    upstream = make_upstream(max_attempts=1, failure_threshold=3)
+    func, calls = flaky(100)
+
+    for _ in range(3):
+        with pytest.raises(UpstreamUnavailable):
+            upstream.call(func)
+    assert upstream.breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        upstream.call(func)
+    # Rejected without calling the upstream
+    assert len(calls) == 3
+    assert upstream.stats()["rejected"] == 1
+    assert upstream.stats()["circuit_opened"] == 1
+
+def test_half_open_trial_closes_or_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    # Only one trial call at a time
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+def llm_upstream(**kwargs):
+    settings = dict(rate=1000, burst=1000, base_delay=0.01, max_delay=0.05, failure_threshold=3,
+                    reset_timeout=30)
+    settings.update(kwargs)
+    return Upstream("llm", is_retryable_openai_error, **settings)
+
+def test_llm_rate_limits_are_retried_against_local_stub(openai_stub):
+    openai_stub.failures = [(429, {"Retry-After": "0.01"}), (503, {})]
+    generator = IdeaGenerator("key", api_base=openai_stub.api_base, upstream=llm_upstream())
+
+    assert generator._complete([{"role": "user", "content": "hi"}], use_cache=False) == "IDEAS"
+    assert len(openai_stub.requests) == 3
+    assert generator.upstream.stats()["retries"] == 2
+
+def test_llm_bad_requests_are_not_retried(openai_stub):
+    openai_stub.failures = [(400, {})]
+    generator = IdeaGenerator("key", api_base=openai_stub.api_base, upstream=llm_upstream())
+
+    assert generator.analyze_video_data([], {}, use_cache=False) == "Error generating ideas"
+    assert len(openai_stub.requests) == 1
+
+def test_open_llm_circuit_fails_the_analysis(openai_stub):
+    openai_stub.failures = [(500, {})] * 10
+    generator = IdeaGenerator("key", api_base=openai_stub.api_base, upstream=llm_upstream(max_attempts=3))
+
+    with pytest.raises(UpstreamUnavailable):
+        generator.analyze_video_data([], {}, use_cache=False)
+    assert generator.upstream.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        generator.analyze_video_data([], {}, use_cache=False)
+    assert len(openai_stub.requests) == 3
+
+def test_throttled_transcripts_are_reported_as_failures(tmp_path, monkeypatch, sleeps):
+    from youtube_transcript_api import TooManyRequests
+    import subtitle_downloader
+
+    calls = []
+
+    def list_transcripts(video_id):
+        calls.append(video_id)
+        raise TooManyRequests(video_id)
+    monkeypatch.setattr(subtitle_downloader.YouTubeTranscriptApi, "list_transcripts", staticmethod(list_transcripts))
+    downloader = SubtitleDownloader(
+        output_dir=str(tmp_path),
+        upstream=Upstream("transcripts", is_retryable_transcript_error, rate=1000, burst=1000, max_attempts=2)
+    )
+    results = []
+
+    subtitles = downloader.download_many(["https://www.youtube.com/watch?v=abcdefghijk"],
+                                         on_result=lambda *result: results.append(result))
+    assert subtitles == {}
+    assert results == [("https://www.youtube.com/watch?v=abcdefghijk", None, True)]
+    assert len(calls) == 2
+    # The transcript may exist, so it is not remembered as missing
+    assert not downloader.cache.is_known_missing("abcdefghijk")
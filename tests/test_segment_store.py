@@ -0,0 +1,80 @@
+import random
+import pytest
+from segment_store import SegmentReader, SegmentStore
+
+def make_segments(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    words = ["cabin", "roof", "café", "naïve", "日本語", "🙂", "", "  padded  "]
+    segments = []
+    start = 0.0
+    for n in range(count):
+        duration = round(rng.uniform(0.5, 4), 3)
+        text = " ".join(rng.choice(words) for _ in range(rng.randrange(0, 4)))
+        segments.append({"text": text, "start": round(start, 3), "duration": duration})
+        start += duration + rng.choice([0, 0, 0.25])
+    return segments
+
+@pytest.fixture
+def store(tmp_path):
+    return SegmentStore(str(tmp_path / "segments"), block_size=3)
+
+def test_round_trip_preserves_text_and_timing(store):
+    segments = make_segments(50)
+    store.put("video000001", list(reversed(segments)))
+
+    with store.open("video000001") as reader:
+        assert len(reader) == 50
+        stored = reader.segments()
+        assert [segment["text"] for segment in stored] == [segment["text"].strip() for segment in segments]
+        assert [segment["start"] for segment in stored] == [segment["start"] for segment in segments]
+        assert [segment["duration"] for segment in stored] == [segment["duration"] for segment in segments]
+        assert reader.duration == pytest.approx(segments[-1]["start"] + segments[-1]["duration"])
+        assert reader.text() == " ".join(segment["text"].strip() for segment in segments
+                                         if segment["text"].strip())
+
+def test_every_index_range_decodes_across_block_boundaries(store):
+    segments = make_segments(20, seed=1)
+    store.put("video000001", segments)
+    expected = [segment["text"].strip() for segment in segments]
+
+    with store.open("video000001") as reader:
+        for start in range(0, 21):
+            for end in range(start, 22):
+                assert [segment["text"] for segment in reader.segments(start, end)] == expected[start:end]
+
+def test_slices_include_segments_overlapping_the_window(store):
+    segments = [{"text": f"segment {n}", "start": n * 2.0, "duration": 2.0} for n in range(10)]
+    store.put("video000001", segments)
+
+    with store.open("video000001") as reader:
+        # 5.0 falls inside segment 2 (4-6s); the end bound is exclusive
+        assert [segment["text"] for segment in reader.slice(5.0, 10.0)] == \
+            ["segment 2", "segment 3", "segment 4"]
+        assert [segment["text"] for segment in reader.slice(6.0, 8.0)] == ["segment 3"]
+        assert reader.slice(25.0) == []
+        assert reader.text(18.5) == "segment 9"
+        assert reader.first_seconds(4.0) == "segment 0 segment 1"
+        assert reader.first_seconds(0) == ""
+
+def test_empty_and_multibyte_transcripts(store):
+    store.put("emptyvideo1", [])
+    with store.open("emptyvideo1") as reader:
+        assert len(reader) == 0
+        assert reader.segments() == []
+        assert reader.text() == ""
+        assert reader.duration == 0.0
+
+    store.put("unicode0001", [{"text": "日本語の字幕", "start": 0, "duration": 1.5},
+                              {"text": "", "start": 1.5, "duration": 1},
+                              {"text": "emoji 🙂 ok", "start": 2.5, "duration": 1}])
+    with store.open("unicode0001") as reader:
+        assert [segment["text"] for segment in reader.segments()] == ["日本語の字幕", "", "emoji 🙂 ok"]
+        assert reader.text(2.5) == "emoji 🙂 ok"
+
+def test_missing_and_corrupt_files(store, tmp_path):
+    assert store.open("notstored01") is None
+    with open(store.path_for("corrupt0001"), "wb") as f:
+        f.write(b"not a segment file at all")
+    assert store.open("corrupt0001") is None
+    with pytest.raises(ValueError):
+        SegmentReader(store.path_for("corrupt0001"))
@@ -0,0 +1,104 @@
+import json
+import pytest
+from datetime import datetime
+from sqlalchemy import func, select
+from storage import Analysis, AnalysisVideo, Channel, Storage, Transcript, Video
+
+CHANNEL_URL = "https://www.youtube.com/@CabinBuilder/videos"
+
+def make_videos(count: int, views: str = "1K views"):
+    return [
+        {"title": f"Video {n}", "url": f"https://www.youtube.com/watch?v=vid{n:08d}", "views": views,
+         "upload_date": f"{n + 1} days ago", "duration": "10:00", "thumbnail_url": None}
+        for n in range(count)
+    ]
+
+def count(storage: Storage, model) -> int:
+    with storage.Session() as session:
+        return session.scalar(select(func.count()).select_from(model))
+
+@pytest.fixture
+def storage():
+    storage = Storage("sqlite:///:memory:")
+    # Small chunks so a few videos already take several upsert statements
+    storage.UPSERT_CHUNK_SIZE = 7
+    return storage
+
+def test_chunked_upserts_update_instead_of_duplicating(storage):
+    storage.upsert_videos(CHANNEL_URL, make_videos(20))
+    storage.upsert_videos("youtube.com/@cabinbuilder", make_videos(25, views="2K views"))
+
+    assert count(storage, Channel) == 1
+    assert count(storage, Video) == 25
+    with storage.Session() as session:
+        assert set(session.scalars(select(Video.views))) == {"2K views"}
+
+def test_save_and_load_analysis(storage):
+    videos = make_videos(20)
+    subtitles = {videos[0]["url"]: "first transcript", videos[3]["url"]: "fourth transcript"}
+    analysis_id = storage.save_analysis(CHANNEL_URL, videos + videos[:2], subtitles, "IDEAS", months_back=2,
+                                        extra={"topics": ["cabins"]}, created_at=datetime(2024, 3, 1))
+
+    analysis = storage.get_analysis(analysis_id)
+    assert analysis["channel_url"] == CHANNEL_URL
+    assert analysis["analysis_date"] == "20240301_000000"
+    assert analysis["videos_with_subtitles"] == 2
+    assert analysis["generated_ideas"] == "IDEAS"
+    assert analysis["topics"] == ["cabins"]
+    # Repeated videos are stored once, in their first position
+    assert [video["title"] for video in analysis["video_data"]] == [f"Video {n}" for n in range(20)]
+    assert analysis["video_data"][0]["views_count"] == 1000
+    assert storage.get_transcript("vid00000003") == "fourth transcript"
+    assert storage.get_analysis(analysis_id + 1) is None
+
+def test_each_analysis_keeps_its_own_view_snapshot(storage):
+    first = storage.save_analysis(CHANNEL_URL, make_videos(3), {}, "A", created_at=datetime(2024, 3, 1))
+    second = storage.save_analysis(CHANNEL_URL, make_videos(3, views="5K views"), {}, "B",
+                                   created_at=datetime(2024, 3, 8))
+
+    assert count(storage, Video) == 3
+    assert count(storage, AnalysisVideo) == 6
+    assert storage.get_analysis(first)["video_data"][0]["views"] == "1K views"
+    assert storage.get_analysis(second)["video_data"][0]["views"] == "5K views"
+
+def test_list_analyses_newest_first_with_channel_filter_and_paging(storage):
+    for day in (1, 3, 2):
+        storage.save_analysis(CHANNEL_URL, make_videos(2), {}, "A", months_back=day,
+                              created_at=datetime(2024, 3, day))
+    storage.save_analysis("https://www.youtube.com/@gardener", make_videos(1), {}, "B",
+                          created_at=datetime(2024, 3, 5))
+
+    assert [row["months_back"] for row in storage.list_analyses(CHANNEL_URL)] == [3, 2, 1]
+    assert len(storage.list_analyses()) == 4
+    assert [row["analysis_date"] for row in storage.list_analyses(limit=2, offset=1)] == \
+        ["20240303_000000", "20240302_000000"]
+    assert storage.count_analyses() == 4
+
+def test_reimporting_results_does_not_duplicate_rows(storage, tmp_path):
+    results_dir = tmp_path / "results"
+    subtitles_dir = tmp_path / "subtitles"
+    results_dir.mkdir()
+    subtitles_dir.mkdir()
+    videos = make_videos(10)
+    # Old files could lack the URL but still carry the thumbnail
+    videos[4] = {**videos[4], "url": None, "thumbnail_url": "https://i.ytimg.com/vi/vid00000004/hqdefault.jpg"}
+    videos[5] = {**videos[5], "url": None}
+    for stamp in ("20240301_120000", "20240308_120000"):
+        (results_dir / f"analysis_{stamp}.json").write_text(json.dumps({
+            "analysis_date": stamp, "channel_url": CHANNEL_URL, "video_data": videos,
+            "generated_ideas": "IDEAS", "videos_with_subtitles": 1,
+        }))
+    (results_dir / "analysis_broken.json").write_text("{not json")
+    (subtitles_dir / "vid00000001.en.txt").write_text("an old transcript", encoding="utf-8")
+
+    assert storage.import_results_dir(str(results_dir), str(subtitles_dir)) == 2
+    assert storage.import_results_dir(str(results_dir), str(subtitles_dir)) == 0
+
+    assert count(storage, Analysis) == 2
+    assert count(storage, Channel) == 1
+    assert count(storage, Video) == 9
+    assert count(storage, AnalysisVideo) == 18
+    assert count(storage, Transcript) == 1
+    assert storage.get_transcript("vid00000001") == "an old transcript"
+    analysis = storage.list_analyses()[0]
+    assert (analysis["analysis_date"], analysis["videos_analyzed"]) == ("20240308_120000", 9)
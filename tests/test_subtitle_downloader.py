@@ -0,0 +1,76 @@
+import threading
+import time
+import pytest
+import subtitle_downloader as subtitle_module
+from resilience import CircuitOpenError, Upstream
+from subtitle_downloader import SubtitleDownloader
+
+def video_url(n: int) -> str:
+    return f"https://www.youtube.com/watch?v=vid{n:08d}"
+
+@pytest.fixture
+def downloader(tmp_path):
+    return SubtitleDownloader(str(tmp_path), upstream=Upstream("transcripts", lambda e: False, rate=1000,
+                                                               burst=1000))
+
+def test_pipelined_downloads_respect_max_pending(downloader, monkeypatch):
+    lock = threading.Lock()
+    running = [0, 0]  # current, peak
+
+    def slow_fetch(url):
+        with lock:
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        n = int(url[-8:])
+        if n % 5 == 0:
+            return None, "missing"
+        if n % 7 == 0:
+            return None, "error"
+        return (f"{n}.en.txt", f"text {n}"), "downloaded"
+
+    monkeypatch.setattr(downloader, "_fetch", slow_fetch)
+    results = []
+    pulled = []
+    in_flight = []
+
+    def produce():
+        for n in range(1, 61):
+            in_flight.append(len(pulled) - len(results))
+            pulled.append(video_url(n))
+            yield video_url(n)
+            # Duplicates are only downloaded once
+            if n % 10 == 0:
+                yield video_url(n)
+
+    subtitles = downloader.download_many(produce(), max_workers=3, max_pending=4,
+                                         on_result=lambda url, text, failed: results.append((url, text, failed)))
+
+    assert max(in_flight) <= 4
+    assert running[1] <= 3
+    assert sorted(url for url, _, _ in results) == sorted(pulled)
+    assert len(results) == 60
+    for url, text, failed in results:
+        n = int(url[-8:])
+        assert failed == (n % 7 == 0 and n % 5 != 0)
+        assert (text is None) == (n % 5 == 0 or n % 7 == 0)
+    assert set(subtitles) == {url for url, text, _ in results if text is not None}
+
+def test_unavailable_upstream_is_reported_as_failed_not_missing(downloader, monkeypatch):
+    def circuit_open(video_id):
+        raise CircuitOpenError("transcripts", "circuit open")
+
+    monkeypatch.setattr(subtitle_module.YouTubeTranscriptApi, "list_transcripts", circuit_open)
+    results = []
+
+    subtitles = downloader.download_many([video_url(1), video_url(2)],
+                                         on_result=lambda url, text, failed: results.append((url, text, failed)))
+
+    assert subtitles == {}
+    assert sorted(results) == [(video_url(1), None, True), (video_url(2), None, True)]
+    # The transcript may exist, so it must not be remembered as missing
+    assert not downloader.cache.is_known_missing("vid00000001")
+    with pytest.raises(CircuitOpenError):
+        downloader.download_subtitle(video_url(1))
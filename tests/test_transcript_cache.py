@@ -0,0 +1,75 @@
+import json
+import os
+import time
+from transcript_cache import TranscriptCache
+
+def sidecar_path(tmp_path, video_id: str) -> str:
+    return str(tmp_path / f"{video_id}.minhash")
+
+def write(path: str, size: int):
+    with open(path, 'wb') as f:
+        f.write(b"x" * size)
+
+def test_sidecars_count_toward_the_limit_and_are_evicted_with_their_transcript(tmp_path):
+    cache = TranscriptCache(str(tmp_path), max_bytes=9000)
+    cache.add_sidecar(lambda video_id: sidecar_path(tmp_path, video_id))
+
+    write(sidecar_path(tmp_path, "oldvideo001"), 3000)
+    cache.put("oldvideo001", "a" * 1000)
+    assert cache.stats()["total_bytes"] == 4000
+    # Written after the transcript, like the MinHash signature
+    write(sidecar_path(tmp_path, "newvideo001"), 3000)
+    past = time.time() - 60
+    os.utime(cache.path_for("oldvideo001"), (past, past))
+
+    cache.put("newvideo001", "b" * 3000)
+
+    assert not os.path.exists(cache.path_for("oldvideo001"))
+    assert not os.path.exists(sidecar_path(tmp_path, "oldvideo001"))
+    assert os.path.exists(cache.path_for("newvideo001"))
+    assert os.path.exists(sidecar_path(tmp_path, "newvideo001"))
+    assert cache.stats()["total_bytes"] == 6000
+    assert cache.stats()["evictions"] == 1
+
+def test_existing_sidecars_are_counted_on_startup(tmp_path):
+    write(str(tmp_path / "video000001.en.txt"), 500)
+    write(sidecar_path(tmp_path, "video000001"), 700)
+    # A sidecar without a transcript is not part of the cache
+    write(sidecar_path(tmp_path, "unrelated01"), 900)
+
+    cache = TranscriptCache(str(tmp_path))
+    assert cache.stats()["total_bytes"] == 500
+    cache.add_sidecar(lambda video_id: sidecar_path(tmp_path, video_id))
+    assert cache.stats()["total_bytes"] == 1200
+
+def test_negative_entries_expire_after_their_ttl(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = TranscriptCache(str(tmp_path), negative_ttl=3600)
+
+    cache.put_missing("nosubs00001")
+    assert cache.is_known_missing("nosubs00001")
+    now[0] += 3601
+    assert not cache.is_known_missing("nosubs00001")
+    assert cache.stats()["negative_entries"] == 0
+
+def test_negative_cache_writes_are_batched_and_pruned(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    negative_path = tmp_path / TranscriptCache.NEGATIVE_CACHE_FILE
+    cache = TranscriptCache(str(tmp_path), negative_ttl=3600, negative_flush_interval=3600)
+
+    for n in range(100):
+        cache.put_missing(f"nosubs{n:05d}")
+    assert not negative_path.exists()
+    cache.flush()
+    assert len(json.loads(negative_path.read_text())) == 100
+
+    # Expired entries are dropped on the next write and when loading
+    now[0] += 1800
+    cache.put_missing("fresh000001")
+    now[0] += 1801
+    cache.flush()
+    assert json.loads(negative_path.read_text()) == {"fresh000001": now[0] - 1801}
+    negative_path.write_text(json.dumps({"stale000001": now[0] - 7200, "fresh000001": now[0] - 1801}))
+    assert TranscriptCache(str(tmp_path), negative_ttl=3600).stats()["negative_entries"] == 1
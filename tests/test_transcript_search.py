@@ -0,0 +1,76 @@
+import sqlite3
+import pytest
+from transcript_search import TranscriptSearchIndex, to_match_query
+
+def has_fts5() -> bool:
+    try:
+        sqlite3.connect(":memory:").execute("CREATE VIRTUAL TABLE t USING fts5(content)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+pytestmark = pytest.mark.skipif(not has_fts5(), reason="SQLite was built without FTS5")
+
+@pytest.fixture
+def index(tmp_path):
+    index = TranscriptSearchIndex(str(tmp_path / "index.db"))
+    index.add("cabin000001", "Today we frame the cabin roof. The roof needs rafters and the rafters need nails.")
+    index.add("cabin000002", "A quick tour of the cabin. The roof is mentioned once.")
+    index.add("garden00001", "Planting tomatoes in raised beds, and a word about the shed roof.")
+    index.set_video_metadata("https://www.youtube.com/@CabinBuilder", [
+        {"url": "https://www.youtube.com/watch?v=cabin000001", "title": "Framing the roof"},
+        {"url": "https://www.youtube.com/watch?v=cabin000002", "title": "Cabin tour"},
+    ])
+    index.set_video_metadata("https://www.youtube.com/@gardener/videos", [
+        {"url": "https://www.youtube.com/watch?v=garden00001", "title": "Tomatoes"},
+    ])
+    yield index
+    index.close()
+
+def test_results_are_ranked_by_bm25(index):
+    hits = index.search("roof rafters")
+    assert [hit["video_id"] for hit in hits] == ["cabin000001"]
+
+    hits = index.search("roof")
+    assert hits[0]["video_id"] == "cabin000001"
+    assert {hit["video_id"] for hit in hits} == {"cabin000001", "cabin000002", "garden00001"}
+    assert [hit["score"] for hit in hits] == sorted((hit["score"] for hit in hits), reverse=True)
+    assert hits[0]["title"] == "Framing the roof"
+    assert hits[0]["url"] == "https://www.youtube.com/watch?v=cabin000001"
+
+def test_snippets_highlight_matches_and_stemming_applies(index):
+    hits = index.search("planted tomato")
+    assert [hit["video_id"] for hit in hits] == ["garden00001"]
+    assert "[Planting]" in hits[0]["snippet"] and "[tomatoes]" in hits[0]["snippet"]
+
+def test_channel_filter_uses_normalized_urls(index):
+    hits = index.search("roof", channel_url="youtube.com/@cabinbuilder/videos")
+    assert {hit["video_id"] for hit in hits} == {"cabin000001", "cabin000002"}
+    assert all(hit["channel"] == "youtube.com/@cabinbuilder" for hit in hits)
+
+def test_limit_and_offset_page_through_results(index):
+    everything = [hit["video_id"] for hit in index.search("roof")]
+    assert [hit["video_id"] for hit in index.search("roof", limit=1)] == everything[:1]
+    assert [hit["video_id"] for hit in index.search("roof", limit=2, offset=1)] == everything[1:3]
+
+def test_user_input_is_never_parsed_as_fts_syntax(index):
+    assert to_match_query('roof" OR content:* NEAR(') == '"roof" "OR" "content" "NEAR"'
+    assert [hit["video_id"] for hit in index.search('rafters" *')] == ["cabin000001"]
+    assert index.search("***") == []
+
+def test_reindexing_replaces_the_document(index):
+    index.add("cabin000002", "Now it is all about windows.")
+    assert [hit["video_id"] for hit in index.search("windows")] == ["cabin000002"]
+    assert "cabin000002" not in {hit["video_id"] for hit in index.search("roof")}
+    assert index.count() == 3
+
+def test_search_route_validates_paging(app_module, index, monkeypatch):
+    monkeypatch.setattr(app_module, "search_index", index)
+    client = app_module.app.test_client()
+
+    body = client.get("/search?q=roof&limit=1&offset=1").get_json()
+    assert len(body["results"]) == 1
+    assert client.get("/search?q=roof&limit=0").status_code == 400
+    assert client.get("/search?q=roof&offset=-1").status_code == 400
+    assert client.get("/search?q=roof&limit=ten").status_code == 400
+    assert client.get("/search?q=").status_code == 400
@@ -0,0 +1,56 @@
+import pandas as pd
+from datetime import datetime, timedelta
+from video_metrics import add_metrics, parse_durations, parse_upload_dates, parse_views, summarize_channel
+
+REFERENCE = datetime(2024, 3, 1, 12, 0, 0)
+
+def test_parse_views_handles_suffixes_commas_and_no_views():
+    views = pd.Series(["1.2K views", "3.4M views", "1B views", "12,345 views", "No views", "1 view", "999",
+                       None, "2.5k"])
+    assert parse_views(views).tolist() == [1_200, 3_400_000, 1_000_000_000, 12_345, 0, 1, 999, 0, 2_500]
+
+def test_parse_durations_handles_all_clock_formats():
+    durations = pd.Series(["45", "4:05", "1:02:03", "10:00:00", "", "LIVE", None, " 3:07 "])
+    assert parse_durations(durations).tolist() == [45, 245, 3723, 36000, 0, 0, 0, 187]
+
+def test_parse_upload_dates_resolves_relative_strings_against_one_reference():
+    dates = pd.Series(["3 weeks ago", "1 day ago", "Streamed 2 hours ago", "5 months ago", "1 year ago",
+                       "Unknown"])
+    parsed = parse_upload_dates(dates, REFERENCE).tolist()
+    assert parsed == [
+        pd.Timestamp(REFERENCE - timedelta(weeks=3)),
+        pd.Timestamp(REFERENCE - timedelta(days=1)),
+        pd.Timestamp(REFERENCE - timedelta(hours=2)),
+        pd.Timestamp(REFERENCE - timedelta(days=150)),
+        pd.Timestamp(REFERENCE - timedelta(days=365)),
+        pd.Timestamp(REFERENCE),
+    ]
+
+def test_add_metrics_derives_per_day_and_per_minute_rates():
+    videos = [{"title": "A", "url": "a", "views": "1.2K views", "duration": "10:00", "upload_date": "4 days ago"},
+              {"title": "B", "url": "b", "views": "500 views", "duration": "", "upload_date": "5 hours ago"}]
+    first, second = add_metrics(videos, REFERENCE)
+    assert first["views_count"] == 1200
+    assert first["views_per_day"] == 300.0
+    assert first["views_per_minute"] == 120.0
+    # Uploads younger than a day count as one day old, unknown durations give no per-minute rate
+    assert second["views_per_day"] == 500.0
+    assert second["views_per_minute"] == 0.0
+
+def test_summarize_channel():
+    videos = [{"title": f"Video {n}", "url": f"u{n}", "views": f"{n}K views", "duration": "6:00",
+               "upload_date": f"{n} weeks ago"} for n in (1, 2, 3)]
+    summary = summarize_channel(videos, months_back=0.7, reference=REFERENCE)
+    assert summary["video_count"] == 3
+    assert summary["total_views"] == 6000
+    assert summary["median_views"] == 2000
+    assert summary["uploads_per_week"] == 1.0
+    assert summary["mean_duration_minutes"] == 6.0
+    assert summary["top_video"] == {"title": "Video 3", "url": "u3", "views_count": 3000}
+
+def test_summarize_channel_on_no_videos():
+    summary = summarize_channel([], months_back=2, reference=REFERENCE)
+    assert summary["video_count"] == 0
+    assert summary["total_views"] == 0
+    assert summary["top_video"] is None
+    assert add_metrics([], REFERENCE) == []
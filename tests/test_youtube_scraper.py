@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+from youtube_scraper import BULK_EXTRACT_SCRIPT, GRID_STATE_SCRIPT, YouTubeScraper
+
+TILES_PER_BATCH = 5
+
+def raw_tile(n: int) -> dict:
+    return {"href": f"/watch?v=vid{n:08d}", "aria_label": f"Video {n} by Channel", "has_metadata": True,
+            "metadata": [f"{n}K views", f"{n % 5 + 1} days ago"], "duration_candidates": ["10:00"],
+            "has_thumbnail": True, "thumbnail_url": f"https://i.ytimg.com/vi/vid{n:08d}/hq.jpg"}
+
+class FakeDriver:
+    """
+    Channel grid that renders batch i of tiles once the page has been scrolled
+    arrivals[i] times, showing the continuation spinner until the last batch
+    """
+    def __init__(self, arrivals, spinner_forever=False):
+        self.arrivals = arrivals
+        self.spinner_forever = spinner_forever
+        self.scrolls = 0
+        self.title = "Channel - YouTube"
+
+    def get(self, url):
+        pass
+
+    def find_element(self, by, value):
+        return object()
+
+    def _rendered_batches(self):
+        return sum(1 for arrival in self.arrivals if arrival <= self.scrolls)
+
+    def execute_script(self, script, *args):
+        batches = self._rendered_batches()
+        if script == GRID_STATE_SCRIPT:
+            return [batches * TILES_PER_BATCH, self.spinner_forever or batches < len(self.arrivals)]
+        if script == BULK_EXTRACT_SCRIPT:
+            return [raw_tile(n) for n in range(args[0], batches * TILES_PER_BATCH)]
+        if "scrollTo" in script:
+            self.scrolls += 1
+            return None
+        if "scrollHeight" in script:
+            return 1000 * batches
+        raise AssertionError(f"Unexpected script: {script[:40]}")
+
+def make_scraper(driver, **kwargs):
+    pool = SimpleNamespace(acquire=lambda: SimpleNamespace(driver=driver, pages=0, broken=False))
+    return YouTubeScraper(pool=pool, min_wait=0, max_wait=0.05, **kwargs)
+
+def test_slow_continuations_do_not_end_the_grid_early():
+    # The second batch only renders two scrolls later, leaving the page unchanged for one scroll
+    driver = FakeDriver(arrivals=[0, 2, 3, 5])
+    videos = make_scraper(driver).get_channel_videos("https://www.youtube.com/@channel", months_back=1,
+                                                     incremental=False)
+    assert len(videos) == 4 * TILES_PER_BATCH
+
+def test_grid_ends_once_the_spinner_is_gone():
+    driver = FakeDriver(arrivals=[0, 1])
+    videos = make_scraper(driver).get_channel_videos("https://www.youtube.com/@channel", months_back=1,
+                                                     incremental=False)
+    assert len(videos) == 2 * TILES_PER_BATCH
+    # One scroll extracts both batches, the next finds nothing new and no spinner
+    assert driver.scrolls == 2
+
+def test_gives_up_after_stall_checks_when_the_spinner_never_goes():
+    driver = FakeDriver(arrivals=[0], spinner_forever=True)
+    videos = make_scraper(driver, stall_checks=4).get_channel_videos("https://www.youtube.com/@channel",
+                                                                    months_back=1, incremental=False)
+    assert len(videos) == TILES_PER_BATCH
+    # The first scroll extracts the initial tiles, then four scrolls add nothing
+    assert driver.scrolls == 5
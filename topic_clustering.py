@@ -0,0 +1,159 @@
+import numpy as np
+import scipy.sparse as sp
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+from prompt_builder import STOPWORDS
+from video_metrics import build_video_frame
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z']{2,}")
+_STOPWORD_ARRAY = np.array(sorted(STOPWORDS))
+
+def vectorize(texts: List[str], min_df: int = 2, max_df: float = 0.7) -> Tuple[sp.csr_matrix, np.ndarray]:
+    """
+    Build an L2-normalized sparse TF-IDF matrix (documents x terms)
+
+    Terms in fewer than min_df documents or in more than max_df of them
+    carry no topic signal and are dropped. Returns the matrix and its
+    vocabulary.
+    """
+    tokens = [TOKEN_PATTERN.findall(text.lower()) for text in texts]
+    lengths = np.fromiter((len(words) for words in tokens), dtype=np.int64, count=len(tokens))
+    # A dict lookup per word is much cheaper than sorting millions of strings
+    term_ids: Dict[str, int] = {}
+    word_ids = np.fromiter(
+        (term_ids.setdefault(word, len(term_ids)) for doc_words in tokens for word in doc_words),
+        dtype=np.int64, count=int(lengths.sum())
+    )
+    if word_ids.size == 0:
+        return sp.csr_matrix((len(texts), 0)), np.array([], dtype=str)
+
+    vocabulary = np.array(list(term_ids), dtype=str)
+    doc_ids = np.repeat(np.arange(len(texts)), lengths)
+    # Duplicate (document, term) pairs are summed into term counts
+    counts = sp.csr_matrix(
+        (np.ones(word_ids.size), (doc_ids, word_ids)),
+        shape=(len(texts), len(vocabulary))
+    )
+
+    document_frequency = np.diff(counts.tocsc().indptr)
+    min_df = min(min_df, len(texts))
+    useful = (document_frequency >= min_df) & (document_frequency <= max(max_df * len(texts), min_df)) \
+        & ~np.isin(vocabulary, _STOPWORD_ARRAY)
+    counts = counts[:, useful]
+    vocabulary = vocabulary[useful]
+    document_frequency = document_frequency[useful]
+
+    # Sublinear term frequency with smoothed inverse document frequency
+    counts.data = 1 + np.log(counts.data)
+    idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1
+    tfidf = counts @ sp.diags(idf)
+    norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+    tfidf = sp.diags(1 / np.where(norms > 0, norms, 1)) @ tfidf
+    return tfidf.tocsr(), vocabulary
+
+def spherical_kmeans(matrix: sp.csr_matrix, k: int, max_iter: int = 50, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cluster L2-normalized rows by cosine similarity
+
+    Returns (labels, centroids). Initialization is k-means++ with a fixed
+    seed so the same transcripts always give the same clusters.
+    """
+    rng = np.random.default_rng(seed)
+    n = matrix.shape[0]
+    first = rng.integers(n)
+    chosen = [first]
+    # Cosine distance to the closest chosen centre
+    distance = 1 - (matrix @ matrix[first].T).toarray().ravel()
+    for _ in range(1, k):
+        weights = np.clip(distance, 0, None)
+        if weights.sum() <= 0:
+            break
+        candidate = rng.choice(n, p=weights / weights.sum())
+        chosen.append(candidate)
+        distance = np.minimum(distance, 1 - (matrix @ matrix[candidate].T).toarray().ravel())
+    centroids = matrix[chosen].toarray()
+
+    labels = np.full(n, -1)
+    for _ in range(max_iter):
+        new_labels = np.asarray((matrix @ centroids.T).argmax(axis=1)).ravel()
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        # Sum the rows of each cluster with one sparse product
+        membership = sp.csr_matrix((np.ones(n), (labels, np.arange(n))), shape=(len(centroids), n))
+        sums = np.asarray((membership @ matrix).todense())
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # Keep the previous centre for a cluster that lost all its members
+        centroids = np.where(norms > 0, sums / np.where(norms > 0, norms, 1), centroids)
+    return labels, centroids
+
+def cluster_videos(videos: List[Dict], subtitles_data: Dict[str, str], n_clusters: Optional[int] = None,
+                   keywords_per_cluster: int = 8) -> Optional[Dict]:
+    """
+    Group videos with transcripts into topics and summarize each topic's performance
+
+    Args:
+        videos: Video dictionaries as produced by the scrapers
+        subtitles_data: Dictionary mapping video URLs to subtitle text
+        n_clusters: Number of topics; by default about sqrt(videos / 2), between 2 and 12
+        keywords_per_cluster: Highest weighted terms reported per topic
+
+    Returns:
+        {"clusters": [...], "video_clusters": {url: cluster id}} with clusters
+        ordered by average views, or None when there are too few transcripts
+    """
+    frame = build_video_frame([video for video in videos if video.get('url') in subtitles_data])
+    if len(frame) < 3:
+        return None
+
+    matrix, vocabulary = vectorize([subtitles_data[url] for url in frame['url']])
+    if matrix.shape[1] == 0:
+        return None
+    k = n_clusters or int(np.clip(round(np.sqrt(len(frame) / 2)), 2, 12))
+    labels, centroids = spherical_kmeans(matrix, min(k, len(frame)))
+
+    views = frame['views_count'].to_numpy()
+    total_views = max(int(views.sum()), 1)
+    clusters = []
+    for cluster_id in np.unique(labels):
+        members = np.flatnonzero(labels == cluster_id)
+        top_terms = np.argsort(-centroids[cluster_id])[:keywords_per_cluster]
+        member_frame = frame.iloc[members].sort_values('views_count', ascending=False)
+        clusters.append({
+            "id": int(cluster_id),
+            "size": int(len(members)),
+            "keywords": [str(vocabulary[i]) for i in top_terms if centroids[cluster_id, i] > 0],
+            "total_views": int(views[members].sum()),
+            "mean_views": int(views[members].mean()),
+            "median_views": int(np.median(views[members])),
+            "view_share": round(float(views[members].sum()) / total_views, 4),
+            "videos": [
+                {"title": row.title, "url": row.url, "views_count": int(row.views_count)}
+                for row in member_frame.itertuples()
+            ],
+        })
+
+    clusters.sort(key=lambda cluster: cluster["mean_views"], reverse=True)
+    logger.info(f"Clustered {len(frame)} transcripts into {len(clusters)} topics "
+                f"over {matrix.shape[1]} terms")
+    return {
+        "clusters": clusters,
+        "video_clusters": {url: int(label) for url, label in zip(frame['url'], labels)},
+    }
+
+def format_topics_for_prompt(topics: Optional[Dict], max_clusters: int = 8, example_titles: int = 2) -> str:
+    """Condense topic clusters into a few prompt lines, best performing topic first"""
+    if not topics:
+        return ""
+    lines = []
+    for rank, cluster in enumerate(topics["clusters"][:max_clusters], start=1):
+        examples = ", ".join(f"'{video['title']}'" for video in cluster["videos"][:example_titles])
+        lines.append(
+            f"Topic {rank} ({cluster['size']} videos, avg {cluster['mean_views']:,} views, "
+            f"{cluster['view_share']:.0%} of views): {', '.join(cluster['keywords'])}. e.g. {examples}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,247 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TranscriptCache:
+    NEGATIVE_CACHE_FILE = ".no_transcript.json"
+
+    def __init__(self, cache_dir: str = "subtitles", negative_ttl: int = 24 * 3600,
+                 max_bytes: int = 500 * 1024 * 1024, negative_flush_interval: float = 30):
+        """
+        Disk cache of downloaded transcripts keyed by video ID
+
+        Args:
+            cache_dir: Directory holding the `{video_id}.en.txt` files
+            negative_ttl: Seconds a "no transcript" result is remembered before retrying
+            max_bytes: Maximum total size of cached transcripts and their sidecar
+                files; least recently used videos are evicted beyond this
+            negative_flush_interval: Seconds between writes of the "no transcript" list to disk
+        """
+        self.cache_dir = cache_dir
+        self.negative_ttl = negative_ttl
+        self.max_bytes = max_bytes
+        self.negative_flush_interval = negative_flush_interval
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._negative_path = os.path.join(cache_dir, self.NEGATIVE_CACHE_FILE)
+        self._negative = self._load_negative()
+        self._prune_negative()
+        self._negative_dirty = False
+        self._negative_flushed_at = time.monotonic()
+        # Snapshots are numbered so a slow writer never overwrites a newer one
+        self._negative_version = 0
+        self._negative_written = 0
+        self._save_lock = threading.Lock()
+        self._sidecars: List[Callable[[str], str]] = []
+        self._sizes = {
+            name[:-len(".en.txt")]: os.path.getsize(os.path.join(cache_dir, name))
+            for name in os.listdir(cache_dir) if name.endswith(".en.txt")
+        }
+        self._total_bytes = sum(self._sizes.values())
+
+    def path_for(self, video_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{video_id}.en.txt")
+
+    def add_sidecar(self, path_for: Callable[[str], str]):
+        """
+        Register a per-video file derived from the transcript, such as its segments
+
+        Sidecar files count toward max_bytes and are deleted together with the
+        transcript they belong to when it is evicted.
+
+        Args:
+            path_for: Maps a video ID to the sidecar file path
+        """
+        with self._lock:
+            self._sidecars.append(path_for)
+            for video_id in self._sizes:
+                self._set_size(video_id, self._entry_size(video_id))
+
+    def get(self, video_id: str) -> Optional[str]:
+        """Return the cached transcript text or None on a miss"""
+        path = self.path_for(video_id)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except Exception as e:
+            logger.error(f"Error reading cached transcript {path}: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Bump the modification time so eviction treats it as recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def is_known_missing(self, video_id: str) -> bool:
+        """Check whether the video recently had no transcript available"""
+        with self._lock:
+            recorded_at = self._negative.get(video_id)
+            if recorded_at is None:
+                return False
+            if time.time() - recorded_at > self.negative_ttl:
+                # Left on disk until the next write, which prunes expired entries anyway
+                del self._negative[video_id]
+                self._negative_dirty = True
+                return False
+            self.negative_hits += 1
+            return True
+
+    def put(self, video_id: str, text: str) -> str:
+        """Store a transcript and return its file path"""
+        path = self.path_for(video_id)
+        data = text.encode('utf-8')
+        with self._lock:
+            with open(path, 'wb') as f:
+                f.write(data)
+            # Sidecars written before the transcript are picked up here, later ones
+            # on the next put of this video or when eviction re-measures the cache
+            self._set_size(video_id, self._entry_size(video_id))
+            snapshot = None
+            if self._negative.pop(video_id, None) is not None:
+                snapshot = self._negative_changed()
+            self._evict()
+        self._save_negative(snapshot)
+        return path
+
+    def put_missing(self, video_id: str):
+        """Remember that a video has no transcript"""
+        with self._lock:
+            self._negative[video_id] = time.time()
+            snapshot = self._negative_changed()
+        self._save_negative(snapshot)
+
+    def flush(self):
+        """Write "no transcript" entries changed since the last write to disk"""
+        with self._lock:
+            snapshot = self._negative_snapshot() if self._negative_dirty else None
+        self._save_negative(snapshot)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "negative_hits": self.negative_hits,
+                "evictions": self.evictions,
+                "negative_entries": len(self._negative),
+                "total_bytes": self._total_bytes,
+            }
+
+    def _paths(self, video_id: str) -> List[str]:
+        return [self.path_for(video_id)] + [path_for(video_id) for path_for in self._sidecars]
+
+    def _entry_size(self, video_id: str) -> int:
+        """Bytes on disk for a video's transcript plus its sidecar files"""
+        size = 0
+        for path in self._paths(video_id):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def _set_size(self, video_id: str, size: int):
+        self._total_bytes += size - self._sizes.get(video_id, 0)
+        self._sizes[video_id] = size
+
+    def _evict(self):
+        """Delete least recently used transcripts and their sidecars until under the size limit"""
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".en.txt"):
+                video_id = name[:-len(".en.txt")]
+                # Re-measure so sidecars written since the last put are counted
+                self._set_size(video_id, self._entry_size(video_id))
+                entries.append((os.stat(os.path.join(self.cache_dir, name)).st_mtime, video_id))
+        entries.sort()
+
+        for _, video_id in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(self.path_for(video_id))
+            except OSError as e:
+                logger.error(f"Error evicting cached transcript {self.path_for(video_id)}: {e}")
+                continue
+            for path in self._paths(video_id)[1:]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.error(f"Error evicting transcript sidecar {path}: {e}")
+            self._total_bytes -= self._sizes.pop(video_id, 0)
+            self.evictions += 1
+            logger.info(f"Evicted cached transcript: {video_id}")
+
+    def _load_negative(self) -> Dict[str, float]:
+        try:
+            with open(self._negative_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error(f"Error loading negative transcript cache: {e}")
+            return {}
+
+    def _prune_negative(self):
+        """Forget "no transcript" entries older than negative_ttl; the caller holds the lock"""
+        cutoff = time.time() - self.negative_ttl
+        expired = [video_id for video_id, recorded_at in self._negative.items() if recorded_at < cutoff]
+        for video_id in expired:
+            del self._negative[video_id]
+
+    def _negative_changed(self) -> Optional[tuple]:
+        """Mark the negative cache dirty and return a snapshot if a write is due; the caller holds the lock"""
+        self._negative_dirty = True
+        if time.monotonic() - self._negative_flushed_at < self.negative_flush_interval:
+            return None
+        return self._negative_snapshot()
+
+    def _negative_snapshot(self) -> tuple:
+        """Pruned copy of the negative cache to write outside the lock; the caller holds the lock"""
+        self._prune_negative()
+        self._negative_dirty = False
+        self._negative_flushed_at = time.monotonic()
+        self._negative_version += 1
+        return self._negative_version, dict(self._negative)
+
+    def _save_negative(self, snapshot: Optional[tuple]):
+        if snapshot is None:
+            return
+        version, negative = snapshot
+        with self._save_lock:
+            if version <= self._negative_written:
+                return
+            tmp_path = f"{self._negative_path}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(negative, f)
+                os.replace(tmp_path, self._negative_path)
+            except OSError as e:
+                logger.error(f"Error saving negative transcript cache: {e}")
+                return
+            self._negative_written = version
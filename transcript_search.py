@@ -0,0 +1,162 @@
+import sqlite3
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+from channel_index import normalize_channel_url
+from storage import video_id_from_url
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL UNIQUE,
+    channel TEXT,
+    title TEXT,
+    indexed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_channel ON documents (channel);
+CREATE VIRTUAL TABLE IF NOT EXISTS transcript_fts USING fts5(content, tokenize = 'porter unicode61');
+"""
+
+def to_match_query(query: str) -> str:
+    """Quote each search term so user input can never be parsed as FTS5 syntax"""
+    terms = re.findall(r"\w+", query)
+    return " ".join(f'"{term}"' for term in terms)
+
+class TranscriptSearchIndex:
+    def __init__(self, db_path: str = "transcript_index.db"):
+        """
+        SQLite FTS5 full-text index over downloaded transcripts
+
+        Transcript text lives in the FTS table; a documents table maps each
+        row to its video ID and, once known, its channel and title.
+
+        Args:
+            db_path: SQLite database file holding the index
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def contains(self, video_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT indexed_at FROM documents WHERE video_id = ?", (video_id,)
+            ).fetchone()
+        return bool(row and row["indexed_at"])
+
+    def add(self, video_id: str, text: str):
+        """Index (or re-index) one video's transcript"""
+        with self._lock:
+            doc_id = self._doc_id(video_id)
+            self._conn.execute("DELETE FROM transcript_fts WHERE rowid = ?", (doc_id,))
+            self._conn.execute("INSERT INTO transcript_fts (rowid, content) VALUES (?, ?)", (doc_id, text))
+            self._conn.execute("UPDATE documents SET indexed_at = ? WHERE doc_id = ?", (time.time(), doc_id))
+            self._conn.commit()
+
+    def set_video_metadata(self, channel_url: str, videos: List[Dict]):
+        """Record the channel and title of videos so results can be labelled and filtered"""
+        channel = normalize_channel_url(channel_url)
+        rows = [
+            (video_id_from_url(video['url']), channel, video.get('title'))
+            for video in videos if video.get('url')
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO documents (video_id, channel, title) VALUES (?, ?, ?) "
+                "ON CONFLICT (video_id) DO UPDATE SET channel = excluded.channel, title = excluded.title",
+                rows
+            )
+            self._conn.commit()
+
+    def search(self, query: str, channel_url: Optional[str] = None, limit: int = 20,
+               offset: int = 0) -> List[Dict]:
+        """Return transcript hits ranked by BM25, best first, with a highlighted snippet"""
+        match = to_match_query(query)
+        if not match:
+            return []
+
+        sql = (
+            "SELECT d.video_id, d.channel, d.title, "
+            "snippet(transcript_fts, 0, '[', ']', ' ... ', 24) AS snippet, "
+            "bm25(transcript_fts) AS score "
+            "FROM transcript_fts JOIN documents d ON d.doc_id = transcript_fts.rowid "
+            "WHERE transcript_fts MATCH ?"
+        )
+        params: list = [match]
+        if channel_url:
+            sql += " AND d.channel = ?"
+            params.append(normalize_channel_url(channel_url))
+        sql += " ORDER BY score LIMIT ? OFFSET ?"
+        params += [limit, offset]
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {
+                "video_id": row["video_id"],
+                "url": f"https://www.youtube.com/watch?v={row['video_id']}",
+                "title": row["title"],
+                "channel": row["channel"],
+                "snippet": row["snippet"],
+                # bm25() is lower for better matches; flip it so higher is better
+                "score": round(-row["score"], 4),
+            }
+            for row in rows
+        ]
+
+    def index_directory(self, subtitles_dir: str = "subtitles") -> int:
+        """Index every `{video_id}.en.txt` transcript in a directory that is not indexed yet"""
+        added = 0
+        for name in sorted(os.listdir(subtitles_dir)):
+            if not name.endswith(".en.txt"):
+                continue
+            video_id = name[:-len(".en.txt")]
+            if self.contains(video_id):
+                continue
+            try:
+                with open(os.path.join(subtitles_dir, name), 'r', encoding='utf-8') as f:
+                    self.add(video_id, f.read())
+                added += 1
+            except Exception as e:
+                logger.error(f"Error indexing transcript {name}: {e}")
+        logger.info(f"Indexed {added} transcripts from {subtitles_dir}")
+        return added
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM documents WHERE indexed_at IS NOT NULL"
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _doc_id(self, video_id: str) -> int:
+        self._conn.execute("INSERT OR IGNORE INTO documents (video_id) VALUES (?)", (video_id,))
+        return self._conn.execute("SELECT doc_id FROM documents WHERE video_id = ?", (video_id,)).fetchone()[0]
+
+if __name__ == "__main__":
+    # Usage: python transcript_search.py index [subtitles_dir]
+    #        python transcript_search.py search <query>
+    index = TranscriptSearchIndex()
+    if len(sys.argv) >= 2 and sys.argv[1] == "index":
+        subtitles_dir = sys.argv[2] if len(sys.argv) > 2 else "subtitles"
+        print(f"Indexed {index.index_directory(subtitles_dir)} transcripts from {subtitles_dir}")
+    elif len(sys.argv) >= 3 and sys.argv[1] == "search":
+        for hit in index.search(" ".join(sys.argv[2:])):
+            print(f"{hit['score']:8.3f}  {hit['url']}  {hit['title'] or ''}\n          {hit['snippet']}")
+    else:
+        print("Usage: python transcript_search.py index [subtitles_dir] | search <query>")
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+VIEW_MULTIPLIERS = {"": 1, "k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+# Same approximations YouTubeScraper has always used for relative dates
+UNIT_SECONDS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+    "week": 7 * 86400,
+    "month": 30 * 86400,
+    "year": 365 * 86400,
+}
+METRIC_COLUMNS = ("views_count", "duration_seconds", "published_at", "age_days", "views_per_day",
+                  "views_per_minute")
+
+def parse_views(views: pd.Series) -> np.ndarray:
+    """Convert view strings such as "1.2K", "3,456" or "No views" to exact integers"""
+    parts = views.fillna("").astype(str).str.lower().str.replace(",", "", regex=False) \
+        .str.extract(r'(\d+(?:\.\d+)?)\s*([kmb]?)')
+    numbers = pd.to_numeric(parts[0], errors="coerce").fillna(0).to_numpy(dtype=float)
+    multipliers = parts[1].fillna("").map(VIEW_MULTIPLIERS).fillna(1).to_numpy(dtype=float)
+    return np.rint(numbers * multipliers).astype(np.int64)
+
+def parse_durations(durations: pd.Series) -> np.ndarray:
+    """Convert "SS", "MM:SS" or "HH:MM:SS" durations to seconds, 0 when unknown"""
+    parts = durations.fillna("").astype(str).str.strip() \
+        .str.extract(r'^(?:(?:(\d+):)?(\d+):)?(\d+)$')
+    values = parts.apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+    return values @ np.array([3600, 60, 1], dtype=np.int64)
+
+def parse_upload_dates(upload_dates: pd.Series, reference: datetime) -> pd.Series:
+    """
+    Estimate absolute upload times from relative strings like "3 weeks ago"
+
+    Every row is resolved against the same reference time. Strings that
+    cannot be parsed resolve to the reference time itself.
+    """
+    parts = upload_dates.fillna("").astype(str).str.lower() \
+        .str.extract(r'(\d+)\s*(second|minute|hour|day|week|month|year)')
+    numbers = pd.to_numeric(parts[0], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+    seconds = parts[1].map(UNIT_SECONDS).fillna(0).to_numpy(dtype=np.int64)
+    offsets = pd.to_timedelta(numbers * seconds, unit="s")
+    return pd.Series(pd.Timestamp(reference) - offsets, index=upload_dates.index)
+
+def build_video_frame(videos: List[Dict], reference: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Normalize a list of scraped videos into a typed frame in one vectorized pass
+
+    Adds views_count, duration_seconds, published_at, age_days, views_per_day
+    and views_per_minute next to the original columns.
+
+    Args:
+        videos: Video dictionaries as produced by the scrapers
+        reference: Time the relative upload dates were observed, defaults to now
+    """
+    reference = reference or datetime.now()
+    frame = pd.DataFrame(videos)
+    for column in ("views", "duration", "upload_date"):
+        if column not in frame:
+            frame[column] = ""
+    if frame.empty:
+        for column in METRIC_COLUMNS:
+            frame[column] = pd.Series(dtype="datetime64[ns]" if column == "published_at" else float)
+        return frame
+
+    frame["views_count"] = parse_views(frame["views"])
+    frame["duration_seconds"] = parse_durations(frame["duration"])
+    frame["published_at"] = parse_upload_dates(frame["upload_date"], reference)
+
+    age_seconds = (pd.Timestamp(reference) - frame["published_at"]).dt.total_seconds().to_numpy()
+    frame["age_days"] = age_seconds / 86400
+    # Count anything uploaded within the last day as one full day old
+    frame["views_per_day"] = frame["views_count"] / np.maximum(frame["age_days"], 1)
+    minutes = frame["duration_seconds"].to_numpy() / 60
+    frame["views_per_minute"] = np.divide(frame["views_count"].to_numpy(dtype=float), minutes,
+                                          out=np.zeros(len(frame)), where=minutes > 0)
+    return frame
+
+def add_metrics(videos: List[Dict], reference: Optional[datetime] = None) -> List[Dict]:
+    """Return copies of the videos with JSON-serializable metric fields added"""
+    if not videos:
+        return []
+    frame = build_video_frame(videos, reference)
+    frame["published_at"] = frame["published_at"].dt.strftime("%Y-%m-%dT%H:%M:%S")
+    frame["age_days"] = frame["age_days"].round(2)
+    frame["views_per_day"] = frame["views_per_day"].round(2)
+    frame["views_per_minute"] = frame["views_per_minute"].round(2)
+    records = frame.astype(object).where(frame.notna(), None).to_dict(orient="records")
+    return records
+
+def rank_by_views(videos: List[Dict], reference: Optional[datetime] = None) -> List[Dict]:
+    """Return copies of the videos with metrics, most viewed first"""
+    ranked = add_metrics(videos, reference)
+    ranked.sort(key=lambda video: video["views_count"], reverse=True)
+    return ranked
+
+def summarize_channel(videos: List[Dict], months_back: float, reference: Optional[datetime] = None) -> Dict:
+    """
+    Headline numbers for one channel's videos, used to compare channels side by side
+
+    Args:
+        videos: Video dictionaries as produced by the scrapers
+        months_back: Length of the analyzed window, to express the upload rate per week
+        reference: Time the relative upload dates were observed, defaults to now
+    """
+    frame = build_video_frame(videos, reference)
+    weeks = max(30 * months_back / 7, 1)
+    if frame.empty:
+        return {"video_count": 0, "total_views": 0, "mean_views": 0, "median_views": 0,
+                "median_views_per_day": 0.0, "uploads_per_week": 0.0, "mean_duration_minutes": 0.0,
+                "top_video": None}
+
+    top = frame.loc[frame["views_count"].idxmax()]
+    return {
+        "video_count": int(len(frame)),
+        "total_views": int(frame["views_count"].sum()),
+        "mean_views": int(frame["views_count"].mean()),
+        "median_views": int(frame["views_count"].median()),
+        "median_views_per_day": round(float(frame["views_per_day"].median()), 2),
+        "uploads_per_week": round(len(frame) / weeks, 2),
+        "mean_duration_minutes": round(float(frame["duration_seconds"].mean()) / 60, 2),
+        "top_video": {"title": top["title"], "url": top["url"], "views_count": int(top["views_count"])},
+    }
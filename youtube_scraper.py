@@ -1,102 +1,608 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from bs4 import BeautifulSoup
+from driver_pool import DriverPool, create_driver
+from http_scraper import ChannelPageClient
+from channel_index import ChannelIndex
+from video_metrics import parse_upload_dates
+from metrics import REGISTRY
 import pandas as pd
 import time
 import json
 from datetime import datetime, timedelta
 import logging
+import re
+from typing import Dict, List, Optional, Tuple
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Collects the raw fields of every video tile in a single WebDriver round-trip.
+# Mirrors the lookups done element by element in _extract_video_data.
+BULK_EXTRACT_SCRIPT = """
+const tiles = Array.from(document.querySelectorAll('ytd-rich-grid-media')).slice(arguments[0] || 0);
+return tiles.map(tile => {
+    try {
+        const link = Array.from(tile.querySelectorAll('a')).find(a => a.href && a.href.includes('/watch?v='));
+        const metadataLine = tile.querySelector('#metadata-line');
+        const img = tile.querySelector('img');
+        const badge = tile.querySelector('.badge-shape-wiz--thumbnail-badge .badge-shape-wiz__text');
+        const timeStatus = tile.querySelector('ytd-thumbnail-overlay-time-status-renderer');
+        const labelled = tile.querySelector("[aria-label*='minutes'], [aria-label*='seconds']");
+        return {
+            href: link ? link.href : null,
+            aria_label: link ? link.getAttribute('aria-label') : null,
+            title_attr: link ? link.getAttribute('title') : null,
+            title_candidates: Array.from(tile.querySelectorAll('#video-title, #video-title-link'))
+                .map(el => el.getAttribute('title') || el.innerText),
+            has_metadata: metadataLine !== null,
+            metadata: metadataLine
+                ? Array.from(metadataLine.querySelectorAll('.inline-metadata-item')).map(el => el.innerText)
+                : [],
+            duration_candidates: [
+                badge ? badge.innerText : '',
+                timeStatus ? timeStatus.innerText : '',
+                labelled && labelled.getAttribute('aria-label')
+                    ? labelled.getAttribute('aria-label').split(' ')[0] : ''
+            ],
+            has_thumbnail: img !== null,
+            thumbnail_url: img ? img.src : null
+        };
+    } catch (e) {
+        return null;
+    }
+});
+"""
+
+# Number of rendered tiles and whether the continuation spinner is still on the page
+GRID_STATE_SCRIPT = """
+return [
+    document.querySelectorAll('ytd-rich-grid-media').length,
+    document.querySelector('ytd-continuation-item-renderer') !== null
+];
+"""
+
+SCRAPE_SECONDS = REGISTRY.histogram(
+    "yca_scrape_seconds", "Time spent scraping one channel, excluding pauses while the consumer catches up",
+    ["backend"]
+)
+SCRAPE_STEP_SECONDS = REGISTRY.histogram(
+    "yca_scrape_step_seconds", "Wait plus extraction time per scroll (browser) or page (http)", ["backend"]
+)
+PAGE_LOAD_SECONDS = REGISTRY.histogram("yca_browser_page_load_seconds", "Time until the first video tiles rendered")
+SCRAPED_VIDEOS = REGISTRY.counter("yca_scraped_videos_total", "Videos extracted from channel pages", ["backend"])
+SCRAPE_FAILURES = REGISTRY.counter("yca_scrape_failures_total", "Channel scrapes that raised an error", ["backend"])
+BROWSER_PAGES = REGISTRY.counter("yca_browser_pages_total", "Pages loaded by the scrapers' browsers")
+
+# Keys of the video dicts returned by get_channel_videos
+VIDEO_FIELDS = ("title", "url", "views", "upload_date", "duration", "thumbnail_url")
+
+class _CollectState:
+    """Videos gathered so far during one get_channel_videos call"""
+    
+    def __init__(self, threshold_date, known, refresh_cutoff, reference, stop_at_known=True):
+        self.threshold_date = threshold_date
+        # Relative upload dates are resolved against this one timestamp
+        self.reference = reference
+        self.known = known
+        self.refresh_cutoff = refresh_cutoff
+        # Only when the index already covers the whole window can the rest
+        # of it be filled in from the index
+        self.stop_at_known = stop_at_known
+        self.videos = []
+        self.seen_ids = set()
+        self.reached_known = False
+        
+# Sleeps the scraper used before waits became adaptive, kept to report time saved
+FIXED_PAGE_LOAD_SLEEP = 5
+FIXED_SCROLL_SLEEP = 2
+
 class YouTubeScraper:
-    def __init__(self):
+    EXTRACTION_MODES = ("bulk", "element")
+    BACKENDS = ("browser", "http")
+    
+    def __init__(self, pool: Optional[DriverPool] = None, extraction_mode: str = "bulk",
+                 min_wait: float = 0.3, max_wait: float = 10, page_load_timeout: float = 15,
+                 backend: str = "browser", http_client: Optional[ChannelPageClient] = None,
+                 channel_index: Optional[ChannelIndex] = None, refresh_days: int = 7, stall_checks: int = 3):
+        """
+        Args:
+            channel_index: Optional ChannelIndex used for incremental refreshes
+            refresh_days: Known videos newer than this are scraped again to
+                refresh their view counts
+            backend: "browser" scrolls the channel in headless Chrome, "http"
+                reads the page's embedded JSON without starting a browser
+            http_client: Optional shared ChannelPageClient for the http backend
+            pool: Optional shared DriverPool to borrow a warm browser from.
+                Without one the scraper starts and owns its own browser.
+            extraction_mode: "bulk" reads every tile in one script call,
+                "element" queries each tile field through WebDriver
+            min_wait: Minimum seconds to pause after each scroll
+            max_wait: Maximum seconds to wait for new tiles after each scroll
+            page_load_timeout: Maximum seconds to wait for the first tiles to render
+            stall_checks: Scrolls in a row that add nothing, while the continuation
+                spinner is still shown, before the grid is assumed to have ended
+        """
+        if extraction_mode not in self.EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode: {extraction_mode}")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown scraper backend: {backend}")
+        self.backend = backend
+        self.channel_index = channel_index
+        self.refresh_days = refresh_days
+        self.http_client = http_client
+        self._owns_http_client = False
+        self.pool = pool
+        self.pooled = None
+        self.driver = None
+        self.extraction_mode = extraction_mode
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        self.page_load_timeout = page_load_timeout
+        self.stall_checks = stall_checks
+        # Per-scroll timing of the most recent get_channel_videos call
+        self.scroll_stats: List[Dict] = []
+        # Time spent waiting versus the old fixed sleeps, for the same call
+        self.wait_stats: Dict[str, float] = {}
+        # Time the same call spent scraping, not counting pauses between yields
+        self.scrape_seconds = 0.0
         self.setup_driver()
         
     def setup_driver(self):
         """Initialize Chrome WebDriver with appropriate options"""
-        chrome_options = Options()
-        chrome_options.add_argument("--headless=new")  # New headless mode
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")  # Disable GPU hardware acceleration
-        chrome_options.add_argument("--window-size=1920,1080")  # Set window size
-        chrome_options.add_argument("--ignore-certificate-errors")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+        if self.backend == "http":
+            if not self.http_client:
+                self.http_client = ChannelPageClient()
+                self._owns_http_client = True
+        elif self.pool:
+            self.pooled = self.pool.acquire()
+            self.driver = self.pooled.driver
+        else:
+            self.driver = create_driver()
+            
+    def _load_page(self, url):
+        """Navigate the browser, keeping the pooled page count up to date"""
+        BROWSER_PAGES.inc()
+        try:
+            self.driver.get(url)
+        except WebDriverException:
+            if self.pooled:
+                self.pooled.broken = True
+            raise
+        finally:
+            if self.pooled:
+                self.pooled.pages += 1
+        
+    def get_channel_videos(self, channel_url, months_back=2, incremental=True):
+        """
+        Scrape videos from a channel for the specified number of months
         
+        With a channel index and incremental=True, scraping stops at the first
+        already-known video older than refresh_days and the rest of the window
+        is filled in from the index. That only happens when earlier scrapes
+        covered the whole window; a wider window is scraped in full.
+        """
         try:
-            # Try using ChromeDriverManager
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            return list(self.iter_channel_videos(channel_url, months_back, incremental))
         except Exception as e:
-            logger.error(f"Error with ChromeDriverManager: {e}")
-            try:
-                # Fallback to direct Chrome instantiation
-                self.driver = webdriver.Chrome(options=chrome_options)
-            except Exception as e:
-                logger.error(f"Error creating Chrome driver: {e}")
-                raise
+            logger.error(f"Error scraping channel videos: {e}")
+            return []
+            
+    def iter_channel_videos(self, channel_url, months_back=2, incremental=True):
+        """
+        Yield videos as soon as each scroll (or HTTP page) extracts them
+        
+        Same videos and order as get_channel_videos, but the caller can start
+        working on the first videos while the channel is still being scrolled.
+        Scraping pauses while the caller is not pulling, and the channel
+        index is only updated once the generator is exhausted. Errors are
+        raised rather than logged.
+        """
+        # Handle channel URL formatting
+        if not channel_url.endswith('/videos'):
+            videos_url = f"{channel_url.rstrip('/')}/videos"
+        else:
+            videos_url = channel_url
+            
+        # Calculate the date threshold
+        now = datetime.now()
+        threshold_date = now - timedelta(days=30 * months_back)
+        record = self.channel_index.load_record(channel_url) if self.channel_index else {}
+        known = record.get('videos', {})
+        covered_since = self._covered_since(record)
+        state = _CollectState(
+            threshold_date,
+            known if incremental else {},
+            now - timedelta(days=self.refresh_days),
+            now,
+            stop_at_known=covered_since is not None and covered_since <= threshold_date
+        )
+        self.scroll_stats = []
+        self.scrape_seconds = 0.0
+        
+        resumed = time.perf_counter()
+        try:
+            scrape = self._scrape_http if self.backend == "http" else self._scrape_browser
+            for batch in scrape(videos_url, state):
+                for video in batch:
+                    self.scrape_seconds += time.perf_counter() - resumed
+                    yield video
+                    resumed = time.perf_counter()
+        except Exception as e:
+            SCRAPE_FAILURES.inc(backend=self.backend)
+            if self.pooled and isinstance(e, WebDriverException):
+                # The browser may have crashed; do not hand it to the next scraper
+                self.pooled.broken = True
+            raise
+        self.scrape_seconds += time.perf_counter() - resumed
+        SCRAPE_SECONDS.observe(self.scrape_seconds, backend=self.backend)
+            
+        yield from self._known_videos_in_window(state, now)
+        if self.channel_index:
+            self._update_index(channel_url, known, state.videos, now,
+                               self._new_coverage(record, state, covered_since))
+            
+    def _scrape_browser(self, videos_url, state):
+        """Scroll the channel grid in the browser, yielding the videos each scroll adds to state"""
+        logger.info(f"Accessing channel videos at: {videos_url}")
+        self._load_page(videos_url)
         
-    def get_channel_videos(self, channel_url, months_back=2):
-        """Scrape videos from a channel for the specified number of months"""
+        # Wait for content to load and log page title
+        load_start = time.perf_counter()
         try:
-            # Handle channel URL formatting
-            if not channel_url.endswith('/videos'):
-                videos_url = f"{channel_url.rstrip('/')}/videos"
+            WebDriverWait(self.driver, self.page_load_timeout).until(
+                EC.presence_of_element_located((By.TAG_NAME, "ytd-rich-grid-media"))
+            )
+        except TimeoutException:
+            logger.warning(f"No videos rendered within {self.page_load_timeout}s")
+        self.wait_stats = {
+            'waited_seconds': time.perf_counter() - load_start,
+            'fixed_sleep_seconds': FIXED_PAGE_LOAD_SLEEP
+        }
+        PAGE_LOAD_SECONDS.observe(self.wait_stats['waited_seconds'])
+        logger.info(f"Page title: {self.driver.title}")
+        
+        # Tiles are appended to the grid as we scroll, so only tiles past
+        # this index still need extracting
+        processed_tiles = 0
+        last_height = self.driver.execute_script("return document.documentElement.scrollHeight")
+        stalls = 0
+        
+        while True:
+            # Scroll down
+            self.driver.execute_script("window.scrollTo(0, document.documentElement.scrollHeight);")
+            self.wait_stats['fixed_sleep_seconds'] += FIXED_SCROLL_SLEEP
+            wait_seconds, loading_more = self._wait_for_grid(processed_tiles, self.max_wait, self.min_wait)
+            
+            extract_start = time.perf_counter()
+            new_videos, tile_count = self._extract_visible_videos(start_index=processed_tiles)
+            processed_tiles += tile_count
+            added, done = self._collect(state, new_videos)
+            
+            self._record_scroll(tile_count, added, len(state.videos),
+                                time.perf_counter() - extract_start, wait_seconds)
+            if added:
+                yield state.videos[-added:]
+            if done:
+                break
+            
+            # Check if we've reached the end. An unchanged page only means the end
+            # once YouTube drops its continuation spinner; a slow continuation
+            # keeps the spinner up and gets a few more tries
+            new_height = self.driver.execute_script("return document.documentElement.scrollHeight")
+            if new_height == last_height and not tile_count:
+                if not loading_more:
+                    break
+                stalls += 1
+                if stalls >= self.stall_checks:
+                    logger.warning(f"Grid still loading after {stalls} scrolls without new tiles; stopping")
+                    break
             else:
-                videos_url = channel_url
+                stalls = 0
+            last_height = new_height
+            
+        self._log_wait_savings()
+        
+    def _scrape_http(self, videos_url, state):
+        """Collect channel videos page by page over HTTP, yielding each page's new videos"""
+        logger.info(f"Fetching channel videos over HTTP at: {videos_url}")
+        self.wait_stats = {}
+        
+        page_start = time.perf_counter()
+        for page in self.http_client.iter_video_pages(videos_url):
+            added, done = self._collect(state, page)
+            self._record_scroll(len(page), added, len(state.videos), time.perf_counter() - page_start)
+            if added:
+                yield state.videos[-added:]
+            if done:
+                break
+            page_start = time.perf_counter()
+            
+    def _collect(self, state, new_videos):
+        """
+        Add newly extracted videos to state, skipping duplicates
+        
+        Returns:
+            Tuple of (videos added, whether scraping can stop)
+        """
+        added = 0
+        upload_dates = parse_upload_dates(
+            pd.Series([video['upload_date'] for video in new_videos], dtype=object), state.reference
+        )
+        for video_data, upload_date in zip(new_videos, upload_dates):
+            video_id = self._video_id(video_data['url'])
+            if video_id in state.seen_ids:
+                continue
+            state.seen_ids.add(video_id)
+            
+            known = state.known.get(video_id)
+            if state.stop_at_known and known and \
+                    datetime.fromisoformat(known['published_at']) < state.refresh_cutoff:
+                logger.info(f"Reached already indexed video {video_id}, stopping scrape")
+                state.reached_known = True
+                return added, True
                 
-            logger.info(f"Accessing channel videos at: {videos_url}")
-            self.driver.get(videos_url)
+            if upload_date < state.threshold_date:
+                return added, True
+            state.videos.append(video_data)
+            added += 1
+        return added, False
+        
+    def _known_videos_in_window(self, state, now):
+        """Indexed videos inside the date window that were not scraped this time"""
+        if not state.reached_known:
+            return []
+            
+        scraped_ids = {self._video_id(video['url']) for video in state.videos}
+        remaining = []
+        for video_id, entry in state.known.items():
+            if video_id in scraped_ids:
+                continue
+            published_at = datetime.fromisoformat(entry['published_at'])
+            if published_at < state.threshold_date:
+                continue
+            video = {key: entry.get(key) for key in VIDEO_FIELDS}
+            video['upload_date'] = self._format_upload_date(published_at, now)
+            remaining.append((published_at, video))
+            
+        remaining.sort(key=lambda item: item[0], reverse=True)
+        logger.info(f"Filled {len(remaining)} videos from the channel index")
+        return [video for _, video in remaining]
+        
+    @staticmethod
+    def _covered_since(record):
+        """Oldest upload date the index is known to be complete from, or None"""
+        try:
+            return datetime.fromisoformat(record['covered_since'])
+        except (KeyError, TypeError, ValueError):
+            return None
             
-            # Wait for content to load and log page title
-            time.sleep(5)
-            logger.info(f"Page title: {self.driver.title}")
+    def _new_coverage(self, record, state, covered_since):
+        """Oldest upload date the index is complete from once this scrape is recorded"""
+        if state.reached_known:
+            # Scraped from now back to a video inside the previously covered range
+            return covered_since
+        # Scraped the whole window; it joins the earlier range if the two overlap
+        try:
+            previous_scrape = datetime.fromisoformat(record['scraped_at'])
+        except (KeyError, TypeError, ValueError):
+            previous_scrape = None
+        if covered_since and previous_scrape and previous_scrape >= state.threshold_date:
+            return min(covered_since, state.threshold_date)
+        return state.threshold_date
+        
+    def _update_index(self, channel_url, known, scraped_videos, now, covered_since=None):
+        """Record scraped videos, their latest metadata and the covered range in the channel index"""
+        index = dict(known)
+        upload_dates = parse_upload_dates(
+            pd.Series([video['upload_date'] for video in scraped_videos], dtype=object), now
+        )
+        for video, upload_date in zip(scraped_videos, upload_dates):
+            video_id = self._video_id(video['url'])
+            previous = index.get(video_id)
+            # Keep the first estimate: relative dates get coarser as videos age
+            published_at = previous['published_at'] if previous else \
+                upload_date.to_pydatetime().isoformat()
+            index[video_id] = {
+                **{key: video.get(key) for key in VIDEO_FIELDS},
+                'published_at': published_at,
+                'last_seen': now.isoformat()
+            }
+        self.channel_index.save(channel_url, index, covered_since=covered_since.isoformat() if covered_since else None,
+                                scraped_at=now.isoformat())
+        
+    @staticmethod
+    def _format_upload_date(published_at, now):
+        """Render an absolute upload time in YouTube's relative "N units ago" style"""
+        delta = now - published_at
+        for unit, seconds in (("year", 365 * 86400), ("month", 30 * 86400), ("week", 7 * 86400),
+                              ("day", 86400), ("hour", 3600)):
+            count = int(delta.total_seconds() // seconds)
+            if count >= 1:
+                return f"{count} {unit}{'s' if count > 1 else ''} ago"
+        return "1 hour ago"
+        
+    def _wait_for_grid(self, known_tiles, timeout, min_wait):
+        """
+        Wait until more than known_tiles tiles are rendered or the continuation
+        spinner is gone, bounded by min_wait and timeout. Returns seconds waited
+        and whether the spinner was still shown at the last check.
+        """
+        start = time.perf_counter()
+        state = {'loading_more': True}
+        
+        def grid_ready(driver):
+            tile_count, state['loading_more'] = driver.execute_script(GRID_STATE_SCRIPT)
+            return tile_count > known_tiles or not state['loading_more']
             
-            # Calculate the date threshold
-            threshold_date = datetime.now() - timedelta(days=30 * months_back)
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(grid_ready)
+        except TimeoutException:
+            logger.info(f"No new tiles rendered within {timeout}s")
             
-            videos_data = []
-            last_height = self.driver.execute_script("return document.documentElement.scrollHeight")
+        remaining = min_wait - (time.perf_counter() - start)
+        if remaining > 0:
+            time.sleep(remaining)
             
-            while True:
-                # Scroll down
-                self.driver.execute_script("window.scrollTo(0, document.documentElement.scrollHeight);")
-                time.sleep(2)
-                
-                # Get video elements
-                video_elements = self.driver.find_elements(By.TAG_NAME, "ytd-rich-grid-media")
-                
-                for element in video_elements:
-                    try:
-                        video_data = self._extract_video_data(element)
-                        if video_data:
-                            upload_date = self._parse_upload_date(video_data['upload_date'])
-                            if upload_date < threshold_date:
-                                return videos_data
-                            videos_data.append(video_data)
-                    except Exception as e:
-                        logger.error(f"Error extracting video data: {e}")
-                
-                # Check if we've reached the end
-                new_height = self.driver.execute_script("return document.documentElement.scrollHeight")
-                if new_height == last_height:
+        waited = time.perf_counter() - start
+        self.wait_stats['waited_seconds'] += waited
+        return waited, state['loading_more']
+        
+    def _log_wait_savings(self):
+        """Log how the adaptive waits compare with the old fixed sleeps"""
+        waited = self.wait_stats.get('waited_seconds', 0.0)
+        fixed = self.wait_stats.get('fixed_sleep_seconds', 0.0)
+        self.wait_stats['waited_seconds'] = round(waited, 3)
+        self.wait_stats['saved_seconds'] = round(fixed - waited, 3)
+        logger.info(f"Waited {waited:.1f}s for content versus {fixed:.1f}s of fixed sleeps "
+                    f"(saved {fixed - waited:.1f}s)")
+        
+    def _record_scroll(self, new_tiles, new_videos, total_videos, seconds, wait_seconds=0.0):
+        """Keep and log timing for one scroll iteration"""
+        stats = {
+            'scroll': len(self.scroll_stats) + 1,
+            'new_tiles': new_tiles,
+            'new_videos': new_videos,
+            'total_videos': total_videos,
+            'wait_seconds': round(wait_seconds, 3),
+            'extract_seconds': round(seconds, 3)
+        }
+        self.scroll_stats.append(stats)
+        SCRAPE_STEP_SECONDS.observe(seconds + wait_seconds, backend=self.backend)
+        SCRAPED_VIDEOS.inc(new_videos, backend=self.backend)
+        logger.info(f"Scroll {stats['scroll']}: {new_tiles} new tiles, {new_videos} new videos "
+                    f"({total_videos} total) after waiting {stats['wait_seconds']}s, "
+                    f"extracted in {stats['extract_seconds']}s")
+        
+    @staticmethod
+    def _video_id(video_url):
+        """Pull the video ID out of a watch URL, falling back to the URL itself"""
+        match = re.search(r'[?&]v=([0-9A-Za-z_-]{11})', video_url)
+        return match.group(1) if match else video_url
+        
+    def _extract_visible_videos(self, mode=None, start_index=0) -> Tuple[List[Dict], int]:
+        """
+        Extract rendered video tiles from start_index onwards
+        
+        Returns:
+            Tuple of (video dicts, number of tiles looked at)
+        """
+        mode = mode or self.extraction_mode
+        if mode == "bulk":
+            return self._extract_videos_bulk(start_index)
+            
+        videos = []
+        elements = self.driver.find_elements(By.TAG_NAME, "ytd-rich-grid-media")[start_index:]
+        for element in elements:
+            try:
+                video_data = self._extract_video_data(element)
+                if video_data:
+                    videos.append(video_data)
+            except Exception as e:
+                logger.error(f"Error extracting video data: {e}")
+        return videos, len(elements)
+        
+    def _extract_videos_bulk(self, start_index=0) -> Tuple[List[Dict], int]:
+        """Extract all tiles from start_index onwards with a single execute_script call"""
+        raw_tiles = self.driver.execute_script(BULK_EXTRACT_SCRIPT, start_index) or []
+        videos = []
+        for raw in raw_tiles:
+            video_data = self._build_video_data(raw)
+            if video_data:
+                videos.append(video_data)
+        return videos, len(raw_tiles)
+        
+    def _build_video_data(self, raw):
+        """Turn the raw tile fields from BULK_EXTRACT_SCRIPT into a video dict"""
+        if not raw:
+            return None
+            
+        video_url = raw.get('href')
+        if not video_url:
+            logger.error("Could not find video URL")
+            return None
+        if not video_url.startswith('http'):
+            video_url = f"https://www.youtube.com{video_url}"
+            
+        # Same title fallbacks as _extract_video_data
+        video_title = None
+        aria_label = raw.get('aria_label')
+        if aria_label:
+            video_title = aria_label.split(" by ")[0]
+        if not video_title:
+            video_title = raw.get('title_attr')
+        if not video_title:
+            for title in raw.get('title_candidates') or []:
+                if title and not title.isdigit() and ':' not in title:
+                    video_title = title
                     break
-                last_height = new_height
+        if video_title:
+            video_title = video_title.strip()
+        if not video_title:
+            logger.error("Could not find video title")
+            return None
+            
+        if not raw.get('has_metadata'):
+            logger.error("Error extracting video data: metadata line not found")
+            return None
+            
+        views = "0"
+        upload_date = "Unknown"
+        for item in raw.get('metadata') or []:
+            text = item.lower()
+            if "views" in text:
+                views = text.replace("views", "").strip()
+            elif "ago" in text:
+                upload_date = text
                 
-            return videos_data
+        duration = ""
+        for candidate in raw.get('duration_candidates') or []:
+            duration = (candidate or "").strip()
+            if duration:
+                break
+                
+        if not raw.get('has_thumbnail'):
+            logger.error("Error extracting video data: thumbnail not found")
+            return None
             
-        except Exception as e:
-            logger.error(f"Error scraping channel videos: {e}")
-            return []
+        return {
+            "title": video_title,
+            "url": video_url,
+            "views": views,
+            "upload_date": upload_date,
+            "duration": duration,
+            "thumbnail_url": raw.get('thumbnail_url')
+        }
+        
+    def compare_extraction_modes(self):
+        """
+        Extract the currently loaded page with both modes and compare them
+        
+        Returns:
+            Dictionary with the time and video count of each mode and the
+            number of videos whose fields differ between the two
+        """
+        results = {}
+        outputs = {}
+        for mode in self.EXTRACTION_MODES:
+            start = time.perf_counter()
+            outputs[mode], _ = self._extract_visible_videos(mode)
+            results[mode] = {
+                'seconds': round(time.perf_counter() - start, 3),
+                'videos': len(outputs[mode])
+            }
             
+        bulk_by_url = {video['url']: video for video in outputs['bulk']}
+        element_by_url = {video['url']: video for video in outputs['element']}
+        results['mismatches'] = sum(
+            1 for url in set(bulk_by_url) | set(element_by_url)
+            if bulk_by_url.get(url) != element_by_url.get(url)
+        )
+        logger.info(f"Extraction mode comparison: {results}")
+        return results
+        
     def _extract_video_data(self, video_element):
         """Extract metadata from a video element"""
         try:
@@ -235,27 +741,17 @@ class YouTubeScraper:
             
     def _parse_upload_date(self, date_str):
         """Convert relative date string to datetime object"""
-        try:
-            number = int(''.join(filter(str.isdigit, date_str)))
-            if "year" in date_str:
-                return datetime.now() - timedelta(days=number * 365)
-            elif "month" in date_str:
-                return datetime.now() - timedelta(days=number * 30)
-            elif "week" in date_str:
-                return datetime.now() - timedelta(weeks=number)
-            elif "day" in date_str:
-                return datetime.now() - timedelta(days=number)
-            elif "hour" in date_str:
-                return datetime.now() - timedelta(hours=number)
-            else:
-                return datetime.now()
-        except Exception as e:
-            logger.error(f"Error parsing date: {e}")
-            return datetime.now()
+        return parse_upload_dates(pd.Series([date_str], dtype=object), datetime.now()).iloc[0].to_pydatetime()
             
     def close(self):
-        """Close the WebDriver"""
-        self.driver.quit()
+        """Close the WebDriver, or hand it back to the pool it came from"""
+        if self.pooled:
+            self.pool.release(self.pooled)
+            self.pooled = None
+        elif self.driver:
+            self.driver.quit()
+        if self._owns_http_client:
+            self.http_client.close()
 
 if __name__ == "__main__":
     # Example usage